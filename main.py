@@ -2,7 +2,19 @@ import sys
 import argparse
 import random
 import time
-from src.core import MapGenerator, TrafficManager, RouteFinder, Visualizer
+from src.core import MapGenerator, CSRGraph, TrafficManager, RouteFinder, Visualizer
+
+def parse_node(text):
+    x, y = text.split(',')
+    return (int(x), int(y))
+
+def print_cost_matrix(sources, targets, costs):
+    print("-" * (14 + 14 * len(targets)))
+    print(f"{'From / To':<14}" + "".join(f"{str(t):<14}" for t in targets))
+    print("-" * (14 + 14 * len(targets)))
+    for source, row in zip(sources, costs):
+        print(f"{str(source):<14}" + "".join(f"{c:<14.4f}" for c in row))
+    print("-" * (14 + 14 * len(targets)))
 
 def main():
     parser = argparse.ArgumentParser(description="Emergency Route Optimization Simulation")
@@ -11,16 +23,30 @@ def main():
     parser.add_argument('--obstacles', type=float, default=0.2, help='Obstacle probability (0-1)')
     parser.add_argument('--traffic', type=float, default=0.3, help='Traffic probability (0-1)')
     parser.add_argument('--seed', type=int, default=None, help='Random seed')
+    parser.add_argument('--sources', type=parse_node, nargs='+', default=None,
+                        help='Batch mode: source nodes as x,y (requires --targets)')
+    parser.add_argument('--targets', type=parse_node, nargs='+', default=None,
+                        help='Batch mode: target nodes as x,y (requires --sources); prints the source/target cost matrix')
+    parser.add_argument('--load-map', default=None,
+                        help='Open a saved .npz map (with its traffic) instead of generating one')
+    parser.add_argument('--save-map', default=None, help='Save the map and its traffic to this .npz file')
     
     args = parser.parse_args()
+    if (args.sources is None) != (args.targets is None):
+        parser.error("--sources and --targets must be given together")
 
     if args.seed is not None:
         random.seed(args.seed)
 
-    print("Initializing Map...")
-    map_gen = MapGenerator(width=args.width, height=args.height, obstacle_prob=args.obstacles)
-    G = map_gen.generate_grid_map()
-    print(f"Map created: {len(G.nodes())} nodes, {len(G.edges())} edges.")
+    if args.load_map:
+        print(f"Opening Map {args.load_map}...")
+        G = CSRGraph.load(args.load_map)
+        print(f"Map loaded: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges.")
+    else:
+        print("Initializing Map...")
+        map_gen = MapGenerator(width=args.width, height=args.height, obstacle_prob=args.obstacles)
+        G = map_gen.generate_grid_map()
+        print(f"Map created: {len(G.nodes())} nodes, {len(G.edges())} edges.")
 
     nodes = list(G.nodes())
     if not nodes:
@@ -38,12 +64,32 @@ def main():
     
     print(f"Start: {start}, Goal: {goal}")
 
-    print("Applying Traffic...")
     traffic_mgr = TrafficManager(G)
-    traffic_mgr.apply_random_traffic(intensity=args.traffic)
+    # A loaded map keeps the traffic it was saved with
+    if not args.load_map:
+        print("Applying Traffic...")
+        traffic_mgr.apply_random_traffic(intensity=args.traffic)
+
+    if args.save_map:
+        (G if isinstance(G, CSRGraph) else CSRGraph.from_networkx(G)).save(args.save_map)
+        print(f"Map saved to {args.save_map}")
 
     finder = RouteFinder(G)
 
+    if args.targets:
+        sources = args.sources
+        missing = [n for n in sources + args.targets if not G.has_node(n)]
+        if missing:
+            print(f"Error: {missing} are obstacles or outside the map!")
+            return
+        print("\nRunning Batch Routing...")
+        t0 = time.time()
+        costs, _, expanded = finder.many_to_many(sources, args.targets)
+        batch_time = (time.time() - t0) * 1000
+        print_cost_matrix(sources, args.targets, costs)
+        print(f"Time: {batch_time:.4f} ms, Nodes Expanded: {expanded}")
+        return
+
     print("\nRunning Algorithms...")
     
     # Run Dijkstra
@@ -1,4 +1,6 @@
 # Benchmark module
-from src.benchmark.benchmark import get_benchmark_data, plot_benchmark_data
+from src.benchmark.benchmark import get_benchmark_data, plot_benchmark_data, compare_frontiers
+from src.benchmark.harness import run_suite, compare_results, save_results, load_results
 
-__all__ = ['get_benchmark_data', 'plot_benchmark_data']
+__all__ = ['get_benchmark_data', 'plot_benchmark_data', 'compare_frontiers', 'run_suite', 'compare_results',
+           'save_results', 'load_results']
@@ -0,0 +1,114 @@
+import argparse
+import sys
+
+from src.benchmark.benchmark import ALGORITHMS
+from src.benchmark.harness import make_scenario, run_suite, save_results, load_results, compare_results, \
+    print_comparison, parallel_throughput
+from src.benchmark.scaling import SIZE_LADDER, DISTANCE_BUCKETS, build_corpus, run_scaling, print_scaling, \
+    plot_scaling
+
+
+def parse_bucket(text):
+    """name=low:high, e.g. short=0:0.1 (fractions of the map diagonal)"""
+    name, bounds = text.split('=')
+    low, high = bounds.split(':')
+    return name, (float(low), float(high))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Route benchmark harness")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Benchmark seeded maps and write the results as JSON')
+    run.add_argument('-o', '--output', default='benchmark_results.json', help='Result file')
+    run.add_argument('--sizes', type=int, nargs='+', default=[20, 50, 100], help='Map sizes (square maps)')
+    run.add_argument('--obstacles', type=float, default=0.2, help='Obstacle probability (0-1)')
+    run.add_argument('--traffic', type=float, default=0.3, help='Traffic probability (0-1)')
+    run.add_argument('--queries', type=int, default=10, help='Queries per map')
+    run.add_argument('--seed', type=int, default=0, help='Scenario seed')
+    run.add_argument('--warmup', type=int, default=1, help='Untimed passes before timing')
+    run.add_argument('--repeat', type=int, default=10, help='Timed passes per algorithm')
+    run.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+
+    compare = commands.add_parser('compare', help='Flag regressions between two result files')
+    compare.add_argument('baseline')
+    compare.add_argument('candidate')
+    compare.add_argument('--threshold', type=float, default=0.10, help='Allowed median slowdown (0.10 = 10%%)')
+
+    scale = commands.add_parser('scale', help='Scaling sweep over map size with fitted growth curves')
+    scale.add_argument('-o', '--output', default='scaling_results.json', help='Result file')
+    scale.add_argument('--sizes', type=int, nargs='+', default=SIZE_LADDER, help='Size ladder (square maps)')
+    scale.add_argument('--obstacles', type=float, nargs='+', default=[0.2], help='Obstacle densities to sweep')
+    scale.add_argument('--traffic', type=float, nargs='+', default=[0.3], help='Traffic intensities to sweep')
+    scale.add_argument('--buckets', type=parse_bucket, nargs='+', default=None,
+                       help='Query distance buckets as name=low:high fractions of the diagonal '
+                            f"(default: {' '.join(f'{k}={lo:g}:{hi:g}' for k, (lo, hi) in DISTANCE_BUCKETS.items())})")
+    scale.add_argument('--seeds', type=int, nargs='+', default=[0], help='Scenario seeds (one map per seed)')
+    scale.add_argument('--queries', type=int, default=5, help='Queries per map')
+    scale.add_argument('--algorithms', nargs='+', default=['dijkstra', 'astar', 'bidijkstra', 'biastar'],
+                       choices=[key for key, _, _ in ALGORITHMS], help='Algorithms to benchmark')
+    scale.add_argument('--budget-ms', type=float, default=2000, help='Per-query time limit; slower algorithms '
+                                                                     'are dropped from larger maps')
+    scale.add_argument('--warmup', type=int, default=0, help='Untimed passes before timing')
+    scale.add_argument('--repeat', type=int, default=3, help='Timed passes per algorithm')
+    scale.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    scale.add_argument('--corpus', default=None, help='Replay the scenario specs saved in this JSON file')
+    scale.add_argument('--save-corpus', default=None, help='Write the scenario specs to this JSON file')
+    scale.add_argument('--plot', default=None, help='Also save log-log scaling charts to this PNG file')
+
+    parallel = commands.add_parser('parallel', help='Queries per second of the process pool per worker count')
+    parallel.add_argument('--size', type=int, default=200, help='Map size (square CSR map)')
+    parallel.add_argument('--queries', type=int, default=200, help='Queries per pass')
+    parallel.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts to measure')
+    parallel.add_argument('--algorithm', default='dijkstra', help='RouteFinder method to run')
+    parallel.add_argument('--seed', type=int, default=0, help='Scenario seed')
+    parallel.add_argument('--repeat', type=int, default=3, help='Timed passes per worker count')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'parallel':
+        scenario = make_scenario(f"{args.size}x{args.size}", args.size, args.size, seed=args.seed,
+                                 num_queries=args.queries, backend='csr')
+        report = parallel_throughput(scenario['graph'], scenario['queries'], args.workers, args.algorithm,
+                                     repeat=args.repeat)
+        print(f"{'Workers':>8}{'Median q/s':>14}{'Min q/s':>12}{'Max q/s':>12}")
+        for workers, rate in report.items():
+            print(f"{workers:>8}{rate['median']:>14.1f}{rate['min']:>12.1f}{rate['max']:>12.1f}")
+        return 0
+
+    if args.command == 'scale':
+        if args.corpus:
+            corpus = load_results(args.corpus)
+        else:
+            corpus = build_corpus(args.sizes, args.obstacles, args.traffic,
+                                  dict(args.buckets) if args.buckets else None, args.seeds, args.queries)
+        if args.save_corpus:
+            save_results(corpus, args.save_corpus)
+        algorithms = [entry for entry in ALGORITHMS if entry[0] in args.algorithms]
+        results = run_scaling(corpus, algorithms, args.warmup, args.repeat, not args.no_memory, args.budget_ms,
+                              callback=print)
+        save_results(results, args.output)
+        print_scaling(results, args.budget_ms)
+        if args.plot:
+            plot_scaling(results, args.plot)
+        print(f"Results saved to {args.output}")
+        return 0
+
+    if args.command == 'run':
+        scenarios = [make_scenario(f"{size}x{size}", size, size, args.obstacles, args.traffic, args.seed,
+                                   args.queries) for size in args.sizes]
+        results = run_suite(scenarios, warmup=args.warmup, repeat=args.repeat, memory=not args.no_memory,
+                            callback=print)
+        save_results(results, args.output)
+        print(f"Results saved to {args.output}")
+        return 0
+
+    rows = compare_results(load_results(args.baseline), load_results(args.candidate), args.threshold)
+    print_comparison(rows)
+    regressions = sum(row['status'] == 'regression' for row in rows)
+    print(f"{regressions} regression(s) found.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,43 @@
 import time
 import matplotlib.pyplot as plt
 import numpy as np
-from src.core import MapGenerator, TrafficManager, RouteFinder
+from src.core import MapGenerator, TrafficManager, RouteFinder, LandmarkHeuristic
+from src.core.frontier import FRONTIERS
 import random
-import tracemalloc
-
-
-def get_benchmark_data(callback=None, custom_graph=None, start_node=None, goal_node=None):
+from src.benchmark.harness import time_runs, peak_memory, summarize
+
+
+# (result key prefix, display label, run(finder, start, goal, context))
+# `context` holds per-map preprocessing built outside the timed region.
+ALGORITHMS = [
+    ('dijkstra', 'Dijkstra', lambda f, s, g, ctx: f.dijkstra(s, g)),
+    ('astar', 'A*', lambda f, s, g, ctx: f.a_star(s, g)),
+    ('greedy', 'Greedy', lambda f, s, g, ctx: f.greedy_bfs(s, g)),
+    ('bidijkstra', 'Bi-Dijkstra', lambda f, s, g, ctx: f.bidirectional_dijkstra(s, g)),
+    ('biastar', 'Bi-A*', lambda f, s, g, ctx: f.bidirectional_a_star(s, g)),
+    ('alt', 'A* (ALT)', lambda f, s, g, ctx: f.a_star(s, g, heuristic=ctx['landmarks'])),
+]
+METRICS = ['times', 'nodes', 'mem', 'len']
+# RouteFinder.stats fields of the last timed run, reported as '<algorithm>_<field>'
+STAT_METRICS = ['pushes', 'pops', 'stale_pops', 'relaxations', 'improved', 'peak_frontier', 'setup_ms', 'path_ms']
+# Weighted A* settings compared in the cost vs. search-effort trade-off chart
+EPSILONS = [1.0, 1.2, 1.5, 2.0, 3.0]
+
+
+def get_benchmark_data(callback=None, custom_graph=None, start_node=None, goal_node=None, warmup=1, repeat=10,
+                       algorithms=None):
     """
     Runs metrics and returns a dictionary of results.
     If custom_graph is provided, benchmarks that specific map.
     Otherwise, runs the standard suite on varying map sizes.
+    Each search is timed `repeat` times after `warmup` untimed runs, and its
+    memory peak is traced in a separate pass so timings carry no tracemalloc cost.
+    algorithms: (key, label, run) entries to benchmark, ALGORITHMS by default.
+    Result keys are '<algorithm>_<metric>' for every benchmarked algorithm and METRICS
+    ('times' is the median), plus '<algorithm>_times_p95' and '<algorithm>_times_std'
+    and the search counters and phases listed in STAT_METRICS.
+    'epsilon_tradeoff' holds, for each weighted A* epsilon in EPSILONS, the mean
+    path cost relative to the optimum and the mean number of expanded nodes.
     """
     
     if custom_graph:
@@ -20,101 +47,78 @@ def get_benchmark_data(callback=None, custom_graph=None, start_node=None, goal_n
         sizes = [10, 20, 30, 40, 50]
         if callback: callback("Starting standard suite...")
 
-    results = {
-        'sizes': sizes,
-        'dijkstra_times': [], 'astar_times': [], 'greedy_times': [],
-        'dijkstra_nodes': [], 'astar_nodes': [], 'greedy_nodes': [],
-        'dijkstra_mem': [],   'astar_mem': [],   'greedy_mem': [],
-        'dijkstra_len': [],   'astar_len': [],   'greedy_len': []
-    }
+    algorithms = ALGORITHMS if algorithms is None else algorithms
+    results = {'sizes': sizes, 'algorithms': [(key, label) for key, label, _ in algorithms]}
+    for key, _, _ in algorithms:
+        for metric in METRICS + ['times_p95', 'times_std'] + STAT_METRICS:
+            results[f'{key}_{metric}'] = []
+    metric_keys = [k for k in results if k not in ('sizes', 'algorithms')]
+
+    # Per epsilon: [sum of cost / optimal cost, sum of expanded nodes, samples]
+    tradeoff = {eps: [0.0, 0, 0] for eps in EPSILONS}
+
+    def measure_tradeoff(graph, s, g, optimal_cost):
+        finder = RouteFinder(graph)
+        for eps in EPSILONS:
+            _, cost, exp = finder.a_star(s, g, epsilon=eps)
+            tradeoff[eps][0] += cost / optimal_cost if optimal_cost else 1.0
+            tradeoff[eps][1] += exp
+            tradeoff[eps][2] += 1
 
     def run_on_graph(graph, s, g):
-        d_t, a_t, g_t = 0, 0, 0
-        d_n, a_n, g_n = 0, 0, 0
-        d_m, a_m, g_m = 0, 0, 0
-        d_l, a_l, g_l = 0, 0, 0
-        valid_runs = 0
-
-        for _ in range(10):
-            finder = RouteFinder(graph)
-            
-            # Dijkstra
-            tracemalloc.start()
-            t0 = time.perf_counter()
-            d_path, _, d_exp = finder.dijkstra(s, g)
-            t1 = time.perf_counter()
-            _, d_peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-            
-            if d_exp == 0 or not d_path: continue
-            
-            # A*
-            tracemalloc.start()
-            t2 = time.perf_counter()
-            a_path, _, a_exp = finder.a_star(s, g)
-            t3 = time.perf_counter()
-            _, a_peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-
-            # Greedy
-            tracemalloc.start()
-            t4 = time.perf_counter()
-            g_path, _, g_exp = finder.greedy_bfs(s, g)
-            t5 = time.perf_counter()
-            _, g_peak = tracemalloc.get_traced_memory()
-            tracemalloc.stop()
-
-            d_t += (t1 - t0) * 1000
-            a_t += (t3 - t2) * 1000
-            g_t += (t5 - t4) * 1000
-            
-            d_n += d_exp
-            a_n += a_exp
-            g_n += g_exp
-            
-            d_m += d_peak
-            a_m += a_peak
-            g_m += g_peak
-            
-            d_l += len(d_path)
-            a_l += len(a_path)
-            g_l += len(g_path)
-            
-            valid_runs += 1
-            
-        return d_t, a_t, g_t, d_n, a_n, g_n, d_m, a_m, g_m, d_l, a_l, g_l, valid_runs
+        """Returns: ({result key: value} for one map, 1), or (None, 0) without a route."""
+        finder = RouteFinder(graph, stats='counters')
+
+        # Dijkstra is the reference: skip the map if it finds no route
+        path, optimal_cost, exp = finder.dijkstra(s, g)
+        if exp == 0 or not path:
+            return None, 0
+
+        context = {}
+        # Landmark tables take several full searches, so only build them when used
+        if any(key == 'alt' for key, _, _ in algorithms):
+            context['landmarks'] = LandmarkHeuristic(graph).select()
+        totals = {}
+        for key, _, run in algorithms:
+            def query():
+                return run(finder, s, g, context)
+
+            samples, (path, _, exp) = time_runs(query, warmup, repeat)
+            stats = summarize(samples)
+            totals[f'{key}_times'] = stats['median']
+            totals[f'{key}_times_p95'] = stats['p95']
+            totals[f'{key}_times_std'] = stats['stddev']
+            totals[f'{key}_nodes'] = exp
+            for metric in STAT_METRICS:
+                totals[f'{key}_{metric}'] = getattr(finder.stats, metric)
+            totals[f'{key}_mem'] = peak_memory(query)
+            totals[f'{key}_len'] = len(path) if path else 0
+
+        # Searches are deterministic, so one trade-off sample per map is enough
+        measure_tradeoff(graph, s, g, optimal_cost)
+        return totals, 1
+
+    def append_averages(totals, count):
+        for k, total in totals.items():
+            # Memory is reported in KB
+            results[k].append(total / count / 1024 if k.endswith('_mem') else total / count)
+
+    def append_zeros():
+        for k in metric_keys:
+            results[k].append(0)
 
     if custom_graph:
-        dt, at, gt, dn, an, gn, dm, am, gm, dl, al, gl, v = run_on_graph(custom_graph, start_node, goal_node)
+        totals, v = run_on_graph(custom_graph, start_node, goal_node)
         if v > 0:
-            results['dijkstra_times'].append(dt/v)
-            results['astar_times'].append(at/v)
-            results['greedy_times'].append(gt/v)
-            
-            results['dijkstra_nodes'].append(dn/v)
-            results['astar_nodes'].append(an/v)
-            results['greedy_nodes'].append(gn/v)
-            
-            results['dijkstra_mem'].append(dm/v/1024)
-            results['astar_mem'].append(am/v/1024)
-            results['greedy_mem'].append(gm/v/1024)
-            
-            results['dijkstra_len'].append(dl/v)
-            results['astar_len'].append(al/v)
-            results['greedy_len'].append(gl/v)
-
+            append_averages(totals, v)
         else:
-            for k in results: 
-                if isinstance(results[k], list) and k != 'sizes': results[k].append(0)
+            append_zeros()
                 
     else:
         for size in sizes:
             if callback: callback(f"Testing Map Size: {size}x{size}")
             
-            d_t, a_t, g_t = 0, 0, 0
-            d_n, a_n, g_n = 0, 0, 0
-            d_m, a_m, g_m = 0, 0, 0
-            d_l, a_l, g_l = 0, 0, 0
+            size_totals = {k: 0 for k in metric_keys}
             valid_count = 0
             
             for _ in range(5):
@@ -124,56 +128,55 @@ def get_benchmark_data(callback=None, custom_graph=None, start_node=None, goal_n
                  nodes = list(G.nodes())
                  if len(nodes) < 2: continue
                  
-                 
-                 dt, at, gt, dn, an, gn, dm, am, gm, dl, al, gl, v = run_on_graph(G, nodes[0], nodes[-1])
+                 totals, v = run_on_graph(G, nodes[0], nodes[-1])
                  
                  if v > 0:
-                     d_t += dt/v 
-                     a_t += at/v
-                     g_t += gt/v
-                     d_n += dn/v
-                     a_n += an/v
-                     g_n += gn/v
-                     d_m += dm/v
-                     a_m += am/v
-                     g_m += gm/v
-                     d_l += dl/v
-                     a_l += al/v
-                     g_l += gl/v
+                     for k, total in totals.items():
+                         size_totals[k] += total / v
                      valid_count += 1
             
             if valid_count > 0:
-                results['dijkstra_times'].append(d_t/valid_count)
-                results['astar_times'].append(a_t/valid_count)
-                results['greedy_times'].append(g_t/valid_count)
-                
-                results['dijkstra_nodes'].append(d_n/valid_count)
-                results['astar_nodes'].append(a_n/valid_count)
-                results['greedy_nodes'].append(g_n/valid_count)
-                
-                results['dijkstra_mem'].append(d_m/valid_count/1024)
-                results['astar_mem'].append(a_m/valid_count/1024)
-                results['greedy_mem'].append(g_m/valid_count/1024)
-                
-                results['dijkstra_len'].append(d_l/valid_count)
-                results['astar_len'].append(a_l/valid_count)
-                results['greedy_len'].append(g_l/valid_count)
+                append_averages(size_totals, valid_count)
             else:
-                 for k in results: 
-                    if isinstance(results[k], list) and k != 'sizes': results[k].append(0)
+                append_zeros()
+
+    results['epsilon_tradeoff'] = {
+        'epsilons': EPSILONS,
+        'cost': [total / n if n else 0 for total, _, n in tradeoff.values()],
+        'nodes': [exp / n if n else 0 for _, exp, n in tradeoff.values()],
+    }
 
     if callback: callback("Benchmark complete.")
     return results
 
 
-def plot_bar_chart(ax, sizes, data1, data2, data3, label1, label2, label3, title, ylabel):
+def compare_frontiers(graph, queries, algorithm='dijkstra', frontiers=None):
+    """
+    Runs the same (start, goal) queries with every priority queue in FRONTIERS.
+    Returns: {frontier name: {'time': total ms, 'pushes', 'pops', 'stale_pops', ...}}
+    """
+    report = {}
+    for name in frontiers or FRONTIERS:
+        finder = RouteFinder(graph, frontier=name)
+        search = getattr(finder, algorithm)
+        totals = {'time': 0.0}
+        for s, g in queries:
+            t0 = time.perf_counter()
+            search(s, g)
+            totals['time'] += (time.perf_counter() - t0) * 1000
+            for counter, value in finder.frontier_stats.items():
+                totals[counter] = totals.get(counter, 0) + value
+        report[name] = totals
+    return report
+
+
+def plot_bar_chart(ax, sizes, series, labels, title, ylabel):
     ax.clear()
     x = np.arange(len(sizes))
     width = 0.08 
     
-    rects1 = ax.bar(x - width, data1, width, label=label1)
-    rects2 = ax.bar(x, data2, width, label=label2)
-    rects3 = ax.bar(x + width, data3, width, label=label3)
+    for i, (data, label) in enumerate(zip(series, labels)):
+        ax.bar(x + (i - (len(series) - 1) / 2) * width, data, width, label=label)
     
     ax.set_title(title, fontsize=10)
     ax.set_ylabel(ylabel, fontsize=9)
@@ -184,28 +187,49 @@ def plot_bar_chart(ax, sizes, data1, data2, data3, label1, label2, label3, title
     ax.grid(True, axis='y', linestyle='--', alpha=0.7)
 
 
+def plot_epsilon_tradeoff(ax, tradeoff):
+    """Plots path cost (relative to optimal) against expanded nodes, one point per epsilon."""
+    ax.clear()
+    ax.plot(tradeoff['nodes'], tradeoff['cost'], marker='o')
+    for eps, nodes, cost in zip(tradeoff['epsilons'], tradeoff['nodes'], tradeoff['cost']):
+        ax.annotate(f"\u03b5={eps:g}", (nodes, cost), textcoords='offset points', xytext=(4, 4), fontsize=8)
+
+    ax.set_title('Weighted A* Trade-off', fontsize=10)
+    ax.set_xlabel('Nodes Expanded', fontsize=9)
+    ax.set_ylabel('Cost / Optimal Cost', fontsize=9)
+    ax.grid(True, linestyle='--', alpha=0.7)
+
+
 def plot_benchmark_data(results, axs):
     sizes = results['sizes']
-    (ax1, ax2, ax3, ax4) = axs.flatten()
+    algorithms = results['algorithms']
+    labels = [label for _, label in algorithms]
+    axes = axs.flatten()
+    (ax1, ax2, ax3, ax4) = axes[:4]
+
+    def series(metric):
+        return [results[f'{key}_{metric}'] for key, _ in algorithms]
     
-    plot_bar_chart(ax1, sizes, results['dijkstra_times'], results['astar_times'], results['greedy_times'],
-                   'Dijkstra', 'A*', 'Greedy', 'Execution Time', 'Time (ms)')
+    plot_bar_chart(ax1, sizes, series('times'), labels, 'Execution Time', 'Time (ms)')
+
+    plot_bar_chart(ax2, sizes, series('nodes'), labels, 'Search Space', 'Nodes Expanded')
 
-    plot_bar_chart(ax2, sizes, results['dijkstra_nodes'], results['astar_nodes'], results['greedy_nodes'],
-                   'Dijkstra', 'A*', 'Greedy', 'Search Space', 'Nodes Expanded')
+    plot_bar_chart(ax3, sizes, series('mem'), labels, 'Memory Usage', 'Peak Memory (KB)')
 
-    plot_bar_chart(ax3, sizes, results['dijkstra_mem'], results['astar_mem'], results['greedy_mem'],
-                   'Dijkstra', 'A*', 'Greedy', 'Memory Usage', 'Peak Memory (KB)')
+    plot_bar_chart(ax4, sizes, series('len'), labels, 'Path Length', 'Steps')
 
-    plot_bar_chart(ax4, sizes, results['dijkstra_len'], results['astar_len'], results['greedy_len'],
-                   'Dijkstra', 'A*', 'Greedy', 'Path Length', 'Steps')
+    # The trade-off chart needs a fifth axis; 2x2 layouts simply skip it
+    if len(axes) > 4 and 'epsilon_tradeoff' in results:
+        plot_epsilon_tradeoff(axes[4], results['epsilon_tradeoff'])
+        for ax in axes[5:]:
+            ax.set_visible(False)
 
 
 def run_benchmark():
     print("Running benchmarks...")
     results = get_benchmark_data(callback=print)
     
-    fig, axs = plt.subplots(2, 2, figsize=(12, 10))
+    fig, axs = plt.subplots(2, 3, figsize=(18, 10))
     plot_benchmark_data(results, axs)
     
     output_file = "benchmark_results.png"
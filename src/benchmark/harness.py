@@ -0,0 +1,264 @@
+import json
+import math
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import networkx as nx
+
+from src.core import MapGenerator, TrafficManager, RouteFinder, LandmarkHeuristic
+
+
+def summarize(samples):
+    """Returns: {'n', 'median', 'p95', 'mean', 'stddev', 'min', 'max'} of `samples`."""
+    ordered = sorted(samples)
+    n = len(ordered)
+    if n == 0:
+        return {'n': 0, 'median': 0.0, 'p95': 0.0, 'mean': 0.0, 'stddev': 0.0, 'min': 0.0, 'max': 0.0}
+    return {
+        'n': n,
+        'median': statistics.median(ordered),
+        # Nearest-rank percentile, so p95 is always an observed sample
+        'p95': ordered[max(0, math.ceil(0.95 * n) - 1)],
+        'mean': statistics.fmean(ordered),
+        'stddev': statistics.stdev(ordered) if n > 1 else 0.0,
+        'min': ordered[0],
+        'max': ordered[-1],
+    }
+
+
+def time_runs(run, warmup=1, repeat=10):
+    """
+    Calls `run()` `warmup` times untimed, then `repeat` times timed.
+    No memory tracing is active during the timed calls.
+    Returns: (samples in ms, result of the last call)
+    """
+    result = None
+    for _ in range(warmup):
+        result = run()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = run()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples, result
+
+
+def peak_memory(run):
+    """Peak traced allocation in bytes of one `run()` call, measured in its own pass."""
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def make_scenario(name, width, height, obstacles=0.2, traffic=0.3, seed=0, num_queries=10, distance=None,
+                  backend='networkx'):
+    """
+    Builds a reproducible benchmark map: the obstacle mask, traffic and
+    queries are all drawn from `seed`. Queries are sampled inside the largest
+    connected area so every one of them has a route.
+    distance: optional (low, high) bucket for the straight-line query length,
+    as fractions of the map diagonal.
+    backend: 'networkx' or 'csr'; CSRGraph maps scale to several thousand
+    cells per side, where a networkx grid no longer fits in memory.
+    Returns: {'name', 'params', 'graph', 'queries'}
+    """
+    generator = MapGenerator(width, height, obstacles, seed=seed)
+    if backend == 'csr':
+        graph = generator.generate_csr_map()
+        num_nodes, node_at = graph.number_of_nodes(), graph.node
+        in_area = _main_area_test(graph)
+    else:
+        graph = generator.generate_grid_map(vectorized=True)
+        nodes = sorted(graph.nodes())
+        num_nodes, node_at = len(nodes), nodes.__getitem__
+        area = max(nx.connected_components(graph), key=len, default=set())
+        in_area = area.__contains__
+    TrafficManager(graph, seed=seed).apply_random_traffic(traffic)
+
+    rng = random.Random(seed)
+    diagonal = math.hypot(width, height)
+    queries = []
+    for _ in range(num_queries * 100):
+        if len(queries) == num_queries or num_nodes < 2:
+            break
+        start = node_at(rng.randrange(num_nodes))
+        if not in_area(start):
+            continue
+        if distance is None:
+            goal = node_at(rng.randrange(num_nodes))
+        else:
+            # Random direction, length uniform inside the bucket
+            length = rng.uniform(*distance) * diagonal
+            angle = rng.uniform(0, 2 * math.pi)
+            goal = (round(start[0] + length * math.cos(angle)), round(start[1] + length * math.sin(angle)))
+        if goal != start and graph.has_node(goal) and in_area(goal):
+            queries.append((start, goal))
+
+    params = {'width': width, 'height': height, 'obstacles': obstacles, 'traffic': traffic,
+              'seed': seed, 'num_queries': len(queries), 'distance': list(distance) if distance else None,
+              'backend': backend}
+    return {'name': name, 'params': params, 'graph': graph, 'queries': queries}
+
+
+def _main_area_test(csr, limit=1000):
+    """
+    Membership test for the largest connected area of a big CSRGraph.
+    Above the percolation threshold there is a single giant area and every
+    other pocket is tiny, so a node belongs to it when a BFS from the node
+    reaches `limit` nodes. This avoids labelling millions of nodes.
+    """
+    offsets, neighbors, _, _ = csr.adjacency_lists()
+    limit = min(limit, csr.number_of_nodes() // 4 + 1)
+
+    def in_area(node):
+        source = csr.node_id(node)
+        seen = {source}
+        frontier = [source]
+        while frontier and len(seen) < limit:
+            node_id = frontier.pop()
+            for neighbor in neighbors[offsets[node_id]:offsets[node_id + 1]]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    frontier.append(neighbor)
+        return len(seen) >= limit
+
+    return in_area
+
+
+def benchmark_queries(graph, queries, algorithms, warmup=1, repeat=10, memory=True):
+    """
+    Benchmarks each (key, label, run) entry of `algorithms` on one map.
+    A timed sample is one pass over all queries, reported per query, so the
+    statistics measure run-to-run noise rather than query difficulty.
+    Memory peaks are taken per query in a separate, untimed pass.
+    Returns: {key: {'time_ms', 'mem_kb' summaries, 'nodes', 'len', 'cost' means}}
+    """
+    finder = RouteFinder(graph)
+    context = {}
+    # Landmark tables take several full searches, so only build them when used
+    if any(key == 'alt' for key, _, _ in algorithms):
+        # A fixed seed keeps expanded-node counts comparable between result files
+        context['landmarks'] = LandmarkHeuristic(graph, seed=0).select()
+    report = {}
+    for key, _, run in algorithms:
+        def run_all():
+            return [run(finder, s, g, context) for s, g in queries]
+
+        samples, outcomes = time_runs(run_all, warmup, repeat)
+        count = max(len(queries), 1)
+        entry = {
+            'time_ms': summarize([t / count for t in samples]),
+            'nodes': sum(exp for _, _, exp in outcomes) / count,
+            'len': sum(len(path) if path else 0 for path, _, _ in outcomes) / count,
+            'cost': sum(cost for _, cost, _ in outcomes) / count,
+        }
+        if memory:
+            entry['mem_kb'] = summarize([peak_memory(lambda: run(finder, s, g, context)) / 1024
+                                         for s, g in queries])
+        report[key] = entry
+    return report
+
+
+def parallel_throughput(graph, queries, worker_counts=(1, 2, 4), algorithm='dijkstra', warmup=1, repeat=3):
+    """
+    Queries per second of a ParallelQueryExecutor for each worker count.
+    Pool start-up and publishing the map are not timed; a sample is one
+    full `run` over `queries`.
+    Returns: {workers: summary of queries/s}
+    """
+    from src.core.parallel import ParallelQueryExecutor
+
+    report = {}
+    for workers in worker_counts:
+        with ParallelQueryExecutor(graph, max_workers=workers) as executor:
+            samples, _ = time_runs(lambda: executor.run(queries, algorithm), warmup, repeat)
+        report[workers] = summarize([len(queries) * 1000 / t for t in samples])
+    return report
+
+
+def run_suite(scenarios, algorithms=None, warmup=1, repeat=10, memory=True, callback=None):
+    """
+    Benchmarks every scenario built by `make_scenario`.
+    Returns: JSON-ready {'meta': {...}, 'scenarios': [{'name', 'params', 'algorithms'}]}
+    """
+    if algorithms is None:
+        from src.benchmark.benchmark import ALGORITHMS
+        algorithms = ALGORITHMS
+
+    results = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'warmup': warmup,
+            'repeat': repeat,
+        },
+        'scenarios': [],
+    }
+    for scenario in scenarios:
+        if callback: callback(f"Benchmarking {scenario['name']}...")
+        report = benchmark_queries(scenario['graph'], scenario['queries'], algorithms, warmup, repeat, memory)
+        results['scenarios'].append({'name': scenario['name'], 'params': scenario['params'], 'algorithms': report})
+    return results
+
+
+def save_results(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(baseline, candidate, threshold=0.10):
+    """
+    Compares two result files scenario by scenario and algorithm by algorithm.
+    A time regression is a median slowdown above `threshold` that also lands
+    above the baseline p95, so ordinary noise is not flagged. A change in
+    expanded nodes is reported separately since it means behavior changed.
+    Returns: list of rows {'scenario', 'algorithm', 'base_ms', 'new_ms', 'ratio',
+    'base_nodes', 'new_nodes', 'status'} with status 'regression',
+    'improvement', 'changed' or 'ok'.
+    """
+    base = {s['name']: s['algorithms'] for s in baseline['scenarios']}
+    rows = []
+    for scenario in candidate['scenarios']:
+        old_algorithms = base.get(scenario['name'], {})
+        for key, new in scenario['algorithms'].items():
+            old = old_algorithms.get(key)
+            if old is None:
+                continue
+            base_ms, new_ms = old['time_ms']['median'], new['time_ms']['median']
+            ratio = new_ms / base_ms if base_ms else 1.0
+            if ratio > 1 + threshold and new_ms > old['time_ms']['p95']:
+                status = 'regression'
+            elif ratio < 1 - threshold and new['time_ms']['p95'] < base_ms:
+                status = 'improvement'
+            elif not math.isclose(old['nodes'], new['nodes'], rel_tol=1e-9):
+                status = 'changed'
+            else:
+                status = 'ok'
+            rows.append({'scenario': scenario['name'], 'algorithm': key, 'base_ms': base_ms, 'new_ms': new_ms,
+                         'ratio': ratio, 'base_nodes': old['nodes'], 'new_nodes': new['nodes'], 'status': status})
+    return rows
+
+
+def print_comparison(rows):
+    print("-" * 92)
+    print(f"{'Scenario':<22}{'Algorithm':<12}{'Base (ms)':>12}{'New (ms)':>12}{'Ratio':>8}"
+          f"{'Base nodes':>12}{'New nodes':>12}  Status")
+    print("-" * 92)
+    for row in rows:
+        print(f"{row['scenario']:<22}{row['algorithm']:<12}{row['base_ms']:>12.4f}{row['new_ms']:>12.4f}"
+              f"{row['ratio']:>8.2f}{row['base_nodes']:>12.0f}{row['new_nodes']:>12.0f}  {row['status']}")
+    print("-" * 92)
@@ -0,0 +1,150 @@
+import itertools
+import math
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from src.benchmark.harness import make_scenario, benchmark_queries
+
+# Default size ladder (cells per side) and query-distance buckets
+# (straight-line length as a fraction of the map diagonal). Larger CSR maps
+# fit in memory, but a pure-Python search there takes seconds per query, so
+# sizes past 800 are left to an explicit --sizes.
+SIZE_LADDER = [50, 100, 200, 400, 800]
+DISTANCE_BUCKETS = {'short': (0.0, 0.1), 'medium': (0.1, 0.3), 'long': (0.3, 0.7)}
+SCALING_METRICS = ['time_ms', 'nodes', 'mem_kb']
+
+
+def build_corpus(sizes=None, obstacles=(0.2,), traffic=(0.3,), buckets=None, seeds=(0,), num_queries=10):
+    """
+    Lists the scenario specs of a sweep: every size x obstacle density x
+    traffic intensity x distance bucket x seed. Specs are plain dicts, so a
+    corpus can be saved as JSON and replayed exactly with scenario_from_spec.
+    """
+    buckets = DISTANCE_BUCKETS if buckets is None else buckets
+    corpus = []
+    for size, obstacle, intensity, (bucket, distance), seed in itertools.product(
+            sizes or SIZE_LADDER, obstacles, traffic, buckets.items(), seeds):
+        corpus.append({
+            'name': f"{size}x{size} o{obstacle:g} t{intensity:g} {bucket} s{seed}",
+            'group': f"o{obstacle:g} t{intensity:g} {bucket}",
+            'size': size, 'obstacles': obstacle, 'traffic': intensity,
+            'bucket': bucket, 'distance': list(distance), 'seed': seed, 'num_queries': num_queries,
+        })
+    return corpus
+
+
+def scenario_from_spec(spec, backend='csr'):
+    return make_scenario(spec['name'], spec['size'], spec['size'], spec['obstacles'], spec['traffic'],
+                         spec['seed'], spec['num_queries'], tuple(spec['distance']), backend)
+
+
+def fit_scaling(xs, ys):
+    """
+    Least-squares power law y = a * x^b in log-log space.
+    Returns: {'a', 'b'} or None with fewer than two positive points.
+    """
+    points = [(x, y) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len(set(x for x, _ in points)) < 2:
+        return None
+    log_x, log_y = np.log([x for x, _ in points]), np.log([y for _, y in points])
+    b, log_a = np.polyfit(log_x, log_y, 1)
+    return {'a': float(math.exp(log_a)), 'b': float(b)}
+
+
+def run_scaling(corpus, algorithms, warmup=1, repeat=3, memory=True, budget_ms=None, backend='csr',
+                callback=None):
+    """
+    Benchmarks a corpus in increasing map size. An algorithm whose median
+    query time exceeds `budget_ms` at one size is not run on larger maps of
+    the same group; that size is reported as where it stops being usable.
+    Returns: {'scenarios': [...], 'fits': {group: {algorithm: {metric: fit}}},
+    'limits': {group: {algorithm: size}}}
+    """
+    scenarios = []
+    limits = {}
+    for spec in sorted(corpus, key=lambda spec: spec['size']):
+        stopped = limits.setdefault(spec['group'], {})
+        active = [entry for entry in algorithms if entry[0] not in stopped]
+        if not active:
+            continue
+        if callback: callback(f"Benchmarking {spec['name']}...")
+        scenario = scenario_from_spec(spec, backend)
+        if not scenario['queries']:
+            continue
+        report = benchmark_queries(scenario['graph'], scenario['queries'], active, warmup, repeat, memory)
+        nodes = scenario['graph'].number_of_nodes()
+        scenarios.append({'name': spec['name'], 'group': spec['group'], 'size': spec['size'],
+                          'graph_nodes': nodes, 'params': scenario['params'], 'algorithms': report})
+
+        if budget_ms is not None:
+            for key, entry in report.items():
+                if entry['time_ms']['median'] > budget_ms:
+                    stopped[key] = spec['size']
+
+    return {'scenarios': scenarios, 'fits': fit_groups(scenarios), 'limits': limits}
+
+
+def fit_groups(scenarios):
+    """Fits every metric of every algorithm against graph size, per sweep group
+    (seeds of the same size are averaged by the fit itself)."""
+    fits = {}
+    for scenario in scenarios:
+        for key, entry in scenario['algorithms'].items():
+            series = fits.setdefault(scenario['group'], {}).setdefault(key, {m: ([], []) for m in SCALING_METRICS})
+            for metric in SCALING_METRICS:
+                if metric in entry:
+                    value = entry[metric]['median'] if isinstance(entry[metric], dict) else entry[metric]
+                    series[metric][0].append(scenario['graph_nodes'])
+                    series[metric][1].append(value)
+    return {group: {key: {metric: fit_scaling(xs, ys) for metric, (xs, ys) in series.items()}
+                    for key, series in algorithms.items()}
+            for group, algorithms in fits.items()}
+
+
+def usable_size(fit, budget):
+    """Graph size (nodes) where the fitted curve reaches `budget`, or None."""
+    if not fit or fit['b'] <= 0:
+        return None
+    return (budget / fit['a']) ** (1 / fit['b'])
+
+
+def print_scaling(results, budget_ms=None):
+    print("-" * 96)
+    print(f"{'Group':<24}{'Algorithm':<12}{'time ~ V^b':>12}{'nodes ~ V^b':>13}{'mem ~ V^b':>12}"
+          f"{'Stopped at':>12}{'Budget at V':>14}")
+    print("-" * 96)
+    for group, algorithms in results['fits'].items():
+        for key, fits in algorithms.items():
+            exponents = [f"{fits[m]['b']:.2f}" if fits.get(m) else '-' for m in SCALING_METRICS]
+            stopped = results['limits'].get(group, {}).get(key, '-')
+            limit = usable_size(fits.get('time_ms'), budget_ms) if budget_ms else None
+            print(f"{group:<24}{key:<12}{exponents[0]:>12}{exponents[1]:>13}{exponents[2]:>12}"
+                  f"{str(stopped):>12}{(f'{limit:,.0f}' if limit else '-'):>14}")
+    print("-" * 96)
+
+
+def plot_scaling(results, output_file):
+    """Log-log plot of median query time and expanded nodes against graph size."""
+    fig, axs = plt.subplots(1, 2, figsize=(14, 6))
+    for group in results['fits']:
+        for key in results['fits'][group]:
+            points = sorted(((s['graph_nodes'], s['algorithms'][key]) for s in results['scenarios']
+                             if s['group'] == group and key in s['algorithms']), key=lambda point: point[0])
+            xs = [x for x, _ in points]
+            axs[0].plot(xs, [entry['time_ms']['median'] for _, entry in points], marker='o', label=f"{key} {group}")
+            axs[1].plot(xs, [entry['nodes'] for _, entry in points], marker='o', label=f"{key} {group}")
+
+    for ax, title, ylabel in ((axs[0], 'Query Time', 'Median time per query (ms)'),
+                              (axs[1], 'Search Space', 'Nodes expanded per query')):
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_title(title, fontsize=10)
+        ax.set_xlabel('Graph nodes', fontsize=9)
+        ax.set_ylabel(ylabel, fontsize=9)
+        ax.legend(fontsize=7)
+        ax.grid(True, which='both', linestyle='--', alpha=0.5)
+
+    plt.tight_layout()
+    plt.savefig(output_file)
+    plt.close(fig)
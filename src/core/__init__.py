@@ -1,7 +1,32 @@
 # Core modules: algorithms, map generation, traffic, visualization
 from src.core.graph_loader import MapGenerator
+from src.core.csr_graph import CSRGraph
 from src.core.algorithms import RouteFinder
+from src.core.search_stats import SearchStats
 from src.core.traffic import TrafficManager
+from src.core.traffic_feed import TrafficFeed
+from src.core.contraction import ContractionHierarchy
+from src.core.landmarks import LandmarkHeuristic
+from src.core.hierarchical import HierarchicalPlanner
+from src.core.parallel import ParallelQueryExecutor
+from src.core.incremental import DStarLite
+from src.core.route_cache import RouteCache
+from src.core.facilities import FacilityIndex
 from src.core.visualizer import Visualizer
 
-__all__ = ['MapGenerator', 'RouteFinder', 'TrafficManager', 'Visualizer']
+__all__ = [
+    'MapGenerator',
+    'CSRGraph',
+    'RouteFinder',
+    'SearchStats',
+    'TrafficManager',
+    'TrafficFeed',
+    'ContractionHierarchy',
+    'LandmarkHeuristic',
+    'HierarchicalPlanner',
+    'ParallelQueryExecutor',
+    'DStarLite',
+    'RouteCache',
+    'FacilityIndex',
+    'Visualizer',
+]
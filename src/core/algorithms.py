@@ -1,138 +1,1081 @@
 import heapq
 import math
+import random
+import time
+import numpy as np
+
+from src.core.csr_graph import CSRGraph
+from src.core.frontier import FRONTIERS, BinaryHeapFrontier
+from src.core.search_stats import SearchStats
+from src.core.workspace import WorkspacePool
+
+# jump_point_search arrival flag of a node expanded in every direction (the start)
+_ANY_DIRECTION = 16
+# jump_point_search stops a straight run after this many cells and treats the
+# last one as a jump point; unbounded runs scan most of an open map per query
+_JUMP_LIMIT = 8
+
 
 class RouteFinder:
-    def __init__(self, graph):
+    def __init__(self, graph, frontier='binary', stats='off'):
+        """
+        frontier: priority queue used by dijkstra, a_star and greedy_bfs; a
+        name from FRONTIERS ('binary', 'radix', 'indexed') or a class with the
+        same push/pop interface. 'binary', the default, runs heapq inlined in
+        the search loops, which avoids a method call per push and pop; the
+        other frontiers go through their objects. Counters of the last search
+        are kept in `frontier_stats`.
+        stats: SearchStats mode ('off', 'counters', 'trace') of every search
+        (ara_star, jump_point_search and the one-to-many / many-to-many /
+        nearest-facility searches included); the last search is described by
+        `self.stats`. 'off', the default, keeps the degree sums behind the
+        relaxation counts out of plain routing queries.
+        Those searches keep their per-node state in SearchWorkspaces from
+        `self.workspaces`, reused across queries (one per thread at a time),
+        so a query only pays for the nodes it touches.
+        """
         self.graph = graph
+        self.csr = graph if isinstance(graph, CSRGraph) else None
+        self.frontier = FRONTIERS[frontier] if isinstance(frontier, str) else frontier
+        self.frontier_stats = {}
+        self.stats = SearchStats(stats)
+        self.workspaces = WorkspacePool(self.csr)
+        self._grid = None
 
     def dijkstra(self, start, goal, step_callback=None):
         """
         Dijkstra's Algorithm.
         Returns: (path, cost, expanded_nodes)
         """
-        priority_queue = [(0, start)]
-        distances = {node: float('inf') for node in self.graph.nodes()}
+        started = time.perf_counter()
+        self.stats.reset('dijkstra')
+        step_callback = self.stats.traced(step_callback)
+        edges, to_key, to_node, _ = self._search_view()
+        start, goal = to_key(start), to_key(goal)
+        if self.frontier is not BinaryHeapFrontier:
+            return self._frontier_search(edges, start, goal, to_node, step_callback, started,
+                                         lambda g, node: g)
+
+        priority_queue = [(0, 0, start)]
+        workspace = self.workspaces.acquire()
+        generation = workspace.generation
+        distances, parents = workspace.dist, workspace.parent
+        seen, visited = workspace.seen, workspace.closed
+        seen_stamp, closed_stamp = workspace.seen_stamp, workspace.closed_stamp
+        close = workspace.expanded.append
         distances[start] = 0
-        parents = {start: None}
+        parents[start] = None
+        seen[start] = generation
         expanded_nodes = 0
-        
-        visited = set()
+        pushes, peak_size = 1, 1
+        searching = time.perf_counter()
 
         while priority_queue:
-            current_dist, current_node = heapq.heappop(priority_queue)
+            current_dist, _, current_node = heapq.heappop(priority_queue)
 
-            if current_node in visited:
+            if closed_stamp(current_node) == generation:
                 continue
-            
-            visited.add(current_node)
+
+            visited[current_node] = generation
+            close(current_node)
             expanded_nodes += 1
-            
-            if step_callback: step_callback(current_node)
+
+            if step_callback: step_callback(to_node(current_node))
 
             if current_node == goal:
-                return self._reconstruct_path(parents, goal), current_dist, expanded_nodes
+                searched = time.perf_counter()
+                path = self._reconstruct_path(parents, goal)
+                self._finish_search(self._heap_stats(pushes, priority_queue, expanded_nodes, peak_size),
+                                    expanded_nodes, [workspace], goal, (started, searching, searched))
+                return path, current_dist, expanded_nodes
 
-            for neighbor in self.graph.neighbors(current_node):
-                edge_data = self.graph[current_node][neighbor]
-                weight = edge_data.get('weight', 1.0) * edge_data.get('traffic_factor', 1.0)
+            for neighbor, weight in edges(current_node):
                 new_dist = current_dist + weight
 
-                if new_dist < distances[neighbor]:
+                # A node not seen in this generation holds a stale cost: treat it as inf
+                if seen_stamp(neighbor) != generation or new_dist < distances[neighbor]:
+                    seen[neighbor] = generation
                     distances[neighbor] = new_dist
                     parents[neighbor] = current_node
-                    heapq.heappush(priority_queue, (new_dist, neighbor))
-        
+                    pushes += 1
+                    heapq.heappush(priority_queue, (new_dist, pushes, neighbor))
+
+            if len(priority_queue) > peak_size:
+                peak_size = len(priority_queue)
+
+        self._finish_search(self._heap_stats(pushes, priority_queue, expanded_nodes, peak_size),
+                            expanded_nodes, [workspace], None, (started, searching, time.perf_counter()))
         return None, float('inf'), expanded_nodes
 
-    def a_star(self, start, goal, step_callback=None):
+    def a_star(self, start, goal, step_callback=None, heuristic=None, epsilon=1.0):
         """
         A* Algorithm.
+        heuristic: optional callable h((x, y), (x, y)) replacing the Euclidean
+        distance, e.g. a LandmarkHeuristic. It must never overestimate.
+        epsilon: weighted A* (f = g + epsilon * h). With an admissible
+        heuristic the returned cost is at most epsilon times the optimum.
         Returns: (path, cost, expanded_nodes)
         """
-        priority_queue = [(0, start)]
-        visited = set()
-        
-        g_scores = {node: float('inf') for node in self.graph.nodes()}
+        started = time.perf_counter()
+        self.stats.reset('a_star')
+        step_callback = self.stats.traced(step_callback)
+        edges, to_key, to_node, xy = self._search_view()
+        start, goal = to_key(start), to_key(goal)
+        goal_xy = xy(goal)
+        heuristic = heuristic or self._heuristic
+        if self.frontier is not BinaryHeapFrontier:
+            return self._frontier_search(edges, start, goal, to_node, step_callback, started,
+                                         lambda g, node: g + epsilon * heuristic(xy(node), goal_xy))
+
+        priority_queue = [(0, 0, start)]
+        workspace = self.workspaces.acquire()
+        generation = workspace.generation
+        g_scores, parents = workspace.dist, workspace.parent
+        seen, visited = workspace.seen, workspace.closed
+        seen_stamp, closed_stamp = workspace.seen_stamp, workspace.closed_stamp
+        close = workspace.expanded.append
         g_scores[start] = 0
-        parents = {start: None}
+        parents[start] = None
+        seen[start] = generation
         expanded_nodes = 0
+        pushes, peak_size = 1, 1
+        searching = time.perf_counter()
 
         while priority_queue:
-            _, current_node = heapq.heappop(priority_queue)
+            _, _, current_node = heapq.heappop(priority_queue)
 
-            if current_node in visited:
+            if closed_stamp(current_node) == generation:
                 continue
 
-            visited.add(current_node)
+            visited[current_node] = generation
+            close(current_node)
             expanded_nodes += 1
 
-            if step_callback: step_callback(current_node)
+            if step_callback: step_callback(to_node(current_node))
 
             if current_node == goal:
-               return self._reconstruct_path(parents, goal), g_scores[current_node], expanded_nodes
+               searched = time.perf_counter()
+               path = self._reconstruct_path(parents, goal)
+               cost = self._chain_cost(edges, parents, goal)
+               self._finish_search(self._heap_stats(pushes, priority_queue, expanded_nodes, peak_size),
+                                   expanded_nodes, [workspace], goal, (started, searching, searched))
+               return path, cost, expanded_nodes
 
-            for neighbor in self.graph.neighbors(current_node):
-                edge_data = self.graph[current_node][neighbor]
-                weight = edge_data.get('weight', 1.0) * edge_data.get('traffic_factor', 1.0)
-                
-                tentative_g = g_scores[current_node] + weight
+            current_g = g_scores[current_node]
+            for neighbor, weight in edges(current_node):
+                tentative_g = current_g + weight
 
-                if tentative_g < g_scores[neighbor]:
+                if seen_stamp(neighbor) != generation or tentative_g < g_scores[neighbor]:
+                    seen[neighbor] = generation
                     g_scores[neighbor] = tentative_g
                     parents[neighbor] = current_node
-                    f_score = tentative_g + self._heuristic(neighbor, goal)
-                    heapq.heappush(priority_queue, (f_score, neighbor))
-        
+                    f_score = tentative_g + epsilon * heuristic(xy(neighbor), goal_xy)
+                    pushes += 1
+                    heapq.heappush(priority_queue, (f_score, pushes, neighbor))
+
+            if len(priority_queue) > peak_size:
+                peak_size = len(priority_queue)
+
+        self._finish_search(self._heap_stats(pushes, priority_queue, expanded_nodes, peak_size),
+                            expanded_nodes, [workspace], None, (started, searching, time.perf_counter()))
         return None, float('inf'), expanded_nodes
 
+    def ara_star(self, start, goal, deadline=None, epsilon=3.0, epsilon_step=0.5, step_callback=None,
+                 heuristic=None):
+        """
+        Anytime Repairing A* (ARA*).
+        Runs weighted A* with a falling epsilon, reusing the search effort of the
+        previous round. The first path is always returned; later rounds run
+        while `deadline` (seconds from the call) has not passed.
+        Yields: (path, cost, expanded_nodes, bound) after every round; the cost
+        never increases and `bound` guarantees cost <= bound * optimal cost.
+        self.stats covers every round so far at each yield.
+        """
+        started = time.perf_counter()
+        self.stats.reset('ara_star')
+        step_callback = self.stats.traced(step_callback)
+        edges, to_key, to_node, xy = self._search_view()
+        start, goal = to_key(start), to_key(goal)
+        goal_xy = xy(goal)
+        heuristic = heuristic or self._heuristic
+        stop_at = time.perf_counter() + deadline if deadline is not None else float('inf')
+
+        h_cache = {}
+
+        def h(node):
+            value = h_cache.get(node)
+            if value is None:
+                value = h_cache[node] = heuristic(xy(node), goal_xy)
+            return value
+
+        g_scores = self._new_distances()
+        g_scores[start] = 0
+        parents = {start: None}
+        open_f = {start: epsilon * h(start)}
+        queue = [(open_f[start], 0, start)]
+        pushes, pops, peak_size = 1, 0, 1
+        closed, incons = set(), set()
+        expanded = []
+        expanded_nodes = 0
+        searching = time.perf_counter()
+
+        def improve_path(first_round):
+            nonlocal expanded_nodes, pushes, pops, peak_size
+            while queue:
+                f_score, _, current_node = queue[0]
+                if open_f.get(current_node) != f_score:
+                    heapq.heappop(queue)
+                    pops += 1
+                    continue
+                if g_scores[goal] <= f_score:
+                    return True
+                if not first_round and time.perf_counter() > stop_at:
+                    return False
+
+                heapq.heappop(queue)
+                pops += 1
+                del open_f[current_node]
+                closed.add(current_node)
+                expanded.append(current_node)
+                expanded_nodes += 1
+                if step_callback: step_callback(to_node(current_node))
+
+                for neighbor, weight in edges(current_node):
+                    tentative_g = g_scores[current_node] + weight
+                    if tentative_g < g_scores[neighbor]:
+                        g_scores[neighbor] = tentative_g
+                        parents[neighbor] = current_node
+                        if neighbor in closed:
+                            incons.add(neighbor)
+                        else:
+                            open_f[neighbor] = tentative_g + epsilon * h(neighbor)
+                            pushes += 1
+                            heapq.heappush(queue, (open_f[neighbor], pushes, neighbor))
+                if len(queue) > peak_size:
+                    peak_size = len(queue)
+            return True
+
+        def record():
+            # Rounds after the first reseed the queue from OPEN: those pushes improve nothing
+            self.stats.record('ara_star', expanded_nodes,
+                              {'pushes': pushes, 'pops': expanded_nodes, 'stale_pops': pops - expanded_nodes,
+                               'peak_size': peak_size, 'seeds': seeds},
+                              self._scanned_arcs(expanded) if self.stats.enabled else 0,
+                              (started, searching, time.perf_counter()))
+
+        first_round = True
+        seeds = 1
+        best_path, best_cost = None, float('inf')
+        while True:
+            if not improve_path(first_round):
+                return
+            first_round = False
+            if g_scores[goal] == float('inf'):
+                record()
+                yield None, float('inf'), expanded_nodes, 1.0
+                return
+            # Nodes improved after their expansion wait in INCONS with their
+            # successors' g not yet lowered, so the parent chain can be cheaper than g
+            cost = self._chain_cost(edges, parents, goal)
+            if cost < best_cost:
+                best_path, best_cost = self._reconstruct_path(parents, goal), cost
+
+            # min(g + h) over the unexpanded frontier is a lower bound on the optimum
+            frontier = [g_scores[node] + h(node) for node in open_f]
+            frontier.extend(g_scores[node] + h(node) for node in incons)
+            lower = min(frontier, default=cost)
+            bound = max(1.0, min(epsilon, best_cost / lower if lower > 0 else epsilon))
+            record()
+            yield best_path, best_cost, expanded_nodes, bound
+
+            if bound <= 1.0 or time.perf_counter() > stop_at:
+                return
+            epsilon = max(1.0, epsilon - epsilon_step)
+            for node in incons:
+                open_f[node] = 0
+            incons.clear()
+            closed.clear()
+            for node in open_f:
+                open_f[node] = g_scores[node] + epsilon * h(node)
+            queue = []
+            for node, f_score in open_f.items():
+                pushes += 1
+                queue.append((f_score, pushes, node))
+            seeds += len(queue)
+            heapq.heapify(queue)
+
     def greedy_bfs(self, start, goal, step_callback=None):
         """
         Greedy Best-First Search.
         Uses heuristic only: f(n) = h(n)
         Returns: (path, cost, expanded_nodes)
         """
-        queue = [(0, start)] 
-        visited = set()
-        parents = {start: None}
+        started = time.perf_counter()
+        self.stats.reset('greedy_bfs')
+        step_callback = self.stats.traced(step_callback)
+        edges, to_key, to_node, xy = self._search_view()
+        start, goal = to_key(start), to_key(goal)
+        goal_xy = xy(goal)
+        heuristic = self._heuristic
+        if self.frontier is not BinaryHeapFrontier:
+            return self._frontier_search(edges, start, goal, to_node, step_callback, started,
+                                         lambda g, node: heuristic(xy(node), goal_xy), greedy=True)
+
+        priority_queue = [(0, 0, start)]
+        workspace = self.workspaces.acquire()
+        generation = workspace.generation
+        # A node keeps the parent it was first reached from, so its cost is final then
+        costs, parents = workspace.dist, workspace.parent
+        seen, visited = workspace.seen, workspace.closed
+        seen_stamp, closed_stamp = workspace.seen_stamp, workspace.closed_stamp
+        close = workspace.expanded.append
+        costs[start] = 0
+        parents[start] = None
+        seen[start] = generation
         expanded_nodes = 0
-        
-        while queue:
-            _, current_node = heapq.heappop(queue)
+        pushes, peak_size = 1, 1
+        searching = time.perf_counter()
+
+        while priority_queue:
+            _, _, current_node = heapq.heappop(priority_queue)
 
-            if current_node in visited:
+            if closed_stamp(current_node) == generation:
                 continue
 
-            visited.add(current_node)
+            visited[current_node] = generation
+            close(current_node)
             expanded_nodes += 1
 
-            if step_callback: step_callback(current_node)
+            if step_callback: step_callback(to_node(current_node))
 
             if current_node == goal:
+               searched = time.perf_counter()
                path = self._reconstruct_path(parents, goal)
+               self._finish_search(self._heap_stats(pushes, priority_queue, expanded_nodes, peak_size),
+                                   expanded_nodes, [workspace], goal, (started, searching, searched))
+               return path, costs[goal], expanded_nodes
+
+            current_cost = costs[current_node]
+            for neighbor, weight in edges(current_node):
+                # Every expanded node was seen first, so this also skips visited ones
+                if seen_stamp(neighbor) != generation:
+                    seen[neighbor] = generation
+                    costs[neighbor] = current_cost + weight
+                    parents[neighbor] = current_node
+                    pushes += 1
+                    heapq.heappush(priority_queue, (heuristic(xy(neighbor), goal_xy), pushes, neighbor))
+
+            if len(priority_queue) > peak_size:
+                peak_size = len(priority_queue)
+
+        self._finish_search(self._heap_stats(pushes, priority_queue, expanded_nodes, peak_size),
+                            expanded_nodes, [workspace], None, (started, searching, time.perf_counter()))
+        return None, float('inf'), expanded_nodes
+
+    def bidirectional_dijkstra(self, start, goal, step_callback=None):
+        """
+        Bidirectional Dijkstra.
+        Grows one search from start and one from goal and stops once the two
+        frontiers prove no shorter meeting point is left.
+        Returns: (path, cost, expanded_nodes)
+        """
+        return self._bidirectional_search(start, goal, False, step_callback)
+
+    def bidirectional_a_star(self, start, goal, step_callback=None):
+        """
+        Bidirectional A* with average potentials:
+        p(n) = (h(n, goal) - h(start, n)) / 2 forward, -p(n) backward.
+        Returns: (path, cost, expanded_nodes)
+        """
+        return self._bidirectional_search(start, goal, True, step_callback)
+
+    def _bidirectional_search(self, start, goal, use_potential, step_callback):
+        started = time.perf_counter()
+        self.stats.reset('bidirectional_a_star' if use_potential else 'bidirectional_dijkstra')
+        step_callback = self.stats.traced(step_callback)
+        edges, to_key, to_node, xy = self._search_view()
+        start, goal = to_key(start), to_key(goal)
+
+        potential = None
+        if use_potential:
+            start_xy, goal_xy = xy(start), xy(goal)
+            heuristic = self._heuristic
+
+            def potential(node):
+                node_xy = xy(node)
+                return (heuristic(node_xy, goal_xy) - heuristic(start_xy, node_xy)) / 2
+
+        # Index 0 is the forward search, index 1 the backward search
+        workspaces = (self.workspaces.acquire(), self.workspaces.acquire())
+        generations = (workspaces[0].generation, workspaces[1].generation)
+        for workspace, root in zip(workspaces, (start, goal)):
+            workspace.dist[root] = 0
+            workspace.parent[root] = None
+            workspace.seen[root] = workspace.generation
+        sign = (1, -1)
+        queues = ([(potential(start) if potential else 0, 0, start)],
+                  [(-potential(goal) if potential else 0, 1, goal)])
+        best_cost, meeting_node = (0, start) if start == goal else (float('inf'), None)
+        expanded_nodes = 0
+        pushes, pops, peak_size = 2, 0, 2
+        searching = time.perf_counter()
+
+        while queues[0] and queues[1]:
+            if queues[0][0][0] + queues[1][0][0] >= best_cost:
+                break
+
+            side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+            _, _, current_node = heapq.heappop(queues[side])
+            pops += 1
+
+            own, other = workspaces[side], workspaces[1 - side]
+            own_generation, other_generation = generations[side], generations[1 - side]
+            if own.closed_stamp(current_node) == own_generation:
+                continue
+
+            own.closed[current_node] = own_generation
+            own.expanded.append(current_node)
+            expanded_nodes += 1
+
+            if step_callback: step_callback(to_node(current_node))
+
+            own_dist, own_seen, own_parents = own.dist, own.seen, own.parent
+            own_stamp, other_stamp, other_dist = own.seen_stamp, other.seen_stamp, other.dist
+            current_dist = own_dist[current_node]
+            for neighbor, weight in edges(current_node):
+                new_dist = current_dist + weight
+
+                if own_stamp(neighbor) != own_generation or new_dist < own_dist[neighbor]:
+                    own_seen[neighbor] = own_generation
+                    own_dist[neighbor] = new_dist
+                    own_parents[neighbor] = current_node
+                    key = new_dist + sign[side] * potential(neighbor) if potential else new_dist
+                    pushes += 1
+                    heapq.heappush(queues[side], (key, pushes, neighbor))
+
+                if other_stamp(neighbor) == other_generation and new_dist + other_dist[neighbor] < best_cost:
+                    best_cost = new_dist + other_dist[neighbor]
+                    meeting_node = neighbor
+
+            # Heap entries include stale ones, as in the other inlined heapq searches
+            size = len(queues[0]) + len(queues[1])
+            if size > peak_size:
+                peak_size = size
+
+        searched = time.perf_counter()
+        path = None
+        if meeting_node is not None:
+            path = self._reconstruct_path(workspaces[0].parent, meeting_node)
+            backward = self._reconstruct_path(workspaces[1].parent, meeting_node)
+            path = path + backward[-2::-1]
+        frontier_stats = {'pushes': pushes, 'pops': expanded_nodes, 'stale_pops': pops - expanded_nodes,
+                          'peak_size': peak_size, 'seeds': 2}
+        self._finish_search(frontier_stats, expanded_nodes, workspaces, None, (started, searching, searched))
+        if path is None:
+            return None, float('inf'), expanded_nodes
+        return path, best_cost, expanded_nodes
+
+    def jump_point_search(self, start, goal, step_callback=None, uniform_cost=1.0, max_congestion=0.02):
+        """
+        Jump Point Search for 4-connected grid maps.
+        Among equal-cost paths over roads of cost `uniform_cost`, only those
+        that turn vertical as early as possible are kept; straight runs between
+        decision points are jumped over without touching the heap. A turn is
+        only pruned when the detour around it is made of uniform roads, so
+        cells next to congested roads are expanded normally and the result
+        stays optimal under traffic.
+        Congested roads force extra jump points, so once more than
+        `max_congestion` of the roads (estimated from a fixed sample) are
+        off `uniform_cost` the query is answered by a_star instead.
+        Returns: (path, cost, expanded_nodes)
+        """
+        started = time.perf_counter()
+        step, arc, cost_of, sample, to_id, to_node = self._grid_tables()
+        if sample and sum(cost_of(a) != uniform_cost for a in sample) > max_congestion * len(sample):
+            return self.a_star(start, goal, step_callback)
+
+        self.stats.reset('jump_point_search')
+        step_callback = self.stats.traced(step_callback)
+        start, goal = to_id(start), to_id(goal)
+        goal_xy = to_node(goal)
+        heuristic = self._heuristic
+        inf = float('inf')
+        scans = {}
+
+        def forced(node, h, v):
+            # Reached along direction h from p: the turn to m = node+v is needed
+            # unless p -> q -> m through q = p+v is an equal-cost uniform detour
+            m = step[v][node]
+            if m < 0:
+                return False
+            back = step[h ^ 1][node]
+            q = step[v][back]
+            if q < 0 or step[h][q] != m:
+                return True
+            return not (cost_of(arc[h][back]) == cost_of(arc[v][node]) == cost_of(arc[v][back])
+                        == cost_of(arc[h][q]) == uniform_cost)
+
+        def jump_horizontal(node, h):
+            """Runs along h (0: +x, 1: -x) from node to the next jump point:
+            (node, cost) or None. Memoized per cell, since every vertical run
+            probes both sides of each cell it passes."""
+            ahead, ahead_arc = step[h], arc[h]
+            chain = []
+            key = 2 * node + h
+            while True:
+                if key in scans:
+                    result = scans[key]
+                    break
+                nxt = ahead[node]
+                if nxt < 0:
+                    result = None
+                    break
+                chain.append((key, cost_of(ahead_arc[node])))
+                if nxt == goal or len(chain) >= _JUMP_LIMIT or forced(nxt, h, 2) or forced(nxt, h, 3):
+                    result = (nxt, 0.0)
+                    break
+                node = nxt
+                key = 2 * node + h
+            for key, cost in reversed(chain):
+                if result is not None:
+                    result = (result[0], result[1] + cost)
+                scans[key] = result
+            return result
+
+        def jump_vertical(node, v, found):
+            """Runs along v (2: +y, 3: -y). Vertical cells are not pushed: the
+            horizontal jump points seen from each of them are added to `found`
+            directly as (node, cost, arrival, turn_cell) successors. A run is
+            cut after _JUMP_LIMIT cells and its last cell queued to go on later."""
+            ahead, ahead_arc = step[v], arc[v]
+            cost = 0.0
+            for _ in range(_JUMP_LIMIT):
+                nxt = ahead[node]
+                if nxt < 0:
+                    return
+                cost += cost_of(ahead_arc[node])
+                node = nxt
+                if node == goal:
+                    found.append((node, cost, _ANY_DIRECTION, -1))
+                    return
+                for h in (0, 1):
+                    result = jump_horizontal(node, h)
+                    if result is not None:
+                        found.append((result[0], cost + result[1], 1 << h, node))
+            if ahead[node] >= 0:
+                found.append((node, cost, 1 << v, -1))
+
+        # Nodes are keyed alone; `arrivals` holds the directions a node was
+        # reached from at its best g (bit h for a horizontal arrival along h,
+        # _ANY_DIRECTION for the start). Equal-cost arrivals from another
+        # direction are merged in, and re-queued if the node was expanded.
+        g_scores, parents = {start: 0.0}, {start: None}
+        arrivals, expanded_arrivals = {start: _ANY_DIRECTION}, {}
+        priority_queue = [(0.0, 0, 0.0, start)]
+        expanded_nodes = 0
+        pushes, pops, peak_size, relaxations = 1, 0, 1, 0
+        searching = time.perf_counter()
+
+        while priority_queue:
+            _, _, g, current_node = heapq.heappop(priority_queue)
+            pops += 1
+            pending = arrivals[current_node] & ~expanded_arrivals.get(current_node, 0)
+            if g != g_scores[current_node] or not pending:
+                continue
+            expanded_arrivals[current_node] = expanded_arrivals.get(current_node, 0) | pending
+            expanded_nodes += 1
+
+            if step_callback: step_callback(to_node(current_node))
+
+            if current_node == goal:
+                searched = time.perf_counter()
+                path = self._expand_jumps(parents, goal, step, to_node)
+                self._finish_search({'pushes': pushes, 'pops': expanded_nodes, 'stale_pops': pops - expanded_nodes,
+                                     'peak_size': peak_size}, expanded_nodes, [], goal,
+                                    (started, searching, searched), relaxations)
+                return path, g, expanded_nodes
+
+            found = []
+            if pending & _ANY_DIRECTION:
+                for h in (0, 1):
+                    result = jump_horizontal(current_node, h)
+                    if result is not None:
+                        found.append((result[0], result[1], 1 << h, -1))
+                jump_vertical(current_node, 2, found)
+                jump_vertical(current_node, 3, found)
+            else:
+                for v in (2, 3):
+                    if pending & (1 << v):
+                        jump_vertical(current_node, v, found)
+                for h in (0, 1):
+                    if pending & (1 << h):
+                        result = jump_horizontal(current_node, h)
+                        if result is not None:
+                            found.append((result[0], result[1], 1 << h, -1))
+                        for v in (2, 3):
+                            if forced(current_node, h, v):
+                                jump_vertical(current_node, v, found)
 
-               total_cost = 0
-               for i in range(len(path)-1):
-                   u, v = path[i], path[i+1]
-                   edge_data = self.graph[u][v]
-                   total_cost += edge_data.get('weight', 1.0) * edge_data.get('traffic_factor', 1.0)
-               return path, total_cost, expanded_nodes
+            relaxations += len(found)
+            for neighbor, cost, arrival, turn in found:
+                tentative_g = g + cost
+                best = g_scores.get(neighbor, inf)
+                # Costs summed along different runs may differ by rounding only
+                tolerance = 1e-9 * tentative_g
+                if tentative_g < best - tolerance:
+                    g_scores[neighbor] = tentative_g
+                    arrivals[neighbor] = arrival
+                    expanded_arrivals.pop(neighbor, None)
+                    parents[neighbor] = (current_node, turn)
+                elif tentative_g <= best + tolerance and not arrivals[neighbor] & arrival:
+                    arrivals[neighbor] |= arrival
+                    if neighbor not in expanded_arrivals:
+                        continue
+                    tentative_g = best
+                else:
+                    continue
+                pushes += 1
+                f_score = tentative_g + heuristic(to_node(neighbor), goal_xy)
+                heapq.heappush(priority_queue, (f_score, pushes, tentative_g, neighbor))
+            if len(priority_queue) > peak_size:
+                peak_size = len(priority_queue)
+
+        self._finish_search({'pushes': pushes, 'pops': expanded_nodes, 'stale_pops': pops - expanded_nodes,
+                             'peak_size': peak_size}, expanded_nodes, [], None,
+                            (started, searching, time.perf_counter()), relaxations)
+        return None, float('inf'), expanded_nodes
+
+    def one_to_many(self, source, targets, step_callback=None):
+        """
+        Single Dijkstra from `source` that stops once every target is settled.
+        Returns: (paths, costs, expanded_nodes), lists aligned with `targets`;
+        unreachable targets get path None and cost inf.
+        """
+        started = time.perf_counter()
+        self.stats.reset('one_to_many')
+        step_callback = self.stats.traced(step_callback)
+        edges, to_key, to_node, _ = self._search_view()
+        target_keys = [to_key(t) for t in targets]
+        workspace = self.workspaces.acquire()
+        searching = time.perf_counter()
+        expanded_nodes, frontier_stats = self._settle(workspace, edges, to_key(source), target_keys,
+                                                      step_callback, to_node)
+        searched = time.perf_counter()
+        paths, costs = [], []
+        for t in target_keys:
+            reached = workspace.seen_stamp(t) == workspace.generation
+            paths.append(self._reconstruct_path(workspace.parent, t) if reached else None)
+            costs.append(workspace.dist[t] if reached else float('inf'))
+        self._finish_search(frontier_stats, expanded_nodes, [workspace], None, (started, searching, searched))
+        return paths, costs, expanded_nodes
+
+    def many_to_many(self, sources, targets, return_paths=False):
+        """
+        Cost matrix between every source and every target.
+        Roads are undirected, so one search is run per node on the smaller side
+        (duplicates searched once), each stopping when the other side is settled.
+        Returns: (costs, paths, expanded_nodes) where costs is a
+        (len(sources), len(targets)) NumPy array and paths[i][j] is the route
+        from sources[i] to targets[j] (None unless return_paths).
+        self.stats sums the counters of every search.
+        """
+        started = time.perf_counter()
+        self.stats.reset('many_to_many')
+        edges, to_key, to_node, _ = self._search_view()
+        source_keys = [to_key(s) for s in sources]
+        target_keys = [to_key(t) for t in targets]
+        from_targets = len(set(target_keys)) < len(set(source_keys))
+        roots, others = (target_keys, source_keys) if from_targets else (source_keys, target_keys)
+
+        costs = np.full((len(sources), len(targets)), np.inf)
+        paths = [[None] * len(targets) for _ in sources] if return_paths else None
+        # Rows of a duplicated root are filled from its single search
+        positions = {}
+        for i, root in enumerate(roots):
+            positions.setdefault(root, []).append(i)
+
+        expanded_nodes = 0
+        frontier_stats = {'pushes': 0, 'pops': 0, 'stale_pops': 0, 'peak_size': 0, 'seeds': 0}
+        relaxations = 0
+        workspace = self.workspaces.acquire()
+        seen_stamp, distances, parents = workspace.seen_stamp, workspace.dist, workspace.parent
+        searching = time.perf_counter()
+        for root, indices in positions.items():
+            # Every root searches in a new generation of the same tables, so
+            # nothing but the filled rows outlives its search
+            generation = workspace.begin()
+            expanded, search_stats = self._settle(workspace, edges, root, others, None, to_node)
+            expanded_nodes += expanded
+            for name in ('pushes', 'pops', 'stale_pops'):
+                frontier_stats[name] += search_stats[name]
+            frontier_stats['peak_size'] = max(frontier_stats['peak_size'], search_stats['peak_size'])
+            frontier_stats['seeds'] += 1
+            if self.stats.enabled:
+                relaxations += self._scanned_arcs(workspace.expanded)
+
+            for j, other in enumerate(others):
+                if seen_stamp(other) != generation:
+                    continue
+                path = None
+                if return_paths:
+                    path = self._reconstruct_path(parents, other)
+                    path = path[::-1] if from_targets else path
+                for i in indices:
+                    row, col = (j, i) if from_targets else (i, j)
+                    costs[row, col] = distances[other]
+                    if return_paths:
+                        paths[row][col] = list(path)
+        self._finish_search(frontier_stats, expanded_nodes, [workspace], None,
+                            (started, searching, time.perf_counter()), relaxations)
+
+        return costs, paths, expanded_nodes
+
+    def nearest_facilities(self, target, facilities, k=1, step_callback=None):
+        """
+        Multi-source Dijkstra seeded at every facility at once, stopping when
+        the `k` nearest facilities of `target` are settled. Labels are
+        (node, facility) pairs and a node keeps at most k of them, since a
+        facility that is not among a node's k nearest cannot be among the
+        k nearest of any node routed through it.
+        Roads are undirected, so paths run from `target` to the facility;
+        reverse them for routes from the facility (e.g. an ambulance).
+        Returns: (facilities, paths, costs, expanded_nodes), nearest first;
+        fewer than k entries when fewer facilities are reachable.
+        """
+        started = time.perf_counter()
+        self.stats.reset('nearest_facilities')
+        step_callback = self.stats.traced(step_callback)
+        edges, to_key, to_node, _ = self._search_view()
+        target = to_key(target)
+        origins = list(dict.fromkeys(to_key(f) for f in facilities))
+
+        priority_queue = [(0, i, origin, origin) for i, origin in enumerate(origins)]
+        pushes = len(origins)
+        costs = {(origin, origin): 0 for origin in origins}
+        parents = {(origin, origin): None for origin in origins}
+        labels = {}
+        settled = set()
+        found, found_costs = [], []
+        expanded_nodes = 0
+        scanned = []
+        pops, peak_size = 0, pushes
+        searching = time.perf_counter()
+
+        while priority_queue and len(found) < k:
+            current_dist, _, current_node, origin = heapq.heappop(priority_queue)
+            pops += 1
+            label = (current_node, origin)
+
+            if label in settled or labels.get(current_node, 0) >= k:
+                continue
 
-            for neighbor in self.graph.neighbors(current_node):
-                if neighbor not in visited and neighbor not in parents:
+            settled.add(label)
+            labels[current_node] = labels.get(current_node, 0) + 1
+            expanded_nodes += 1
+
+            if step_callback: step_callback(to_node(current_node))
+
+            if current_node == target:
+                found.append(origin)
+                found_costs.append(current_dist)
+                continue
+
+            scanned.append(current_node)
+            for neighbor, weight in edges(current_node):
+                if labels.get(neighbor, 0) >= k:
+                    continue
+                new_dist = current_dist + weight
+                key = (neighbor, origin)
+
+                if new_dist < costs.get(key, float('inf')):
+                    costs[key] = new_dist
+                    parents[key] = current_node
+                    pushes += 1
+                    heapq.heappush(priority_queue, (new_dist, pushes, neighbor, origin))
+
+            if len(priority_queue) > peak_size:
+                peak_size = len(priority_queue)
+
+        searched = time.perf_counter()
+        paths = []
+        for origin in found:
+            path, node = [], target
+            while node is not None:
+                path.append(to_node(node))
+                node = parents[(node, origin)]
+            paths.append(path)
+        self._finish_search({'pushes': pushes, 'pops': expanded_nodes, 'stale_pops': pops - expanded_nodes,
+                             'peak_size': peak_size, 'seeds': len(origins)}, expanded_nodes, [], None,
+                            (started, searching, searched),
+                            self._scanned_arcs(scanned) if self.stats.enabled else 0)
+        return [to_node(origin) for origin in found], paths, found_costs, expanded_nodes
+
+    def _settle(self, workspace, edges, source, targets, step_callback, to_node):
+        """Dijkstra from `source` until all `targets` are settled, in the
+        current generation of `workspace`; its dist / parent tables hold the
+        result where the seen stamp matches.
+        Returns: (expanded_nodes, frontier_stats)."""
+        priority_queue = [(0, 0, source)]
+        pushes, peak_size = 1, 1
+        generation = workspace.generation
+        distances, parents = workspace.dist, workspace.parent
+        seen, visited = workspace.seen, workspace.closed
+        seen_stamp, closed_stamp = workspace.seen_stamp, workspace.closed_stamp
+        close = workspace.expanded.append
+        distances[source] = 0
+        parents[source] = None
+        seen[source] = generation
+        remaining = set(targets)
+        expanded_nodes = 0
+
+        while priority_queue and remaining:
+            current_dist, _, current_node = heapq.heappop(priority_queue)
+
+            if closed_stamp(current_node) == generation:
+                continue
+
+            visited[current_node] = generation
+            close(current_node)
+            expanded_nodes += 1
+            remaining.discard(current_node)
+
+            if step_callback: step_callback(to_node(current_node))
+
+            for neighbor, weight in edges(current_node):
+                new_dist = current_dist + weight
+
+                if seen_stamp(neighbor) != generation or new_dist < distances[neighbor]:
+                    seen[neighbor] = generation
+                    distances[neighbor] = new_dist
                     parents[neighbor] = current_node
-                    priority = self._heuristic(neighbor, goal)
-                    heapq.heappush(queue, (priority, neighbor))
-        
+                    pushes += 1
+                    heapq.heappush(priority_queue, (new_dist, pushes, neighbor))
+
+            if len(priority_queue) > peak_size:
+                peak_size = len(priority_queue)
+
+        return expanded_nodes, self._heap_stats(pushes, priority_queue, expanded_nodes, peak_size)
+
+    def _frontier_search(self, edges, start, goal, to_node, step_callback, started, priority, greedy=False):
+        """
+        The dijkstra / a_star / greedy_bfs loop on a frontier object, used
+        when a frontier other than the inlined binary heap is configured.
+        priority(g, node): frontier key of a node reached at cost g.
+        greedy: a node keeps the parent (and cost) it was first reached from.
+        Returns: (path, cost, expanded_nodes)
+        """
+        frontier = self.frontier()
+        frontier.push(start, 0)
+        workspace = self.workspaces.acquire()
+        generation = workspace.generation
+        g_scores, parents = workspace.dist, workspace.parent
+        seen, visited = workspace.seen, workspace.closed
+        seen_stamp, closed_stamp = workspace.seen_stamp, workspace.closed_stamp
+        close = workspace.expanded.append
+        g_scores[start] = 0
+        parents[start] = None
+        seen[start] = generation
+        expanded_nodes = 0
+        searching = time.perf_counter()
+
+        while frontier:
+            _, current_node = frontier.pop()
+
+            if closed_stamp(current_node) == generation:
+                continue
+
+            visited[current_node] = generation
+            close(current_node)
+            expanded_nodes += 1
+
+            if step_callback: step_callback(to_node(current_node))
+
+            if current_node == goal:
+                searched = time.perf_counter()
+                path = self._reconstruct_path(parents, goal)
+                cost = self._chain_cost(edges, parents, goal)
+                self._finish_search(frontier.stats(), expanded_nodes, [workspace], goal, (started, searching, searched))
+                return path, cost, expanded_nodes
+
+            current_g = g_scores[current_node]
+            for neighbor, weight in edges(current_node):
+                tentative_g = current_g + weight
+
+                if seen_stamp(neighbor) != generation or (not greedy and tentative_g < g_scores[neighbor]):
+                    seen[neighbor] = generation
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current_node
+                    frontier.push(neighbor, priority(tentative_g, neighbor))
+
+        self._finish_search(frontier.stats(), expanded_nodes, [workspace], None, (started, searching, time.perf_counter()))
         return None, float('inf'), expanded_nodes
 
+    @staticmethod
+    def _heap_stats(pushes, heap, expanded_nodes, peak_size):
+        """frontier_stats of an inlined heapq search. Entries still in the heap
+        were never popped; every other pop that expanded nothing was stale.
+        The peak size counts heap entries, stale ones included."""
+        return {'pushes': pushes, 'pops': expanded_nodes, 'stale_pops': pushes - len(heap) - expanded_nodes,
+                'peak_size': peak_size}
+
+    def _finish_search(self, frontier_stats, expanded_nodes, workspaces, goal, clock, relaxations=None):
+        """Returns the workspaces to the pool, publishes frontier_stats and
+        fills self.stats. Relaxations are the arcs scanned from the expanded
+        nodes (the goal, when reached, is not scanned), unless the search
+        counted its own."""
+        for workspace in workspaces:
+            self.workspaces.release(workspace)
+        self.frontier_stats = frontier_stats
+        if relaxations is None and self.stats.enabled:
+            relaxations = self._scanned_arcs([node for workspace in workspaces for node in workspace.expanded],
+                                             goal is not None)
+        self.stats.record(self.stats.algorithm, expanded_nodes, frontier_stats, relaxations, clock)
+
+    def _scanned_arcs(self, closed, reached_goal=False):
+        """Sum of the degrees of the `closed` nodes; a reached goal, the last
+        node closed, is not scanned."""
+        if self.csr is None:
+            adj = self.graph._adj
+            degrees = [len(adj[node]) for node in closed]
+        else:
+            offsets = self.csr.adjacency_lists()[0]
+            degrees = [offsets[node + 1] - offsets[node] for node in closed]
+        return sum(degrees) - (degrees[-1] if reached_goal and degrees else 0)
+
+    def _expand_jumps(self, parents, node, step, to_node):
+        """Rebuilds the full cell path from the chain of jump points. Each link
+        is a straight run, or a vertical run to its turn cell then a horizontal one."""
+        waypoints = [node]
+        while parents[node] is not None:
+            node, turn = parents[node]
+            if turn >= 0:
+                waypoints.append(turn)
+            waypoints.append(node)
+        waypoints.reverse()
+
+        path = [to_node(waypoints[0])]
+        for source, target in zip(waypoints, waypoints[1:]):
+            (x, y), (tx, ty) = to_node(source), to_node(target)
+            ahead = step[0 if tx > x else 1 if tx < x else 2 if ty > y else 3]
+            while source != target:
+                source = ahead[source]
+                path.append(to_node(source))
+        return path
+
+    def _grid_tables(self):
+        """
+        Per-direction tables for jump_point_search:
+        (step, arc, cost_of, sample, to_id, to_node).
+        Directions are 0: +x, 1: -x, 2: +y, 3: -y. step[d][i] is the id of the
+        node one cell away from node i (-1 past obstacles and the border) and
+        arc[d][i] the arc leading there, read with cost_of(arc) at the current
+        traffic. Obstacles never change, so the tables are built once; on a
+        CSRGraph they are memoryviews over int64 arrays indexed by node id,
+        while a networkx map gets its nodes numbered in iteration order.
+        `sample` is a fixed random subset of arcs used to estimate congestion.
+        """
+        if self._grid is None:
+            if self.csr is None:
+                adj = self.graph._adj
+                nodes = list(adj)
+                index = {node: i for i, node in enumerate(nodes)}
+                step = [[-1] * len(nodes) for _ in range(4)]
+                arc = [[None] * len(nodes) for _ in range(4)]
+                for i, (x, y) in enumerate(nodes):
+                    for neighbor, data in adj[(x, y)].items():
+                        px, py = neighbor
+                        d = 0 if px > x else 1 if px < x else 2 if py > y else 3
+                        step[d][i] = index[neighbor]
+                        arc[d][i] = data
+                arcs = [data for table in arc for data in table if data is not None]
+                self._grid = (step, arc, arcs, index.__getitem__, nodes.__getitem__)
+            else:
+                csr = self.csr
+                n = csr.number_of_nodes()
+                sources = np.repeat(np.arange(n), np.diff(csr.offsets))
+                delta = csr.coords[csr.neighbors] - csr.coords[sources]
+                direction = np.select([delta[:, 0] > 0, delta[:, 0] < 0, delta[:, 1] > 0], [0, 1, 2], 3)
+                step, arc = [], []
+                for d in range(4):
+                    mask = direction == d
+                    step_d, arc_d = np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64)
+                    step_d[sources[mask]] = csr.neighbors[mask]
+                    arc_d[sources[mask]] = np.nonzero(mask)[0]
+                    step.append(memoryview(step_d))
+                    arc.append(memoryview(arc_d))
+                coords = csr.adjacency_lists()[3]
+                self._grid = (step, arc, range(len(csr.neighbors)), csr.node_id, coords.__getitem__)
+            step, arc, arcs, to_id, to_node = self._grid
+            sample = random.Random(0).sample(arcs, min(len(arcs), 1024))
+            self._grid = (step, arc, sample, to_id, to_node)
+
+        step, arc, sample, to_id, to_node = self._grid
+        if self.csr is None:
+            def cost_of(data):
+                return data.get('weight', 1.0) * data.get('traffic_factor', 1.0)
+        else:
+            cost_of = self.csr.adjacency_lists()[2].__getitem__
+        return step, arc, cost_of, sample, to_id, to_node
+
+    def _search_view(self):
+        """
+        Backend accessors used by the search loops: (edges, to_key, to_node, xy).
+        networkx graphs are searched on their (x, y) tuple nodes; a CSRGraph
+        is searched on integer node ids with its precomputed arc costs.
+        """
+        if self.csr is None:
+            # The dict-of-dicts behind graph.adj: no view object per lookup
+            adj = self.graph._adj
+
+            def edges(node):
+                return [(neighbor, data.get('weight', 1.0) * data.get('traffic_factor', 1.0))
+                        for neighbor, data in adj[node].items()]
+
+            return edges, _identity, _identity, _identity
+
+        offsets, neighbors, costs, coords = self.csr.adjacency_lists()
+
+        def edges(node):
+            lo, hi = offsets[node], offsets[node + 1]
+            return zip(neighbors[lo:hi], costs[lo:hi])
+
+        return edges, self.csr.node_id, coords.__getitem__, coords.__getitem__
+
+    def _new_distances(self):
+        if self.csr is None:
+            return {node: float('inf') for node in self.graph.nodes()}
+        return [float('inf')] * self.csr.number_of_nodes()
+
     def _heuristic(self, node_a, node_b):
         (x1, y1) = node_a
         (x2, y2) = node_b
         return math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
 
+    @staticmethod
+    def _chain_cost(edges, parents, node):
+        """Cost of the parent chain ending at `node`, summed from the start
+        like g. It equals g unless an ancestor was improved after it was
+        expanded (weighted A*, inconsistent heuristics), and is lower then."""
+        chain = []
+        while node is not None:
+            chain.append(node)
+            node = parents[node]
+        cost = 0
+        for u, v in zip(chain[::-1], chain[-2::-1]):
+            cost += min(weight for neighbor, weight in edges(u) if neighbor == v)
+        return cost
+
     def _reconstruct_path(self, parents, current_node):
         path = []
         while current_node is not None:
             path.append(current_node)
             current_node = parents[current_node]
-        return path[::-1] 
+        path.reverse()
+        if self.csr is not None:
+            _, _, _, coords = self.csr.adjacency_lists()
+            path = [coords[node] for node in path]
+        return path
+
+
+def _identity(node):
+    return node
@@ -0,0 +1,256 @@
+import heapq
+import numpy as np
+
+from src.core.csr_graph import CSRGraph
+
+
+class ContractionHierarchy:
+    """
+    Customizable Contraction Hierarchy over a MapGenerator grid.
+
+    Preprocessing is split in two phases:
+      * preprocess(): metric-independent node ordering (geometric nested
+        dissection on the grid coordinates) plus the shortcut structure
+        obtained by contracting the nodes in that order.
+      * customize(): computes shortcut weights from the current edge costs
+        via lower triangles. After a traffic update only the shortcuts that
+        depend on the changed roads are recomputed; order and shortcuts stay.
+    """
+
+    def __init__(self, graph, leaf_size=32):
+        self.graph = graph
+        self.csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+        self.leaf_size = leaf_size
+        self.rank = None
+
+    def preprocess(self):
+        """Builds node order and shortcut edges, then customizes them."""
+        n = self.csr.number_of_nodes()
+        order = self._nested_dissection_order()
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n)
+        self.rank = rank.tolist()
+        rank_list = self.rank
+
+        offsets, neighbors, _, _ = self.csr.adjacency_lists()
+        up = [set(v for v in neighbors[offsets[u]:offsets[u + 1]] if rank_list[v] > rank_list[u])
+              for u in range(n)]
+
+        # Symbolic elimination: contracting v links all its higher neighbors,
+        # which is the same as merging them into the lowest of those neighbors
+        for v in order.tolist():
+            if up[v]:
+                parent = min(up[v], key=rank_list.__getitem__)
+                up[parent] |= up[v]
+                up[parent].discard(parent)
+
+        # Arcs are (lower, higher) pairs, numbered by the rank of their lower end
+        self.up = [[] for _ in range(n)]
+        self.arc_index = {}
+        self.arc_head = []
+        for v in order.tolist():
+            for u in sorted(up[v], key=rank_list.__getitem__):
+                self.arc_index[(v, u)] = len(self.arc_head)
+                self.up[v].append((u, len(self.arc_head)))
+                self.arc_head.append(u)
+
+        # Lower triangles: arc (a, b) can be shortcut through every v below both
+        num_arcs = len(self.arc_head)
+        self.lower = [[] for _ in range(num_arcs)]
+        self.dependents = [[] for _ in range(num_arcs)]
+        for v in range(n):
+            arcs = self.up[v]
+            for i in range(len(arcs)):
+                a, arc_a = arcs[i]
+                for j in range(i + 1, len(arcs)):
+                    b, arc_b = arcs[j]
+                    target = self.arc_index[(a, b)] if rank_list[a] < rank_list[b] else self.arc_index[(b, a)]
+                    self.lower[target].append((arc_a, arc_b, v))
+                    self.dependents[arc_a].append(target)
+                    self.dependents[arc_b].append(target)
+
+        edge_u, edge_v = self.csr.edge_u.tolist(), self.csr.edge_v.tolist()
+        self.edge_arc = [self.arc_index[(u, v)] if rank_list[u] < rank_list[v] else self.arc_index[(v, u)]
+                         for u, v in zip(edge_u, edge_v)]
+        self.arc_edge = [-1] * num_arcs
+        for edge, arc in enumerate(self.edge_arc):
+            self.arc_edge[arc] = edge
+
+        # The CSRGraph was just built from (or is) the graph: nothing to sync
+        self._customize_all()
+        return self
+
+    def customize(self, edge_ids=None):
+        """
+        Recomputes shortcut weights from the current traffic.
+        edge_ids: ids of the roads whose cost changed (as returned by
+        TrafficManager). Only those road costs are read back and only the
+        shortcuts depending on them are recomputed. When omitted every road
+        cost is re-read and every shortcut recomputed.
+        Returns: the number of arcs recomputed.
+        """
+        if self.rank is None:
+            raise RuntimeError("preprocess() must be called before customize()")
+        if self.csr is not self.graph:
+            self.csr.sync_from_networkx(self.graph, edge_ids)
+        if edge_ids is None:
+            return self._customize_all()
+
+        edge_ids = np.unique(np.asarray(edge_ids, dtype=np.int64))
+        edge_costs = self.edge_costs
+        for e, cost in zip(edge_ids.tolist(), (self.csr.weights[edge_ids] * self.csr.traffic[edge_ids]).tolist()):
+            edge_costs[e] = cost
+
+        # Popping arc ids in increasing order keeps the lower-triangle invariant
+        heap = list({self.edge_arc[e] for e in edge_ids.tolist()})
+        heapq.heapify(heap)
+        queued = set(heap)
+        updated = 0
+        while heap:
+            arc = heapq.heappop(heap)
+            queued.discard(arc)
+            updated += 1
+            if self._customize_arc(arc):
+                for target in self.dependents[arc]:
+                    if target not in queued:
+                        queued.add(target)
+                        heapq.heappush(heap, target)
+        return updated
+
+    def _customize_all(self):
+        self.edge_costs = (self.csr.weights * self.csr.traffic).tolist()
+        self.weights = [float('inf')] * len(self.arc_head)
+        self.middle = [-1] * len(self.arc_head)
+        # Arc ids are sorted by the rank of their lower end, so every
+        # lower triangle is final before the arc that depends on it
+        for arc in range(len(self.arc_head)):
+            self._customize_arc(arc)
+        return len(self.arc_head)
+
+    def query(self, start, goal):
+        """
+        Bidirectional upward search on the hierarchy, with stall-on-demand:
+        a node that a higher neighbor already reaches more cheaply is not on
+        an upward shortest path, so its arcs are not relaxed.
+        Returns: (path, cost, expanded_nodes) with shortcuts unpacked.
+        """
+        s, t = self.csr.node_id(start), self.csr.node_id(goal)
+        up, weights = self.up, self.weights
+        inf = float('inf')
+
+        distances = ({s: 0}, {t: 0})
+        parents = ({s: None}, {t: None})
+        queues = ([(0, s)], [(0, t)])
+        visited = (set(), set())
+        best_cost, meeting_node = inf, None
+        expanded_nodes = 0
+
+        while True:
+            forward = queues[0][0][0] if queues[0] else inf
+            backward = queues[1][0][0] if queues[1] else inf
+            if min(forward, backward) >= best_cost:
+                break
+            side = 0 if forward <= backward else 1
+            current_dist, current_node = heapq.heappop(queues[side])
+
+            if current_node in visited[side]:
+                continue
+
+            visited[side].add(current_node)
+            expanded_nodes += 1
+
+            other = distances[1 - side].get(current_node)
+            if other is not None and current_dist + other < best_cost:
+                best_cost = current_dist + other
+                meeting_node = current_node
+
+            own = distances[side]
+            for neighbor, arc in up[current_node]:
+                weight = weights[arc]
+                known = own.get(neighbor, inf)
+                # Stalled: the arcs relaxed so far only gave upper bounds, which is harmless
+                if known + weight < current_dist:
+                    break
+                if current_dist + weight < known:
+                    own[neighbor] = current_dist + weight
+                    parents[side][neighbor] = current_node
+                    heapq.heappush(queues[side], (current_dist + weight, neighbor))
+
+        if meeting_node is None:
+            return None, float('inf'), expanded_nodes
+
+        forward = self._chain(parents[0], meeting_node)[::-1]
+        backward = self._chain(parents[1], meeting_node)
+        path = [forward[0]]
+        for a, b in zip(forward, forward[1:]):
+            self._unpack(a, b, path)
+        for a, b in zip(backward, backward[1:]):
+            self._unpack(a, b, path)
+        return [self.csr.node(v) for v in path], best_cost, expanded_nodes
+
+    @property
+    def num_shortcuts(self):
+        return len(self.arc_head) - self.csr.number_of_edges()
+
+    def _customize_arc(self, arc):
+        """Recomputes one arc from its road cost and lower triangles.
+        Returns True when its weight changed."""
+        edge = self.arc_edge[arc]
+        weight = self.edge_costs[edge] if edge >= 0 else float('inf')
+        middle = -1
+        weights = self.weights
+        for arc_a, arc_b, v in self.lower[arc]:
+            via = weights[arc_a] + weights[arc_b]
+            if via < weight:
+                weight, middle = via, v
+        changed = weight != weights[arc]
+        weights[arc] = weight
+        self.middle[arc] = middle
+        return changed
+
+    def _arc(self, a, b):
+        if self.rank[a] < self.rank[b]:
+            return self.arc_index[(a, b)]
+        return self.arc_index[(b, a)]
+
+    def _unpack(self, a, b, path):
+        """Appends the road nodes after `a` up to `b` for the arc a-b."""
+        stack = [(a, b)]
+        while stack:
+            x, y = stack.pop()
+            middle = self.middle[self._arc(x, y)]
+            if middle < 0:
+                path.append(y)
+            else:
+                stack.append((middle, y))
+                stack.append((x, middle))
+
+    def _chain(self, parents, node):
+        chain = []
+        while node is not None:
+            chain.append(node)
+            node = parents[node]
+        return chain
+
+    def _nested_dissection_order(self):
+        """Orders nodes leaves-first, separators-last by recursively cutting the
+        map along a grid row or column. On a 4-connected grid a full row or
+        column is an exact separator, which keeps the shortcut fill small."""
+        coords = self.csr.coords
+        order = []
+        stack = [(np.arange(len(coords)), False)]
+        while stack:
+            nodes, emit = stack.pop()
+            if emit or len(nodes) <= self.leaf_size:
+                order.append(nodes)
+                continue
+            xy = coords[nodes]
+            spans = xy.max(axis=0) - xy.min(axis=0)
+            axis = int(np.argmax(spans))
+            cut = int(np.median(xy[:, axis]))
+            low, high = xy[:, axis] < cut, xy[:, axis] > cut
+            # Popped in reverse: low half, high half, then the separator
+            stack.append((nodes[~(low | high)], True))
+            stack.append((nodes[high], False))
+            stack.append((nodes[low], False))
+        return np.concatenate(order) if order else np.zeros(0, dtype=np.int64)
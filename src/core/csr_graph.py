@@ -0,0 +1,306 @@
+import struct
+import zipfile
+
+import numpy as np
+import networkx as nx
+
+
+class CSRGraph:
+    """
+    Compact array-backed road graph.
+
+    Nodes are integer ids 0..n-1 with (x, y) grid coordinates. Every road is
+    stored once in the edge arrays (edge_u, edge_v, weights, traffic) and
+    twice, one arc per direction, in the CSR adjacency (offsets, neighbors).
+    `costs` holds the precomputed effective cost (weight * traffic_factor)
+    of every arc, so searches never touch per-edge attribute dicts.
+    """
+
+    # Every array needed to rebuild the graph without recomputing the CSR layout
+    ARRAY_FIELDS = ('coords', 'edge_u', 'edge_v', 'weights', 'traffic', 'cell_to_id',
+                    'offsets', 'neighbors', 'arc_edge', 'edge_arcs', 'costs')
+
+    def __init__(self, coords, edge_u, edge_v, weights=None, traffic=None, width=None, height=None):
+        self.coords = np.ascontiguousarray(coords, dtype=np.int32).reshape(-1, 2)
+        self.edge_u = np.asarray(edge_u, dtype=np.int32)
+        self.edge_v = np.asarray(edge_v, dtype=np.int32)
+        n = len(self.coords)
+        m = len(self.edge_u)
+
+        self.weights = np.ones(m) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.traffic = np.ones(m) if traffic is None else np.asarray(traffic, dtype=np.float64)
+
+        if width is None:
+            width = int(self.coords[:, 0].max()) + 1 if n else 0
+        if height is None:
+            height = int(self.coords[:, 1].max()) + 1 if n else 0
+        self.width = width
+        self.height = height
+
+        # (x, y) -> node id lookup, -1 for obstacles / cells outside the map
+        self.cell_to_id = np.full((width, height), -1, dtype=np.int32)
+        self.cell_to_id[self.coords[:, 0], self.coords[:, 1]] = np.arange(n, dtype=np.int32)
+
+        arc_src = np.concatenate([self.edge_u, self.edge_v])
+        arc_dst = np.concatenate([self.edge_v, self.edge_u])
+        arc_edge = np.concatenate([np.arange(m, dtype=np.int32), np.arange(m, dtype=np.int32)])
+        order = np.argsort(arc_src, kind='stable')
+
+        self.offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(arc_src, minlength=n), out=self.offsets[1:])
+        self.neighbors = arc_dst[order]
+        self.arc_edge = arc_edge[order]
+
+        # edge id -> positions of its two arcs in the CSR arrays
+        arc_pos = np.empty(2 * m, dtype=np.int64)
+        arc_pos[order] = np.arange(2 * m)
+        self.edge_arcs = np.stack([arc_pos[:m], arc_pos[m:]], axis=1)
+
+        self.costs = self.weights[self.arc_edge] * self.traffic[self.arc_edge]
+        self.version = 0
+        self._lists = None
+        self._cell_lists = None
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuilds a CSRGraph around existing arrays (one per ARRAY_FIELDS entry)
+        without copying them, e.g. views into shared memory or memory-mapped files."""
+        graph = cls.__new__(cls)
+        for name in cls.ARRAY_FIELDS:
+            setattr(graph, name, arrays[name])
+        graph.width, graph.height = graph.cell_to_id.shape
+        graph.version = 0
+        graph._lists = None
+        graph._cell_lists = None
+        return graph
+
+    def to_arrays(self):
+        return {name: getattr(self, name) for name in self.ARRAY_FIELDS}
+
+    def save(self, path):
+        """
+        Writes the map (obstacles via `cell_to_id`, edge arrays, weights,
+        traffic factors and the CSR layout) as an uncompressed .npz file.
+        Every section is a plain .npy member, so `load` can memory-map it.
+        """
+        with open(path, 'wb') as f:
+            np.savez(f, format_version=np.array([MAP_FORMAT_VERSION]), **self.to_arrays())
+
+    @classmethod
+    def load(cls, path, mmap_mode='c'):
+        """
+        Opens a map written by `save` without reading it into memory.
+        mmap_mode: 'c' (copy-on-write: traffic updates stay private to this
+        process), 'r' (read-only, pages shared by every process that opens
+        the file) or None to load plain in-memory arrays.
+        """
+        try:
+            if mmap_mode is None:
+                with np.load(path) as archive:
+                    arrays = {name: archive[name] for name in archive.files}
+            else:
+                arrays = _memmap_npz(path, mmap_mode)
+        except (zipfile.BadZipFile, EOFError) as e:
+            raise ValueError(f"{path} is not a map file ({e})") from e
+        if 'format_version' not in arrays or int(arrays['format_version'][0]) != MAP_FORMAT_VERSION:
+            raise ValueError(f"{path} is not a map file (format version {MAP_FORMAT_VERSION})")
+        missing = [name for name in cls.ARRAY_FIELDS if name not in arrays]
+        if missing:
+            raise ValueError(f"{path} is missing map sections: {missing}")
+        return cls.from_arrays(arrays)
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """Builds a CSRGraph from a MapGenerator networkx graph.
+        Edge ids follow the order of `graph.edges()`."""
+        nodes = list(graph.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+        edges = list(graph.edges(data=True))
+        edge_u = [index[u] for u, _, _ in edges]
+        edge_v = [index[v] for _, v, _ in edges]
+        weights = [d.get('weight', 1.0) for _, _, d in edges]
+        traffic = [d.get('traffic_factor', 1.0) for _, _, d in edges]
+        return cls(nodes, edge_u, edge_v, weights, traffic)
+
+    @classmethod
+    def from_grid(cls, obstacle_mask):
+        """Builds a 4-connected grid graph over the free cells of a
+        (width, height) boolean obstacle mask, entirely with array ops.
+        Node and edge ids follow the order of `nx.grid_2d_graph`, so the result
+        equals `from_networkx` of the same grid."""
+        free = ~np.asarray(obstacle_mask, dtype=bool)
+        width, height = free.shape
+        ids = np.full((width, height), -1, dtype=np.int32)
+        ids[free] = np.arange(np.count_nonzero(free), dtype=np.int32)
+        coords = np.argwhere(free)
+
+        # [x, y, 0] is the road to (x + 1, y), [x, y, 1] the road to (x, y + 1);
+        # C order lists them per node, the way grid_2d_graph.edges() does
+        roads = np.zeros((width, height, 2), dtype=bool)
+        roads[:-1, :, 0] = free[:-1, :] & free[1:, :]
+        roads[:, :-1, 1] = free[:, :-1] & free[:, 1:]
+        targets = np.full((width, height, 2), -1, dtype=np.int32)
+        targets[:-1, :, 0] = ids[1:, :]
+        targets[:, :-1, 1] = ids[:, 1:]
+        edge_u = np.broadcast_to(ids[:, :, None], roads.shape)[roads]
+        edge_v = targets[roads]
+        return cls(coords, edge_u, edge_v, width=width, height=height)
+
+    def to_networkx(self):
+        """Materializes the map as a networkx graph with the usual edge attributes."""
+        G = nx.Graph()
+        nodes = [tuple(c) for c in self.coords.tolist()]
+        G.add_nodes_from(nodes)
+        G.add_edges_from(
+            (nodes[u], nodes[v], {'weight': w, 'traffic_factor': t})
+            for u, v, w, t in zip(self.edge_u.tolist(), self.edge_v.tolist(),
+                                  self.weights.tolist(), self.traffic.tolist())
+        )
+        return G
+
+    @property
+    def obstacle_mask(self):
+        """(width, height) boolean array, True where there is no node."""
+        return self.cell_to_id < 0
+
+    def number_of_nodes(self):
+        return len(self.coords)
+
+    def number_of_edges(self):
+        return len(self.edge_u)
+
+    def nodes(self):
+        return [tuple(c) for c in self.coords.tolist()]
+
+    def has_node(self, node):
+        x, y = node
+        return 0 <= x < self.width and 0 <= y < self.height and self.cell_to_id[x, y] >= 0
+
+    def node_id(self, node):
+        if not self.has_node(node):
+            raise KeyError(f"Node {node} is not in the graph")
+        return int(self.cell_to_id[node[0], node[1]])
+
+    def node(self, node_id):
+        x, y = self.coords[node_id]
+        return (int(x), int(y))
+
+    def edge_id(self, u, v):
+        """Returns the edge id between node ids `u` and `v`, or -1."""
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        hits = np.nonzero(self.neighbors[lo:hi] == v)[0]
+        return int(self.arc_edge[lo + hits[0]]) if len(hits) else -1
+
+    def update_costs(self, edge_ids=None, copy=False):
+        """Recomputes arc costs after `weights`/`traffic` changed.
+        Only the arcs of `edge_ids` are touched when given.
+        copy: write into a copy of `costs` and swap it in with one reference
+        assignment. A search holds the views it started with, so it sees
+        either the old or the new costs, never a mix. Arrays shared with
+        other processes must be rewritten in place (copy=False)."""
+        costs = self.costs.copy() if copy else self.costs
+        if edge_ids is None:
+            costs[:] = self.weights[self.arc_edge] * self.traffic[self.arc_edge]
+        else:
+            edge_ids = np.asarray(edge_ids, dtype=np.int64)
+            arcs = self.edge_arcs[edge_ids].ravel()
+            edges = self.arc_edge[arcs]
+            costs[arcs] = self.weights[edges] * self.traffic[edges]
+        self.costs = costs
+        self.version += 1
+
+    def sync_from_networkx(self, graph, edge_ids=None):
+        """Copies weight/traffic_factor back from the networkx graph this CSRGraph
+        was built from (all edges, or only `edge_ids`) and refreshes the costs."""
+        if edge_ids is None:
+            # Edge ids follow the order of graph.edges() (see from_networkx)
+            data = [d for _, _, d in graph.edges(data=True)]
+            self.weights[:] = [d.get('weight', 1.0) for d in data]
+            self.traffic[:] = [d.get('traffic_factor', 1.0) for d in data]
+        else:
+            ids = np.asarray(edge_ids, dtype=np.int64)
+            adj = graph._adj
+            us = map(tuple, self.coords[self.edge_u[ids]].tolist())
+            vs = map(tuple, self.coords[self.edge_v[ids]].tolist())
+            data = [adj[u][v] for u, v in zip(us, vs)]
+            self.weights[ids] = [d.get('weight', 1.0) for d in data]
+            self.traffic[ids] = [d.get('traffic_factor', 1.0) for d in data]
+        self.update_costs(edge_ids)
+
+    def adjacency_lists(self):
+        """Python-level views of (offsets, neighbors, costs, coords) for the
+        pure-Python search loops. The first three are memoryviews over the
+        CSR arrays, so they cost no memory of their own and `update_costs` or
+        writes through shared memory show up without copying; coords maps a
+        node id to its (x, y) tuple. Views are only rebound when an array
+        itself is replaced."""
+        arrays = (self.offsets, self.neighbors, self.costs, self.coords)
+        if self._lists is None or any(a is not b for a, b in zip(self._lists[0], arrays)):
+            self._lists = (arrays, (_flat_view(self.offsets), _flat_view(self.neighbors),
+                                    _flat_view(self.costs), CoordinateView(self.coords)))
+        return self._lists[1]
+
+    def cell_lists(self):
+        """`cell_to_id` as nested Python lists (ids[x][y]), cached."""
+        if self._cell_lists is None:
+            self._cell_lists = self.cell_to_id.tolist()
+        return self._cell_lists
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.coords, self.edge_u, self.edge_v, self.weights, self.traffic,
+                                      self.cell_to_id, self.offsets, self.neighbors, self.arc_edge,
+                                      self.edge_arcs, self.costs))
+
+
+MAP_FORMAT_VERSION = 1
+
+
+class CoordinateView:
+    """Read-only node id -> (x, y) lookup over an (n, 2) int32 coords array,
+    without one tuple per node kept alive."""
+
+    __slots__ = ('_flat',)
+
+    def __init__(self, coords):
+        self._flat = _flat_view(np.ascontiguousarray(coords, dtype=np.int32))
+
+    def __len__(self):
+        return len(self._flat) // 2
+
+    def __getitem__(self, node_id):
+        flat = self._flat
+        return (flat[2 * node_id], flat[2 * node_id + 1])
+
+
+def _flat_view(array):
+    """1-D memoryview over a C-contiguous array in native item format. Arrays
+    read from .npy files carry an explicit byte order ('<q'), which plain
+    memoryviews cannot index."""
+    return memoryview(array).cast('B').cast(array.dtype.char)
+
+
+def _memmap_npz(path, mode):
+    """Memory-maps every member of an uncompressed .npz archive in place."""
+    readers = {(1, 0): np.lib.format.read_array_header_1_0, (2, 0): np.lib.format.read_array_header_2_0}
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: section {info.filename} is compressed and cannot be memory-mapped")
+            # Member data starts after the local file header (30 bytes + name + extra field)
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack('<HH', f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version not in readers:
+                raise ValueError(f"{path}: unsupported .npy version {version} in {info.filename}")
+            shape, fortran_order, dtype = readers[version](f)
+
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(f, dtype=dtype, mode=mode, offset=f.tell(), shape=shape,
+                                         order='F' if fortran_order else 'C')
+    return arrays
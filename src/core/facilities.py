@@ -0,0 +1,122 @@
+import numpy as np
+
+from src.core.csr_graph import CSRGraph
+from src.core.sssp import shortest_path_tree, repair_shortest_path_tree
+
+
+class FacilityIndex:
+    """
+    Cached nearest-facility lookups (hospitals, ambulance stations).
+
+    One shortest-path tree is kept per facility, as rows of (num_facilities,
+    num_nodes) distance and parent arrays. Roads are undirected, so a tree
+    grown from a facility is also its reverse tree: parent pointers lead
+    from any node to the facility along a shortest route. A lookup reads
+    one column of the distance table and walks the parent pointers, so it
+    costs no more than the length of the returned paths.
+
+    With a TrafficManager, every lookup first catches up on the traffic
+    changes since the previous one. Only the part of each tree affected by
+    the changed roads is repaired. The trees are rebuilt if the change log
+    no longer reaches back that far.
+
+    For one-off questions, or facility sets that change often, use
+    RouteFinder.nearest_facilities instead (one search, nothing cached).
+
+    Usage:
+        hospitals = FacilityIndex(graph, hospital_nodes, traffic_manager).build()
+        hospital, path, cost = hospitals.route_to_nearest(here)
+        stations, paths, costs = ambulances.nearest(incident, k=3)
+    """
+
+    def __init__(self, graph, facilities, traffic=None):
+        self.graph = graph
+        self.csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+        self.facilities = list(facilities)
+        self.traffic = traffic
+        self.version = None
+        self.distances = None
+        self.parents = None
+        self.repairs = 0
+        self.rebuilds = 0
+
+    def build(self):
+        """Grows the tree of every facility."""
+        n = self.csr.number_of_nodes()
+        self.distances = np.full((len(self.facilities), n), np.inf)
+        self.parents = np.full((len(self.facilities), n), -1, dtype=np.int32)
+        for i, facility in enumerate(self.facilities):
+            distances, parents, _ = shortest_path_tree(self.csr, [self.csr.node_id(facility)])
+            self.distances[i] = distances
+            self.parents[i] = parents
+        self.version = self.traffic.version if self.traffic is not None else None
+        self._bind_views()
+        return self
+
+    def refresh(self, edge_ids=None):
+        """
+        Updates the trees after a traffic change.
+        edge_ids: ids of the roads whose cost changed; without them every
+        tree is rebuilt.
+        Returns: number of table entries touched.
+        """
+        if self.distances is None:
+            raise RuntimeError("build() must be called before refresh()")
+        if self.csr is not self.graph:
+            self.csr.sync_from_networkx(self.graph, edge_ids)
+
+        if edge_ids is None:
+            self.rebuilds += 1
+            self.build()
+            return self.distances.size
+
+        self.repairs += 1
+        edge_ids = np.asarray(edge_ids).tolist()
+        return sum(repair_shortest_path_tree(self.csr, self._distance_views[i], self._parent_views[i], edge_ids)
+                   for i in range(len(self.facilities)))
+
+    def nearest(self, node, k=1):
+        """
+        The k facilities nearest to `node` at current traffic.
+        Paths run from `node` to the facility; reverse them for routes from
+        the facility.
+        Returns: (facilities, paths, costs), nearest first; unreachable
+        facilities are left out.
+        """
+        self._sync()
+        node_id = self.csr.node_id(node)
+        column = self.distances[:, node_id]
+        order = [int(i) for i in np.argsort(column, kind='stable')[:k] if np.isfinite(column[i])]
+        return ([self.facilities[i] for i in order], [self._walk(i, node_id) for i in order],
+                [float(column[i]) for i in order])
+
+    def route_to_nearest(self, node):
+        """Returns: (facility, path, cost) of the nearest facility, or (None, None, inf)."""
+        facilities, paths, costs = self.nearest(node, 1)
+        if not facilities:
+            return None, None, float('inf')
+        return facilities[0], paths[0], costs[0]
+
+    def _walk(self, i, node_id):
+        parents = self._parent_views[i]
+        coords = self.csr.adjacency_lists()[3]
+        path = []
+        while node_id != -1:
+            path.append(coords[node_id])
+            node_id = parents[node_id]
+        return path
+
+    def _sync(self):
+        """Applies the traffic changes since the last lookup."""
+        if self.distances is None:
+            self.build()
+        if self.traffic is None or self.version == self.traffic.version:
+            return
+        changes = self.traffic.changes_since(self.version)
+        self.version = self.traffic.version
+        self.refresh(None if changes is None else changes[0])
+
+    def _bind_views(self):
+        # memoryviews give fast scalar access straight into the NumPy tables
+        self._distance_views = [memoryview(row) for row in self.distances]
+        self._parent_views = [memoryview(row) for row in self.parents]
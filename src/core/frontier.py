@@ -0,0 +1,201 @@
+import heapq
+import itertools
+
+
+class BinaryHeapFrontier:
+    """
+    heapq-based frontier with lazy deletion.
+    Entries are (priority, counter, node): the insertion counter breaks ties
+    in FIFO order, so nodes themselves are never compared. Re-pushing a node
+    leaves its old entry in the heap; it is skipped (and counted) when popped.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.best = {}
+        self.counter = itertools.count()
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_size = 0
+
+    def push(self, node, priority):
+        best = self.best
+        best[node] = priority
+        heapq.heappush(self.heap, (priority, next(self.counter), node))
+        self.pushes += 1
+        if len(best) > self.peak_size:
+            self.peak_size = len(best)
+
+    def pop(self):
+        """Returns: (priority, node) of the best live entry."""
+        heap, best = self.heap, self.best
+        while True:
+            priority, _, node = heapq.heappop(heap)
+            if best.get(node) == priority:
+                del best[node]
+                self.pops += 1
+                return priority, node
+            self.stale_pops += 1
+
+    def __len__(self):
+        return len(self.best)
+
+    def stats(self):
+        return {'pushes': self.pushes, 'pops': self.pops, 'stale_pops': self.stale_pops,
+                'peak_size': self.peak_size}
+
+
+class RadixHeapFrontier:
+    """
+    Radix heap over quantized priorities.
+    Priorities are scaled by `scale` and rounded to integers; an entry lives in
+    the bucket given by the highest bit where its key differs from the last
+    popped key, so pushes are O(1) and every entry moves to a lower bucket at
+    most 64 times. Exact for monotone searches (Dijkstra, A* with a consistent
+    heuristic). Keys below the last popped key are clamped to it, which keeps
+    non-monotone searches (greedy, weighted A*) working in approximate order.
+    """
+
+    def __init__(self, scale=1e6):
+        self.scale = scale
+        self.buckets = [[] for _ in range(65)]
+        self.best = {}
+        self.last = 0
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.peak_size = 0
+
+    def push(self, node, priority):
+        key = int(priority * self.scale + 0.5)
+        if key < self.last:
+            key = self.last
+        best = self.best
+        best[node] = priority
+        self.buckets[(key ^ self.last).bit_length()].append((key, priority, node))
+        self.pushes += 1
+        if len(best) > self.peak_size:
+            self.peak_size = len(best)
+
+    def pop(self):
+        """Returns: (priority, node) of the best live entry."""
+        buckets, best = self.buckets, self.best
+        while True:
+            if not buckets[0]:
+                i = 1
+                while not buckets[i]:
+                    i += 1
+                entries = buckets[i]
+                buckets[i] = []
+                self.last = last = min(entry[0] for entry in entries)
+                for entry in entries:
+                    buckets[(entry[0] ^ last).bit_length()].append(entry)
+
+            _, priority, node = buckets[0].pop()
+            if best.get(node) == priority:
+                del best[node]
+                self.pops += 1
+                return priority, node
+            self.stale_pops += 1
+
+    def __len__(self):
+        return len(self.best)
+
+    def stats(self):
+        return {'pushes': self.pushes, 'pops': self.pops, 'stale_pops': self.stale_pops,
+                'peak_size': self.peak_size}
+
+
+class IndexedHeapFrontier:
+    """
+    Binary heap with a node -> position index and true decrease-key.
+    A node is stored at most once, so the heap never holds stale entries;
+    pushing a node already in the heap with a lower priority sifts it up,
+    and pushes with a higher priority are ignored.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.position = {}
+        self.counter = itertools.count()
+        self.pushes = 0
+        self.pops = 0
+        self.decrease_keys = 0
+        self.peak_size = 0
+
+    def push(self, node, priority):
+        self.pushes += 1
+        i = self.position.get(node)
+        if i is None:
+            self.heap.append((priority, next(self.counter), node))
+            i = len(self.heap) - 1
+            self.position[node] = i
+            if i >= self.peak_size:
+                self.peak_size = i + 1
+        elif priority < self.heap[i][0]:
+            self.heap[i] = (priority, next(self.counter), node)
+            self.decrease_keys += 1
+        else:
+            return
+        self._sift_up(i)
+
+    def pop(self):
+        """Returns: (priority, node) of the best entry."""
+        heap, position = self.heap, self.position
+        priority, _, node = heap[0]
+        del position[node]
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            position[last[2]] = 0
+            self._sift_down(0)
+        self.pops += 1
+        return priority, node
+
+    def __len__(self):
+        return len(self.heap)
+
+    def stats(self):
+        return {'pushes': self.pushes, 'pops': self.pops, 'stale_pops': 0, 'decrease_keys': self.decrease_keys,
+                'peak_size': self.peak_size}
+
+    def _sift_up(self, i):
+        heap, position = self.heap, self.position
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[i] = heap[parent]
+            position[heap[i][2]] = i
+            i = parent
+        heap[i] = entry
+        position[entry[2]] = i
+
+    def _sift_down(self, i):
+        heap, position = self.heap, self.position
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[i] = heap[child]
+            position[heap[i][2]] = i
+            i = child
+        heap[i] = entry
+        position[entry[2]] = i
+
+
+# Names accepted by RouteFinder(graph, frontier=...). RouteFinder runs 'binary'
+# as inlined heapq with the same (priority, counter, node) entries
+FRONTIERS = {
+    'binary': BinaryHeapFrontier,
+    'radix': RadixHeapFrontier,
+    'indexed': IndexedHeapFrontier,
+}
@@ -1,33 +1,62 @@
 import networkx as nx
+import numpy as np
 import random
 import math
 
+from src.core.csr_graph import CSRGraph
+
 class MapGenerator:
-    def __init__(self, width=20, height=20, obstacle_prob=0.2):
+    def __init__(self, width=20, height=20, obstacle_prob=0.2, seed=None):
         self.width = width
         self.height = height
         self.obstacle_prob = obstacle_prob
+        self.seed = seed
         self.graph = None
+        self.csr = None
+        self.obstacle_mask = None
+
+    def generate_grid_map(self, vectorized=False):
+        """Generates a grid graph with random obstacles.
+        With vectorized=True the map is drawn by `generate_csr_map` and only
+        converted to networkx at the end. Both paths give the same map for a
+        given seed; without one the loop below draws from the `random` module."""
+        if vectorized:
+            G = self.generate_csr_map().to_networkx()
+            self.graph = G
+            return G
 
-    def generate_grid_map(self):
-        """Generates a grid graph with random obstacles."""
         G = nx.grid_2d_graph(self.width, self.height)
-        
+
         for u, v in G.edges():
             G[u][v]['weight'] = 1.0
-            G[u][v]['traffic_factor'] = 1.0 
+            G[u][v]['traffic_factor'] = 1.0
 
         nodes_to_remove = []
-        for node in G.nodes():
-            if random.random() < self.obstacle_prob:
-                nodes_to_remove.append(node)
-        
+        if self.seed is not None:
+            nodes_to_remove = [tuple(cell) for cell in np.argwhere(self.generate_obstacle_mask()).tolist()]
+        else:
+            for node in G.nodes():
+                if random.random() < self.obstacle_prob:
+                    nodes_to_remove.append(node)
+
         for node in nodes_to_remove:
             G.remove_node(node)
-        
+
         self.graph = G
         return G
 
+    def generate_obstacle_mask(self):
+        """Draws the obstacle mask as one (width, height) boolean array from a
+        NumPy Generator seeded with `self.seed`."""
+        rng = np.random.default_rng(self.seed)
+        self.obstacle_mask = rng.random((self.width, self.height)) < self.obstacle_prob
+        return self.obstacle_mask
+
+    def generate_csr_map(self):
+        """Generates the map as a CSRGraph without building a networkx graph."""
+        self.csr = CSRGraph.from_grid(self.generate_obstacle_mask())
+        return self.csr
+
     def get_neighbors(self, node):
         return list(self.graph.neighbors(node))
 
@@ -0,0 +1,266 @@
+import heapq
+import math
+import numpy as np
+
+from src.core.csr_graph import CSRGraph
+
+
+class HierarchicalPlanner:
+    """
+    HPA* (Hierarchical Path-Finding A*) over a MapGenerator grid.
+
+    The map is cut into cluster_size x cluster_size clusters. Each maximal
+    open run along a cluster border gets one transition road (two, at its
+    ends, for runs of 6+ cells); the endpoints of the transitions are the
+    entrances. preprocess() stores the cost between every pair of entrances
+    of a cluster, searched inside that cluster only, which gives a small
+    abstract graph. A query links start and goal to the entrances of their
+    clusters, runs A* on the abstract graph and refines each abstract hop with
+    a search confined to a single cluster.
+
+    Routes may cross cluster borders only at entrances, so costs are
+    near-optimal rather than exact.
+    """
+
+    def __init__(self, graph, cluster_size=16):
+        self.graph = graph
+        self.csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+        self.cluster_size = cluster_size
+        self.abstract = None
+
+    def preprocess(self):
+        """Places entrances on every cluster border and builds all clusters."""
+        csr = self.csr
+        cells = csr.coords // self.cluster_size
+        rows = int(cells[:, 1].max()) + 1 if len(cells) else 0
+        columns = int(cells[:, 0].max()) + 1 if len(cells) else 0
+        cluster_of = cells[:, 0] * rows + cells[:, 1]
+        self.cluster_of = cluster_of.tolist()
+        self.num_clusters = rows * columns
+
+        coords = csr.coords.tolist()
+        edge_u, edge_v = csr.edge_u.tolist(), csr.edge_v.tolist()
+        crossing = np.nonzero(cluster_of[csr.edge_u] != cluster_of[csr.edge_v])[0]
+
+        # Crossing roads grouped by border, keyed by their position along it
+        borders = {}
+        for e in crossing.tolist():
+            u, v = edge_u[e], edge_v[e]
+            a, b = sorted((self.cluster_of[u], self.cluster_of[v]))
+            along = 1 if coords[u][0] != coords[v][0] else 0
+            borders.setdefault((a, b), []).append((coords[u][along], e))
+
+        self.transitions = []
+        for roads in borders.values():
+            roads.sort()
+            run = [roads[0][1]]
+            for (prev, _), (pos, e) in zip(roads, roads[1:]):
+                if pos != prev + 1:
+                    self._add_transitions(run)
+                    run = []
+                run.append(e)
+            self._add_transitions(run)
+
+        self.entrances = [[] for _ in range(self.num_clusters)]
+        self.cluster_transitions = [[] for _ in range(self.num_clusters)]
+        self.abstract = {}
+        for e in self.transitions:
+            for node in (edge_u[e], edge_v[e]):
+                cluster = self.cluster_of[node]
+                self.cluster_transitions[cluster].append(e)
+                if node not in self.abstract:
+                    self.abstract[node] = {}
+                    self.entrances[cluster].append(node)
+
+        self.refresh()
+        return self
+
+    def refresh(self, edge_ids=None):
+        """
+        Rebuilds clusters after a traffic change.
+        edge_ids: ids of the roads whose cost changed (as returned by
+        TrafficManager); only the clusters containing them are rebuilt.
+        Without edge_ids every cluster is rebuilt.
+        Returns: number of clusters rebuilt.
+        """
+        if self.abstract is None:
+            raise RuntimeError("preprocess() must be called before refresh()")
+        if self.csr is not self.graph:
+            self.csr.sync_from_networkx(self.graph, edge_ids)
+
+        if edge_ids is None:
+            clusters = range(self.num_clusters)
+        else:
+            edge_ids = np.asarray(edge_ids, dtype=np.int64)
+            cluster_of = np.asarray(self.cluster_of)
+            clusters = np.unique(np.concatenate([cluster_of[self.csr.edge_u[edge_ids]],
+                                                 cluster_of[self.csr.edge_v[edge_ids]]])).tolist()
+        for cluster in clusters:
+            self._build_cluster(cluster)
+        return len(clusters)
+
+    def query(self, start, goal):
+        """
+        Abstract A* between the entrances, then per-cluster refinement.
+        Returns: (path, cost, expanded_nodes) counting the nodes expanded by
+        the abstract search and by every cluster search.
+        """
+        s, t = self.csr.node_id(start), self.csr.node_id(goal)
+        if s == t:
+            return [self.csr.node(s)], 0, 0
+        cs, ct = self.cluster_of[s], self.cluster_of[t]
+        expanded_nodes = 0
+
+        # A goal in the same cluster may be best reached without leaving it
+        best_cost, best_path = float('inf'), None
+        if cs == ct:
+            distances, parents, settled = self._cluster_search(s, cs, goal=t)
+            expanded_nodes += settled
+            if t in parents:
+                best_cost, best_path = distances[t], self._chain(parents, t)[::-1]
+
+        start_dist, start_parents, settled = self._cluster_search(s, cs, self.entrances[cs])
+        expanded_nodes += settled
+        goal_dist, goal_parents, settled = self._cluster_search(t, ct, self.entrances[ct])
+        expanded_nodes += settled
+        start_links = {a: start_dist[a] for a in self.entrances[cs] if a in start_dist}
+        goal_links = {a: goal_dist[a] for a in self.entrances[ct] if a in goal_dist}
+
+        hops, cost, settled = self._abstract_search(s, t, start_links, goal_links)
+        expanded_nodes += settled
+        # The abstract route may add up the same in-cluster costs in another
+        # order; only leave the direct route when it is beaten by more than rounding
+        if hops is None or cost >= best_cost * (1 - 1e-9):
+            if best_path is None:
+                return None, float('inf'), expanded_nodes
+            return [self.csr.node(v) for v in best_path], best_cost, expanded_nodes
+
+        path = [s]
+        for i, (a, b) in enumerate(zip(hops, hops[1:])):
+            if a == b:
+                continue
+            cluster = self.cluster_of[a]
+            if cluster != self.cluster_of[b]:
+                path.append(b)
+            elif b == t:
+                # A start hop straight to the goal is the direct in-cluster route
+                path.extend(best_path[1:] if i == 0 else self._chain(goal_parents, a)[1:])
+            elif i == 0:
+                path.extend(self._chain(start_parents, b)[-2::-1])
+            else:
+                _, parents, settled = self._cluster_search(a, cluster, goal=b)
+                expanded_nodes += settled
+                path.extend(self._chain(parents, b)[-2::-1])
+        return [self.csr.node(v) for v in path], cost, expanded_nodes
+
+    def _add_transitions(self, run):
+        if len(run) < 6:
+            self.transitions.append(run[len(run) // 2])
+        else:
+            self.transitions.extend((run[0], run[-1]))
+
+    def _build_cluster(self, cluster):
+        """Recomputes the intra-cluster entrance costs and the costs of the
+        transition roads leaving the cluster."""
+        abstract, cluster_of = self.abstract, self.cluster_of
+        entrances = self.entrances[cluster]
+        for a in entrances:
+            links = abstract[a]
+            for b in [b for b in links if cluster_of[b] == cluster]:
+                del links[b]
+
+        for i, a in enumerate(entrances[:-1]):
+            distances, _, _ = self._cluster_search(a, cluster, entrances[i + 1:])
+            for b in entrances[i + 1:]:
+                if b in distances:
+                    abstract[a][b] = abstract[b][a] = distances[b]
+
+        csr = self.csr
+        for e in self.cluster_transitions[cluster]:
+            u, v = int(csr.edge_u[e]), int(csr.edge_v[e])
+            abstract[u][v] = abstract[v][u] = float(csr.weights[e] * csr.traffic[e])
+
+    def _cluster_search(self, source, cluster, targets=(), goal=None):
+        """
+        Dijkstra (A* when `goal` is given) that never leaves `cluster`. Stops
+        once every target, or the goal, is settled.
+        Returns: (distances, parents, settled_count); distances of the
+        targets/goal are final whenever present.
+        """
+        offsets, neighbors, costs, coords = self.csr.adjacency_lists()
+        cluster_of = self.cluster_of
+        remaining = {goal} if goal is not None else set(targets)
+        gx, gy = coords[goal] if goal is not None else coords[source]
+        use_heuristic = goal is not None
+
+        distances = {source: 0}
+        parents = {source: None}
+        queue = [(0, 0, source)]
+        settled = set()
+        while queue and remaining:
+            _, current_dist, current_node = heapq.heappop(queue)
+            if current_node in settled:
+                continue
+            settled.add(current_node)
+            remaining.discard(current_node)
+
+            for i in range(offsets[current_node], offsets[current_node + 1]):
+                neighbor = neighbors[i]
+                if cluster_of[neighbor] != cluster:
+                    continue
+                new_dist = current_dist + costs[i]
+                if new_dist < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = new_dist
+                    parents[neighbor] = current_node
+                    x, y = coords[neighbor]
+                    priority = new_dist + math.hypot(x - gx, y - gy) if use_heuristic else new_dist
+                    heapq.heappush(queue, (priority, new_dist, neighbor))
+
+        # Unreached targets may still hold tentative distances; drop them
+        for node in set(targets) - settled:
+            distances.pop(node, None)
+        if goal is not None and goal not in settled:
+            parents.pop(goal, None)
+        return distances, parents, len(settled)
+
+    def _abstract_search(self, s, t, start_links, goal_links):
+        """A* over the entrance graph with start/goal linked in temporarily.
+        Returns: (hops, cost, expanded_nodes)."""
+        _, _, _, coords = self.csr.adjacency_lists()
+        gx, gy = coords[t]
+        abstract = self.abstract
+
+        g_scores = {s: 0}
+        parents = {s: None}
+        queue = [(0, s)]
+        visited = set()
+        while queue:
+            _, current_node = heapq.heappop(queue)
+            if current_node in visited:
+                continue
+            visited.add(current_node)
+            if current_node == t:
+                return self._chain(parents, t)[::-1], g_scores[t], len(visited)
+
+            links = list(abstract.get(current_node, {}).items())
+            if current_node == s:
+                links.extend(start_links.items())
+            if current_node in goal_links:
+                links.append((t, goal_links[current_node]))
+
+            for neighbor, weight in links:
+                tentative_g = g_scores[current_node] + weight
+                if tentative_g < g_scores.get(neighbor, float('inf')):
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current_node
+                    x, y = coords[neighbor]
+                    heapq.heappush(queue, (tentative_g + math.hypot(x - gx, y - gy), neighbor))
+
+        return None, float('inf'), len(visited)
+
+    def _chain(self, parents, node):
+        chain = []
+        while node is not None:
+            chain.append(node)
+            node = parents[node]
+        return chain
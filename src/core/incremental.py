@@ -0,0 +1,134 @@
+import heapq
+
+from src.core.algorithms import RouteFinder
+
+
+class DStarLite:
+    """
+    Incremental planner (D* Lite) that keeps its search state between calls.
+
+    The search runs backward from the goal, so the vehicle's start can move
+    along the route without invalidating it. After edge costs change only
+    the nodes whose distance-to-goal is affected are re-expanded.
+
+    Usage:
+        planner = DStarLite(graph, start, goal)
+        path, cost, expanded = planner.plan()
+        changed = traffic_manager.apply_congestion_zone(center, radius)
+        planner.move_start(current_node)
+        planner.update_edges(traffic_manager.edge_nodes(changed))
+        path, cost, expanded = planner.plan()
+    """
+
+    def __init__(self, graph, start, goal):
+        self.finder = RouteFinder(graph)
+        self._refresh_view()
+        self.start = self._to_key(start)
+        self.goal = self._to_key(goal)
+        self.km = 0
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.queued = {}
+        self.queue = []
+        self._push(self.goal)
+
+    def plan(self, step_callback=None):
+        """
+        Repairs the search state and returns the current best route.
+        Returns: (path, cost, expanded_nodes) where expanded_nodes only counts
+        the work done by this call.
+        """
+        self._refresh_view()
+        expanded_nodes = self._compute_shortest_path(step_callback)
+        cost = self.g.get(self.start, float('inf'))
+        if cost == float('inf'):
+            return None, float('inf'), expanded_nodes
+
+        # Descend the distances-to-goal. Stale g values can stall the walk
+        # in a cycle or a dead end; that is no route, not a partial one.
+        path = [self.start]
+        node = self.start
+        while node != self.goal:
+            if len(path) > len(self.g):
+                return None, float('inf'), expanded_nodes
+            node, step = min(((neighbor, weight + self.g.get(neighbor, float('inf')))
+                              for neighbor, weight in self._edges(node)),
+                             key=lambda e: e[1], default=(None, float('inf')))
+            if step == float('inf'):
+                return None, float('inf'), expanded_nodes
+            path.append(node)
+        return [self._to_node(node) for node in path], cost, expanded_nodes
+
+    def move_start(self, node):
+        """Moves the start (e.g. the vehicle advanced along the route)."""
+        node = self._to_key(node)
+        self.km += self._h(self.start, node)
+        self.start = node
+
+    def update_edges(self, node_pairs):
+        """
+        Reports roads whose cost changed, as (u, v) node pairs
+        (see TrafficManager.edge_nodes). The next plan() repairs around them.
+        """
+        self._refresh_view()
+        for u, v in node_pairs:
+            self._update_vertex(self._to_key(u))
+            self._update_vertex(self._to_key(v))
+
+    def _compute_shortest_path(self, step_callback):
+        g, rhs, inf = self.g, self.rhs, float('inf')
+        expanded_nodes = 0
+        while self.queue:
+            k1, k2, node = self.queue[0]
+            if self.queued.get(node) != (k1, k2):
+                heapq.heappop(self.queue)
+                continue
+            start_key = self._key(self.start)
+            if (k1, k2) >= start_key and rhs.get(self.start, inf) == g.get(self.start, inf):
+                break
+
+            heapq.heappop(self.queue)
+            del self.queued[node]
+            new_key = self._key(node)
+            if (k1, k2) < new_key:
+                self._push(node, new_key)
+                continue
+
+            expanded_nodes += 1
+            if step_callback: step_callback(self._to_node(node))
+
+            if g.get(node, inf) > rhs.get(node, inf):
+                g[node] = rhs[node]
+                for neighbor, _ in self._edges(node):
+                    self._update_vertex(neighbor)
+            else:
+                g[node] = inf
+                self._update_vertex(node)
+                for neighbor, _ in self._edges(node):
+                    self._update_vertex(neighbor)
+        return expanded_nodes
+
+    def _update_vertex(self, node):
+        inf = float('inf')
+        if node != self.goal:
+            self.rhs[node] = min((cost + self.g.get(neighbor, inf) for neighbor, cost in self._edges(node)),
+                                 default=inf)
+        self.queued.pop(node, None)
+        if self.g.get(node, inf) != self.rhs.get(node, inf):
+            self._push(node)
+
+    def _key(self, node):
+        best = min(self.g.get(node, float('inf')), self.rhs.get(node, float('inf')))
+        return (best + self._h(self.start, node) + self.km, best)
+
+    def _push(self, node, key=None):
+        key = key or self._key(node)
+        self.queued[node] = key
+        heapq.heappush(self.queue, (key[0], key[1], node))
+
+    def _h(self, node_a, node_b):
+        return self.finder._heuristic(self._xy(node_a), self._xy(node_b))
+
+    def _refresh_view(self):
+        # Traffic updates replace the CSR cost lists, so re-read them per call
+        self._edges, self._to_key, self._to_node, self._xy = self.finder._search_view()
@@ -0,0 +1,54 @@
+import numpy as np
+
+from src.core.csr_graph import CSRGraph
+from src.core.sssp import shortest_path_tree
+
+
+def isochrone(graph, source, max_cost=float('inf'), shape=None):
+    """
+    Travel cost from `source` to every cell at current traffic, from one
+    Dijkstra that stops spreading past `max_cost`.
+    shape: (width, height) of the raster, e.g. that of the MapGenerator that
+    built the map; defaults to the map's bounding box.
+    Returns: (width, height) float array indexed [x, y] like the obstacle
+    mask; obstacles and cells beyond max_cost are inf.
+    """
+    costs, _ = coverage(graph, [source], max_cost, shape)
+    return costs
+
+
+def coverage(graph, stations, max_cost=float('inf'), shape=None):
+    """
+    Merges the isochrones of several stations in a single multi-source
+    search: every cell is labelled with its nearest station and the travel
+    cost from it.
+    Returns: (costs, nearest) rasters of shape (width, height). `nearest`
+    holds indices into `stations`, -1 where no station is within max_cost.
+    """
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+    width, height = shape or (csr.width, csr.height)
+    ids = np.array([csr.node_id(station) for station in stations], dtype=np.int64)
+    distances, _, origins = shortest_path_tree(csr, dict.fromkeys(ids.tolist()), max_cost)
+
+    # Node id of a station -> its index in `stations` (the first one wins on duplicates)
+    station_index = np.full(csr.number_of_nodes(), -1, dtype=np.int64)
+    station_index[ids[::-1]] = np.arange(len(ids))[::-1]
+    origins = np.asarray(origins, dtype=np.int64)
+
+    costs = np.full((width, height), np.inf)
+    nearest = np.full((width, height), -1, dtype=np.int64)
+    x, y = csr.coords[:, 0], csr.coords[:, 1]
+    costs[x, y] = distances
+    nearest[x, y] = np.where(origins >= 0, station_index[origins], -1)
+    return costs, nearest
+
+
+def isochrone_bands(costs, levels):
+    """
+    Buckets a cost raster by ascending `levels`, e.g. (4, 8, 12) minutes:
+    band i holds the cells with levels[i-1] < cost <= levels[i].
+    Returns: int raster of band indices, -1 beyond the last level.
+    """
+    bands = np.searchsorted(np.asarray(levels, dtype=np.float64), costs, side='left')
+    bands[bands == len(levels)] = -1
+    return bands
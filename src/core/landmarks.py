@@ -0,0 +1,102 @@
+import math
+import random
+import numpy as np
+
+from src.core.csr_graph import CSRGraph
+from src.core.sssp import shortest_path_tree, repair_shortest_path_tree
+
+
+class LandmarkHeuristic:
+    """
+    ALT (A*, Landmarks, Triangle inequality) heuristic.
+
+    Shortest-path distances from a few landmarks are stored in a
+    (num_landmarks, num_nodes) array. On an undirected map the triangle
+    inequality gives h(n) = max_L |d(L, goal) - d(L, n)| <= d(n, goal), which
+    is combined with the Euclidean bound. Instances are callables with the
+    same signature as RouteFinder._heuristic, so they plug into
+    `RouteFinder.a_star(..., heuristic=landmarks)`.
+    """
+
+    def __init__(self, graph, num_landmarks=8, seed=None):
+        self.graph = graph
+        self.csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+        self.num_landmarks = num_landmarks
+        self.seed = seed
+        self.landmarks = []
+        self.distances = None
+        self.parents = None
+
+    def select(self):
+        """
+        Picks landmarks by farthest-point selection and fills the distance tables.
+        Each new landmark is the reachable node farthest from all previous ones,
+        which pushes landmarks to the map border where their bounds are tight.
+        """
+        n = self.csr.number_of_nodes()
+        k = min(self.num_landmarks, n)
+        self.distances = np.full((k, n), np.inf)
+        self.parents = np.full((k, n), -1, dtype=np.int32)
+        self.landmarks = []
+        if k == 0:
+            return self
+
+        seed_node = random.Random(self.seed).randrange(n)
+        distances, _, _ = shortest_path_tree(self.csr, [seed_node])
+        nearest = np.asarray(distances)
+
+        for i in range(k):
+            reachable = np.where(np.isfinite(nearest), nearest, -1.0)
+            landmark = int(np.argmax(reachable))
+            self.landmarks.append(landmark)
+            distances, parents, _ = shortest_path_tree(self.csr, [landmark])
+            self.distances[i] = distances
+            self.parents[i] = parents
+            nearest = self.distances[i] if i == 0 else np.minimum(nearest, self.distances[i])
+
+        self._bind_views()
+        return self
+
+    def refresh(self, edge_ids=None):
+        """
+        Updates the tables after a traffic change.
+        edge_ids: ids of the roads whose cost changed (as returned by
+        TrafficManager); only the affected part of each landmark tree is
+        recomputed. Without edge_ids all tables are rebuilt.
+        Returns: number of table entries touched.
+        """
+        if self.distances is None:
+            raise RuntimeError("select() must be called before refresh()")
+        if self.csr is not self.graph:
+            self.csr.sync_from_networkx(self.graph, edge_ids)
+
+        if edge_ids is None:
+            for i, landmark in enumerate(self.landmarks):
+                distances, parents, _ = shortest_path_tree(self.csr, [landmark])
+                self.distances[i] = distances
+                self.parents[i] = parents
+            return self.distances.size
+
+        edge_ids = np.asarray(edge_ids).tolist()
+        return sum(repair_shortest_path_tree(self.csr, self._distance_views[i], self._parent_views[i], edge_ids)
+                   for i in range(len(self.landmarks)))
+
+    def __call__(self, node_a, node_b):
+        ids = self._cell_ids
+        a = ids[node_a[0]][node_a[1]]
+        b = ids[node_b[0]][node_b[1]]
+        best = math.sqrt((node_a[0] - node_b[0])**2 + (node_a[1] - node_b[1])**2)
+        for view in self._distance_views:
+            da, db = view[a], view[b]
+            # Equal infinities mean both nodes are cut off from this landmark
+            if da != db:
+                bound = abs(da - db)
+                if bound > best:
+                    best = bound
+        return best
+
+    def _bind_views(self):
+        # memoryviews give fast scalar access straight into the NumPy tables
+        self._distance_views = [memoryview(row) for row in self.distances]
+        self._parent_views = [memoryview(row) for row in self.parents]
+        self._cell_ids = self.csr.cell_lists()
@@ -0,0 +1,157 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.core.csr_graph import CSRGraph
+from src.core.algorithms import RouteFinder
+
+
+class SharedGraph:
+    """
+    A CSRGraph published once in `multiprocessing.shared_memory`.
+    Workers attach to the blocks by name and search on zero-copy views, so
+    the map is never pickled per task. A one-element `version` block tells
+    workers when the traffic costs were rewritten.
+    """
+
+    def __init__(self, csr):
+        self.blocks = {}
+        self.spec = {}
+        arrays = dict(csr.to_arrays(), version=np.array([csr.version], dtype=np.int64))
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            self.blocks[name] = block
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+        self.graph = CSRGraph.from_arrays(self._views(self.blocks))
+        self.graph.version = csr.version
+        self.version = self._view('version')
+
+    @staticmethod
+    def attach(spec):
+        """Opens the shared blocks described by `spec` in a worker process.
+        Returns: (CSRGraph view, version array, blocks to keep alive)."""
+        blocks = {}
+        for name, (block_name, _, _) in spec.items():
+            # Pool workers inherit the publisher's resource tracker, so attaching
+            # here does not hand ownership (or unlinking) to the worker
+            blocks[name] = shared_memory.SharedMemory(name=block_name)
+        views = {name: np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+                 for name, (_, shape, dtype) in spec.items()}
+        return CSRGraph.from_arrays(views), views['version'], blocks
+
+    def update_traffic(self, traffic, edge_ids=None):
+        """Writes new traffic factors (for all edges, or only `edge_ids`) and
+        publishes the new costs to every worker."""
+        if edge_ids is None:
+            self.graph.traffic[:] = traffic
+        else:
+            self.graph.traffic[np.asarray(edge_ids)] = traffic
+        self.graph.update_costs(edge_ids)
+        self.publish()
+
+    def publish(self):
+        """Tells the workers that `graph` costs were rewritten in place
+        (e.g. by a TrafficManager built on `graph`)."""
+        self.version[0] = self.graph.version
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+    def _views(self, blocks):
+        return {name: np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+                for name, (_, shape, dtype) in self.spec.items()}
+
+    def _view(self, name):
+        _, shape, dtype = self.spec[name]
+        return np.ndarray(shape, dtype=dtype, buffer=self.blocks[name].buf)
+
+
+_worker = {}
+
+
+def _init_worker(spec):
+    graph, version, blocks = SharedGraph.attach(spec)
+    _worker.update(graph=graph, version=version, blocks=blocks, finder=RouteFinder(graph))
+
+
+def _run_chunk(algorithm, chunk):
+    graph = _worker['graph']
+    # Costs live in shared memory and the search views read them in place;
+    # the version is only mirrored so the worker graph reports the published one
+    graph.version = int(_worker['version'][0])
+    search = getattr(_worker['finder'], algorithm)
+    return [(index, search(start, goal)) for index, start, goal in chunk]
+
+
+class ParallelQueryExecutor:
+    """
+    Runs RouteFinder searches in a process pool across all cores.
+
+    Usage:
+        with ParallelQueryExecutor(graph) as executor:
+            for index, (path, cost, expanded) in executor.imap(queries):
+                ...
+    Results stream back as chunks complete, tagged with the query index.
+    """
+
+    def __init__(self, graph, max_workers=None, chunksize=32):
+        csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.shared = SharedGraph(csr)
+        self.pool = ProcessPoolExecutor(self.max_workers, initializer=_init_worker,
+                                        initargs=(self.shared.spec,))
+
+    @property
+    def graph(self):
+        return self.shared.graph
+
+    def imap(self, queries, algorithm='dijkstra'):
+        """
+        queries: iterable of (start, goal) node pairs.
+        algorithm: name of a RouteFinder method with the (start, goal) signature.
+        Yields: (query index, (path, cost, expanded_nodes)) in completion order.
+        """
+        queries = list(queries)
+        # Several chunks per worker keep every core busy until the end
+        chunksize = max(1, min(self.chunksize, len(queries) // (self.max_workers * 4) or 1))
+        futures = [self.pool.submit(_run_chunk, algorithm,
+                                    [(i, s, g) for i, (s, g) in enumerate(queries[k:k + chunksize], k)])
+                   for k in range(0, len(queries), chunksize)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+    def submit(self, queries, algorithm='dijkstra'):
+        """
+        Schedules `queries` as a single chunk on one worker.
+        Returns: concurrent.futures.Future of [(query index, (path, cost, expanded_nodes))].
+        """
+        return self.pool.submit(_run_chunk, algorithm, [(i, s, g) for i, (s, g) in enumerate(queries)])
+
+    def run(self, queries, algorithm='dijkstra'):
+        """Blocking variant of imap. Returns the results in query order."""
+        results = [None] * len(queries)
+        for index, result in self.imap(queries, algorithm):
+            results[index] = result
+        return results
+
+    def update_traffic(self, traffic, edge_ids=None):
+        """Publishes new traffic factors. Call between batches, not while one is running."""
+        self.shared.update_traffic(traffic, edge_ids)
+
+    def close(self):
+        self.pool.shutdown()
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
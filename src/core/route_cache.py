@@ -0,0 +1,117 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+
+class RouteCache:
+    """
+    LRU cache in front of a RouteFinder, invalidated by traffic changes.
+
+    Entries are keyed by (algorithm, start, goal) and remember the edge ids
+    their path uses. When the TrafficManager version moves on, only entries
+    that are no longer valid are dropped:
+      - the cached path crosses a changed edge (its cost is stale), or
+      - a changed edge got cheaper and the straight-line bound
+        h(start, u) + cost(u, v) + h(v, goal) says a route through it could
+        now beat the cached cost.
+
+    Usage:
+        cache = RouteCache(RouteFinder(graph), traffic_manager)
+        path, cost, expanded = cache.route(depot, hospital, 'a_star')
+    """
+
+    def __init__(self, finder, traffic, max_entries=1024):
+        self.finder = finder
+        self.traffic = traffic
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.version = traffic.version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def route(self, start, goal, algorithm='a_star'):
+        """
+        Returns the cached result of `finder.<algorithm>(start, goal)`, or runs
+        the search and caches it. Hits report 0 expanded nodes.
+        Returns: (path, cost, expanded_nodes)
+        """
+        self._sync()
+        key = (algorithm, tuple(start), tuple(goal))
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            path, cost, _ = entry
+            return (list(path) if path else path), cost, 0
+
+        self.misses += 1
+        path, cost, expanded_nodes = getattr(self.finder, algorithm)(start, goal)
+        edge_ids = self.traffic.edge_ids(list(zip(path, path[1:]))) if path else np.zeros(0, dtype=np.int64)
+        self.entries[key] = (path, cost, set(edge_ids.tolist()))
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return path, cost, expanded_nodes
+
+    def clear(self):
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _sync(self):
+        """Drops the entries invalidated by traffic changes since the last lookup."""
+        if self.version == self.traffic.version:
+            return
+        changes = self.traffic.changes_since(self.version)
+        self.version = self.traffic.version
+        if changes is None:
+            # Change log was trimmed past our version; nothing can be trusted
+            self.clear()
+            return
+
+        edge_ids, old_factors = changes
+        changed = set(edge_ids.tolist())
+        cheaper = edge_ids[self.traffic.factors[edge_ids] < old_factors]
+        shortcuts = [(u, v, self._edge_cost(e, u, v))
+                     for e, (u, v) in zip(cheaper.tolist(), self.traffic.edge_nodes(cheaper))]
+
+        stale = []
+        for key, (path, cost, path_edges) in self.entries.items():
+            if not path:
+                # Obstacles never change, so unreachable goals stay unreachable
+                continue
+            if not changed.isdisjoint(path_edges) or self._could_beat(key[1], key[2], cost, shortcuts):
+                stale.append(key)
+        for key in stale:
+            del self.entries[key]
+        self.invalidations += len(stale)
+
+    @staticmethod
+    def _could_beat(start, goal, cost, shortcuts):
+        sx, sy = start
+        gx, gy = goal
+        for (ux, uy), (vx, vy), edge_cost in shortcuts:
+            via_uv = math.hypot(sx - ux, sy - uy) + math.hypot(vx - gx, vy - gy)
+            via_vu = math.hypot(sx - vx, sy - vy) + math.hypot(ux - gx, uy - gy)
+            if min(via_uv, via_vu) + edge_cost < cost:
+                return True
+        return False
+
+    def _edge_cost(self, edge_id, u, v):
+        factor = float(self.traffic.factors[edge_id])
+        if self.traffic.csr is not None:
+            return float(self.traffic.csr.weights[edge_id]) * factor
+        return self.traffic.graph[u][v].get('weight', 1) * factor
@@ -0,0 +1,80 @@
+import time
+
+
+class SearchStats:
+    """
+    Telemetry of the last RouteFinder search.
+
+    mode:
+      'off'      - nothing beyond expanded_nodes is recorded.
+      'counters' - frontier pushes, pops and stale pops, relaxations, improved
+                   relaxations, peak frontier size and wall-clock phases.
+                   Nothing is added to the inner loop: the frontier counts its
+                   own operations and relaxations are summed from the
+                   degrees of the expanded nodes once the search is done.
+      'trace'    - counters plus the expanded nodes in order. This routes
+                   every expansion through a callback, like step_callback.
+    """
+
+    MODES = ('off', 'counters', 'trace')
+    COUNTERS = ('expanded', 'pushes', 'pops', 'stale_pops', 'relaxations', 'improved', 'peak_frontier')
+    PHASES = ('setup_ms', 'search_ms', 'path_ms', 'total_ms')
+
+    def __init__(self, mode='counters'):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown stats mode {mode!r}; expected one of {self.MODES}")
+        self.mode = mode
+        self.reset()
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def reset(self, algorithm=None):
+        self.algorithm = algorithm
+        for name in self.COUNTERS + self.PHASES:
+            setattr(self, name, 0)
+        self.trace = []
+
+    def traced(self, step_callback):
+        """Returns the step callback to use: in trace mode, one that also records the expansion."""
+        if self.mode != 'trace':
+            return step_callback
+        trace = self.trace
+
+        def record(node):
+            trace.append(node)
+            if step_callback: step_callback(node)
+
+        return record
+
+    def record(self, algorithm, expanded, frontier, relaxations, clock):
+        """
+        Stores the result of one search.
+        frontier: dict with 'pushes', 'pops', 'stale_pops' and 'peak_size'.
+        clock: perf_counter readings (start, search started, search ended).
+        """
+        self.algorithm = algorithm
+        self.expanded = expanded
+        if not self.enabled:
+            return
+        self.pushes = frontier['pushes']
+        self.pops = frontier['pops']
+        self.stale_pops = frontier['stale_pops']
+        self.peak_frontier = frontier['peak_size']
+        self.relaxations = relaxations
+        # Every improved relaxation pushes once; the other pushes seed the search
+        self.improved = max(0, frontier['pushes'] - frontier.get('seeds', 1))
+        start, searching, searched = clock
+        done = time.perf_counter()
+        self.setup_ms = (searching - start) * 1000
+        self.search_ms = (searched - searching) * 1000
+        self.path_ms = (done - searched) * 1000
+        self.total_ms = (done - start) * 1000
+
+    def as_dict(self):
+        result = {'algorithm': self.algorithm, 'mode': self.mode}
+        result.update((name, getattr(self, name)) for name in self.COUNTERS + self.PHASES)
+        if self.mode == 'trace':
+            result['trace'] = list(self.trace)
+        return result
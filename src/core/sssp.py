@@ -0,0 +1,106 @@
+import heapq
+
+
+def shortest_path_tree(csr, sources, max_cost=float('inf')):
+    """
+    Multi-source Dijkstra over a CSRGraph.
+    sources: node ids (all seeded at cost 0).
+    max_cost: nodes farther than this are left unreached.
+    Returns: (distances, parents, origins) as lists indexed by node id;
+    unreached nodes have distance inf, parent -1 and origin -1. `origins`
+    holds the source each node was reached from.
+    """
+    offsets, neighbors, costs, _ = csr.adjacency_lists()
+    n = csr.number_of_nodes()
+    distances = [float('inf')] * n
+    parents = [-1] * n
+    origins = [-1] * n
+    queue = []
+    for source in sources:
+        distances[source] = 0
+        origins[source] = source
+        queue.append((0, source))
+    heapq.heapify(queue)
+
+    while queue:
+        current_dist, current_node = heapq.heappop(queue)
+        if current_dist > distances[current_node]:
+            continue
+        origin = origins[current_node]
+        for i in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = neighbors[i]
+            new_dist = current_dist + costs[i]
+            if new_dist < distances[neighbor] and new_dist <= max_cost:
+                distances[neighbor] = new_dist
+                parents[neighbor] = current_node
+                origins[neighbor] = origin
+                heapq.heappush(queue, (new_dist, neighbor))
+
+    return distances, parents, origins
+
+
+def repair_shortest_path_tree(csr, distances, parents, edge_ids):
+    """
+    Repairs a shortest-path tree in place after the costs of `edge_ids` changed.
+    `distances`/`parents` are any writable per-node sequences (lists,
+    memoryviews of NumPy arrays) produced by `shortest_path_tree`.
+
+    Subtrees hanging below a tree edge that got more expensive are cut off
+    and re-attached from their unaffected neighbors; cheaper edges seed a
+    Dijkstra that only spreads as far as distances actually improve.
+    Returns: number of nodes whose distance was touched.
+    """
+    offsets, neighbors, costs, _ = csr.adjacency_lists()
+    edge_u, edge_v = csr.edge_u, csr.edge_v
+    edge_cost = csr.weights * csr.traffic
+    inf = float('inf')
+
+    changed = []
+    cut_roots = []
+    for e in edge_ids:
+        u, v, cost = int(edge_u[e]), int(edge_v[e]), float(edge_cost[e])
+        for parent, child in ((u, v), (v, u)):
+            changed.append((parent, child, cost))
+            if parents[child] == parent and distances[parent] + cost > distances[child]:
+                cut_roots.append(child)
+
+    # Collect every descendant of the cut subtrees (children are neighbors whose parent points back)
+    affected = set(cut_roots)
+    stack = list(cut_roots)
+    while stack:
+        node = stack.pop()
+        for i in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[i]
+            if parents[neighbor] == node and neighbor not in affected:
+                affected.add(neighbor)
+                stack.append(neighbor)
+
+    for node in affected:
+        distances[node] = inf
+        parents[node] = -1
+
+    seeds = []
+    for parent, child, cost in changed:
+        if distances[parent] + cost < distances[child]:
+            seeds.append((distances[parent] + cost, child, parent))
+    for node in affected:
+        for i in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[i]
+            if neighbor not in affected and distances[neighbor] < inf:
+                seeds.append((distances[neighbor] + costs[i], node, neighbor))
+
+    touched = set(affected)
+    heapq.heapify(seeds)
+    while seeds:
+        new_dist, node, parent = heapq.heappop(seeds)
+        if new_dist >= distances[node]:
+            continue
+        distances[node] = new_dist
+        parents[node] = parent
+        touched.add(node)
+        for i in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[i]
+            if new_dist + costs[i] < distances[neighbor]:
+                heapq.heappush(seeds, (new_dist + costs[i], neighbor, node))
+
+    return len(touched)
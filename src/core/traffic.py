@@ -1,13 +1,91 @@
 import random
+from collections import deque
+
+import numpy as np
+
+from src.core.csr_graph import CSRGraph
+
+
+class EdgeGridIndex:
+    """
+    Uniform-grid spatial index over edge midpoints.
+    Edges are bucketed by the square cell their midpoint falls in, and the
+    buckets are stored CSR-style (sorted edge ids + bucket offsets), so a
+    radius query only scans the buckets overlapping the query box.
+    """
+
+    def __init__(self, midpoints, cell_size=8.0):
+        self.midpoints = midpoints
+        self.cell_size = cell_size
+        cells = np.floor(midpoints / cell_size).astype(np.int64) if len(midpoints) else np.zeros((0, 2), np.int64)
+        self.cols = int(cells[:, 0].max()) + 1 if len(cells) else 0
+        self.rows = int(cells[:, 1].max()) + 1 if len(cells) else 0
+        bucket = cells[:, 0] * self.rows + cells[:, 1]
+        self.order = np.argsort(bucket, kind='stable')
+        self.starts = np.zeros(self.cols * self.rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(bucket, minlength=self.cols * self.rows), out=self.starts[1:])
+
+    def query_radius(self, center, radius):
+        """Returns the ids of edges whose midpoint lies within `radius` of `center`."""
+        cx, cy = center
+        x0 = max(0, int(np.floor((cx - radius) / self.cell_size)))
+        x1 = min(self.cols - 1, int(np.floor((cx + radius) / self.cell_size)))
+        y0 = max(0, int(np.floor((cy - radius) / self.cell_size)))
+        y1 = min(self.rows - 1, int(np.floor((cy + radius) / self.cell_size)))
+        if x0 > x1 or y0 > y1:
+            return np.zeros(0, dtype=np.int64)
+
+        # Buckets of one column are contiguous for the whole [y0, y1] range
+        chunks = [self.order[self.starts[x * self.rows + y0]:self.starts[x * self.rows + y1 + 1]]
+                  for x in range(x0, x1 + 1)]
+        candidates = np.concatenate(chunks)
+        d = self.midpoints[candidates] - (cx, cy)
+        return candidates[(d * d).sum(axis=1) <= radius * radius]
+
 
 class TrafficManager:
-    def __init__(self, graph):
+    """
+    Edge-array-backed traffic layer.
+    Traffic factors are mirrored in one array indexed by edge id (the order
+    of `graph.edges()`, or the CSRGraph edge ids), so updates are computed
+    as NumPy masks and only the edges that actually change are written back
+    to the graph. Every update returns the ids of the edges it changed.
+
+    Each update also bumps `version`, stamps the edges in `edge_versions`
+    and appends to a bounded change log, so caches can ask what changed
+    since the version they last saw (see `changes_since`).
+    """
+
+    def __init__(self, graph, seed=None, max_log=256):
         self.graph = graph
+        self.csr = graph if isinstance(graph, CSRGraph) else None
+        # Without a seed traffic is drawn from the `random` module as before,
+        # so `random.seed` keeps reproducing the same runs
+        self.rng = np.random.default_rng(seed) if seed is not None else None
+
+        if self.csr is not None:
+            self.edges = None
+            self.factors = self.csr.traffic
+            coords = self.csr.coords.astype(np.float64)
+            endpoints_u, endpoints_v = coords[self.csr.edge_u], coords[self.csr.edge_v]
+        else:
+            self.edges = list(graph.edges())
+            self.factors = np.array([d.get('traffic_factor', 1.0) for _, _, d in graph.edges(data=True)])
+            endpoints_u = np.array([u for u, _ in self.edges], dtype=np.float64).reshape(-1, 2)
+            endpoints_v = np.array([v for _, v in self.edges], dtype=np.float64).reshape(-1, 2)
+
+        self.midpoints = (endpoints_u + endpoints_v) / 2
+        self.index = EdgeGridIndex(self.midpoints)
+
+        self.version = 0
+        self.edge_versions = np.zeros(len(self.factors), dtype=np.int64)
+        self.change_log = deque(maxlen=max_log)
+        self._edge_lookup = None
 
     def reset_traffic(self):
         """Resets all traffic factors to 1.0."""
-        for u, v in self.graph.edges():
-            self.graph[u][v]['traffic_factor'] = 1.0
+        changed = np.nonzero(self.factors != 1.0)[0]
+        return self.set_factors(changed, 1.0)
 
     def apply_random_traffic(self, intensity=0.3, max_factor=5.0):
         """
@@ -15,19 +93,79 @@ class TrafficManager:
         intensity: Probability of a road having traffic (0.0 to 1.0).
         max_factor: Maximum multiplier for weight (e.g. 5.0 means 5x slower).
         """
-        for u, v in self.graph.edges():
-            if random.random() < intensity:
-                factor = random.uniform(1.5, max_factor)
-                self.graph[u][v]['traffic_factor'] = factor
+        if self.rng is None:
+            changed, factors = [], []
+            for i in range(len(self.factors)):
+                if random.random() < intensity:
+                    changed.append(i)
+                    factors.append(random.uniform(1.5, max_factor))
+            return self.set_factors(changed, factors)
+        changed = np.nonzero(self.rng.random(len(self.factors)) < intensity)[0]
+        return self.set_factors(changed, self.rng.uniform(1.5, max_factor, len(changed)))
 
     def apply_congestion_zone(self, center_node, radius, factor=3.0):
         """Simulates an accident or heavy traffic in a specific area."""
-        cx, cy = center_node
-        for u, v in self.graph.edges():
-            ux, uy = u
-            vx, vy = v
-            mid_x, mid_y = (ux + vx) / 2, (uy + vy) / 2
-            
-            dist = ((mid_x - cx)**2 + (mid_y - cy)**2)**0.5
-            if dist <= radius:
-                self.graph[u][v]['traffic_factor'] = factor
+        return self.set_factors(self.index.query_radius(center_node, radius), factor)
+
+    def edge_nodes(self, edge_ids):
+        """Translates edge ids into ((x, y), (x, y)) node pairs."""
+        if self.csr is None:
+            return [self.edges[i] for i in np.asarray(edge_ids).tolist()]
+        return [(self.csr.node(self.csr.edge_u[i]), self.csr.node(self.csr.edge_v[i]))
+                for i in np.asarray(edge_ids).tolist()]
+
+    def edge_ids(self, node_pairs):
+        """Translates ((x, y), (x, y)) node pairs into edge ids (-1 if there is no road)."""
+        if self.csr is not None:
+            csr = self.csr
+            return np.array([csr.edge_id(csr.node_id(u), csr.node_id(v)) for u, v in node_pairs], dtype=np.int64)
+        if self._edge_lookup is None:
+            self._edge_lookup = {}
+            for i, (u, v) in enumerate(self.edges):
+                self._edge_lookup[u, v] = self._edge_lookup[v, u] = i
+        return np.array([self._edge_lookup.get(pair, -1) for pair in map(tuple, node_pairs)], dtype=np.int64)
+
+    def changes_since(self, version):
+        """
+        Lists the edges changed after `version`.
+        Returns: (edge_ids, old_factors) with the factors each edge had at
+        `version`, or None if the change log no longer reaches back that far.
+        """
+        if version == self.version:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        if not self.change_log or self.change_log[0][0] > version + 1:
+            return None
+
+        edge_ids, old_factors = [], []
+        for entry_version, ids, old in self.change_log:
+            if entry_version > version:
+                edge_ids.append(ids)
+                old_factors.append(old)
+        edge_ids, old_factors = np.concatenate(edge_ids), np.concatenate(old_factors)
+        # The first log entry touching an edge holds its factor at `version`
+        edge_ids, first = np.unique(edge_ids, return_index=True)
+        return edge_ids, old_factors[first]
+
+    def set_factors(self, edge_ids, factors, copy_costs=False):
+        """Writes traffic factors for the given edge ids and returns the ids.
+        copy_costs: publish the new CSRGraph costs as a fresh array (see
+        CSRGraph.update_costs), so searches already running keep the old ones."""
+        edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        if not self.factors.flags.writeable:
+            raise ValueError("Traffic of a map opened read-only (mmap_mode='r') cannot change; "
+                             "load it with mmap_mode='c' or None")
+        old_factors = self.factors[edge_ids]
+        self.factors[edge_ids] = factors
+
+        # Costs first: whoever sees the new version also sees its costs
+        if self.csr is not None:
+            self.csr.update_costs(edge_ids, copy=copy_costs)
+        else:
+            for i, f in zip(edge_ids.tolist(), self.factors[edge_ids].tolist()):
+                u, v = self.edges[i]
+                self.graph[u][v]['traffic_factor'] = f
+        if len(edge_ids):
+            self.edge_versions[edge_ids] = self.version + 1
+            self.change_log.append((self.version + 1, edge_ids, old_factors))
+            self.version += 1
+        return edge_ids
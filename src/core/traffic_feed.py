@@ -0,0 +1,314 @@
+import json
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+def parse_update(line):
+    """
+    Parses one feed line. Two encodings are accepted:
+      JSON: {"t": 12.5, "edge": 42, "factor": 2.0}
+            {"t": 12.5, "u": [3, 4], "v": [3, 5], "factor": 2.0}
+            {"t": 12.5, "zone": [10, 10], "radius": 4, "factor": 3.0}
+      CSV:  12.5,edge,42,2.0
+            12.5,road,3,4,3,5,2.0
+            12.5,zone,10,10,4,3.0
+    `t` (seconds since the epoch) may be empty/omitted.
+    Returns: ('edge', t, edge_id, factor), ('road', t, (u, v), factor) or
+    ('zone', t, (x, y), radius, factor). Raises ValueError on bad input.
+    """
+    line = line.strip()
+    if line.startswith('{'):
+        record = json.loads(line)
+        t = record.get('t')
+        if 'edge' in record:
+            return ('edge', t, int(record['edge']), float(record['factor']))
+        if 'zone' in record:
+            x, y = record['zone']
+            return ('zone', t, (x, y), float(record['radius']), float(record['factor']))
+        return ('road', t, (tuple(record['u']), tuple(record['v'])), float(record['factor']))
+
+    fields = line.split(',')
+    t = float(fields[0]) if fields[0] else None
+    kind = fields[1]
+    if kind == 'edge' and len(fields) == 4:
+        return ('edge', t, int(fields[2]), float(fields[3]))
+    if kind == 'zone' and len(fields) == 6:
+        return ('zone', t, (float(fields[2]), float(fields[3])), float(fields[4]), float(fields[5]))
+    if kind == 'road' and len(fields) == 7:
+        u, v = (int(fields[2]), int(fields[3])), (int(fields[4]), int(fields[5]))
+        return ('road', t, (u, v), float(fields[6]))
+    raise ValueError(f"Unrecognized feed line: {line!r}")
+
+
+def open_source(source):
+    """
+    Resolves a feed source to an iterable of text lines:
+    '-' (stdin), 'tcp://host:port', 'unix:///path/to/socket', a file path,
+    or any iterable of lines (open file, pipe, list).
+    """
+    return _connect(source)[0]
+
+
+def _connect(source):
+    """open_source, plus the socket behind the lines (None for other sources)."""
+    if not isinstance(source, str):
+        return source, None
+    if source == '-':
+        return sys.stdin, None
+    if source.startswith('tcp://'):
+        host, port = source[len('tcp://'):].rsplit(':', 1)
+        sock = socket.create_connection((host, int(port)))
+        return sock.makefile('r'), sock
+    if source.startswith('unix://'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(source[len('unix://'):])
+        return sock.makefile('r'), sock
+    return open(source), None
+
+
+class TrafficFeed:
+    """
+    Streaming traffic ingestion for a TrafficManager.
+
+    A reader thread parses timestamped edge/road/zone updates from a file,
+    pipe or local socket; an apply thread drains them in batches of up to
+    `max_batch` updates, or whatever arrived within `max_delay` seconds.
+    Each batch is coalesced (the last factor per edge wins) and written with
+    a single `TrafficManager.set_factors` call, which publishes one new
+    traffic version.
+
+    Queries never wait for the feed, and a batch is visible to the next
+    query. On a CSRGraph each batch is published as a new cost array that
+    replaces the old one in a single assignment (`copy_costs`), so a query
+    sees the traffic version it started with and never part of a batch.
+    Pass copy_costs=False when the costs live in shared memory and the
+    caller keeps searches out while a batch is written (RoutingService
+    does). A networkx graph is still updated edge by edge; a query on one
+    that must not see a half-applied batch should hold `feed.lock`, which
+    is taken for every batch.
+
+    Usage:
+        feed = TrafficFeed(traffic_manager)
+        feed.subscribe(lambda version, edge_ids: landmarks.refresh(edge_ids))
+        feed.start('tcp://localhost:9000')
+        ...
+        feed.stop()
+        print(feed.stats())
+    """
+
+    def __init__(self, traffic, max_batch=10000, max_delay=0.05, history=1000, copy_costs=True):
+        self.traffic = traffic
+        self.copy_costs = copy_costs
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.pending = deque()
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._reader_done = threading.Event()
+        self._threads = []
+        self._socket = None
+
+        self.updates = 0
+        self.malformed = 0
+        self.edges_written = 0
+        self.batches = deque(maxlen=history)
+        self.started_at = None
+
+    def subscribe(self, callback):
+        """Calls `callback(version, edge_ids)` after every applied batch."""
+        self.subscribers.append(callback)
+
+    def start(self, source):
+        """Starts ingesting `source` (see open_source) in background threads."""
+        self.started_at = time.monotonic()
+        lines, self._socket = _connect(source)
+        self._threads = [threading.Thread(target=self._read, args=(lines,), daemon=True),
+                         threading.Thread(target=self._apply_loop, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def run(self, source):
+        """Ingests `source` until it ends, then applies the remaining updates."""
+        self.start(source)
+        self.join()
+        return self
+
+    def join(self, timeout=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()) if deadline is not None else None)
+
+    def stop(self, timeout=1.0):
+        """
+        Stops reading; updates already received are still applied.
+        A reader waiting on an idle socket is woken by shutting the socket
+        down. One blocked on stdin or a pipe cannot be interrupted: it is
+        left behind (the threads are daemons) once `timeout` seconds passed.
+        """
+        self._stopping = True
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._wakeup.set()
+        self.join(timeout)
+
+    def ingest(self, lines):
+        """Parses and applies `lines` synchronously as one batch (no threads).
+        Returns: ids of the changed edges."""
+        if self.started_at is None:
+            self.started_at = time.monotonic()
+        now = time.monotonic()
+        batch = []
+        for line in lines:
+            update = self._parse(line)
+            if update is not None:
+                batch.append((now, update))
+        return self._apply(batch)
+
+    def stats(self):
+        """
+        Returns: {'updates', 'malformed', 'batches', 'edges_written',
+        'updates_per_sec', 'version', 'batch_size', 'lag_ms', 'source_lag_ms'}.
+        `lag_ms` is the time from receiving the oldest update of a batch to its
+        publication; `source_lag_ms` is measured from the update timestamps.
+        Distributions cover the last `history` batches.
+        """
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        batches = list(self.batches)
+
+        def distribution(values):
+            if not values:
+                return None
+            values = np.asarray(values, dtype=np.float64)
+            return {'mean': float(values.mean()), 'p50': float(np.percentile(values, 50)),
+                    'p95': float(np.percentile(values, 95)), 'max': float(values.max())}
+
+        return {
+            'updates': self.updates,
+            'malformed': self.malformed,
+            'batches': len(batches),
+            'edges_written': self.edges_written,
+            'updates_per_sec': self.updates / elapsed if elapsed > 0 else 0.0,
+            'version': self.traffic.version,
+            'batch_size': distribution([b['size'] for b in batches]),
+            'lag_ms': distribution([b['lag_ms'] for b in batches]),
+            'source_lag_ms': distribution([b['source_lag_ms'] for b in batches if b['source_lag_ms'] is not None]),
+        }
+
+    def _parse(self, line):
+        if not line.strip():
+            return None
+        try:
+            return parse_update(line)
+        except (ValueError, KeyError, TypeError, IndexError):
+            self.malformed += 1
+            return None
+
+    def _read(self, lines):
+        pending, wakeup, max_batch = self.pending, self._wakeup, self.max_batch
+        try:
+            for line in lines:
+                if self._stopping:
+                    break
+                update = self._parse(line)
+                if update is None:
+                    continue
+                pending.append((time.monotonic(), update))
+                # Only wake the applier when a batch starts or fills up
+                size = len(pending)
+                if size == 1 or size >= max_batch:
+                    wakeup.set()
+        finally:
+            if self._socket is not None:
+                lines.close()
+                self._socket.close()
+            self._reader_done.set()
+            wakeup.set()
+
+    def _apply_loop(self):
+        pending = self.pending
+        while True:
+            if not pending:
+                if self._reader_done.is_set() or self._stopping:
+                    return
+                self._wakeup.wait(self.max_delay)
+                self._wakeup.clear()
+                continue
+
+            remaining = self.max_delay - (time.monotonic() - pending[0][0])
+            flushing = self._reader_done.is_set() or self._stopping
+            if len(pending) < self.max_batch and remaining > 0 and not flushing:
+                self._wakeup.wait(remaining)
+                self._wakeup.clear()
+                continue
+
+            batch = [pending.popleft() for _ in range(min(len(pending), self.max_batch))]
+            self._apply(batch)
+
+    def _apply(self, batch):
+        if not batch:
+            return np.zeros(0, dtype=np.int64)
+        traffic = self.traffic
+        ids, factors = [], []
+        source_times = []
+        for _, update in batch:
+            kind, t = update[0], update[1]
+            if t is not None:
+                source_times.append(t)
+            if kind == 'edge':
+                ids.append(update[2])
+                factors.append(update[3])
+            elif kind == 'road':
+                edge = int(traffic.edge_ids([update[2]])[0]) if self._has_road(*update[2]) else -1
+                if edge >= 0:
+                    ids.append(edge)
+                    factors.append(update[3])
+                else:
+                    self.malformed += 1
+            else:
+                zone = traffic.index.query_radius(update[2], update[3]).tolist()
+                ids.extend(zone)
+                factors.extend([update[4]] * len(zone))
+
+        ids = np.asarray(ids, dtype=np.int64)
+        factors = np.asarray(factors, dtype=np.float64)
+        valid = (ids >= 0) & (ids < len(traffic.factors))
+        self.malformed += int(np.count_nonzero(~valid))
+        ids, factors = ids[valid], factors[valid]
+
+        # Coalesce: np.unique keeps the first hit, so search the reversed batch for last-wins
+        ids, last = np.unique(ids[::-1], return_index=True)
+        factors = factors[::-1][last]
+
+        t0 = time.monotonic()
+        with self.lock:
+            changed = traffic.set_factors(ids, factors, copy_costs=self.copy_costs)
+            version = traffic.version
+        published = time.monotonic()
+
+        self.updates += len(batch)
+        self.edges_written += len(changed)
+        self.batches.append({
+            'size': len(batch),
+            'edges': len(changed),
+            'apply_ms': (published - t0) * 1000,
+            'lag_ms': (published - batch[0][0]) * 1000,
+            'source_lag_ms': (time.time() - min(source_times)) * 1000 if source_times else None,
+        })
+        for callback in self.subscribers:
+            callback(version, changed)
+        return changed
+
+    def _has_road(self, u, v):
+        graph = self.traffic.graph
+        return graph.has_node(u) and graph.has_node(v)
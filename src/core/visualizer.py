@@ -1,16 +1,56 @@
 import matplotlib.pyplot as plt
 import networkx as nx
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import ListedColormap, to_rgba
+
+from src.core.csr_graph import CSRGraph
+from src.core.isochrone import isochrone_bands
+
+# Maps with more nodes than this (about 50x50) are drawn in fast mode by default
+FAST_MODE_NODES = 2500
+# Above this many roads the traffic layer is an image instead of a LineCollection
+LINE_COLLECTION_LIMIT = 150000
+OBSTACLE_COLORS = ListedColormap(['#3a3a3a', '#f2f2f2'])
+ORANGE, RED = to_rgba('orange'), to_rgba('red')
+
 
 class Visualizer:
-    def __init__(self, graph):
+    """
+    Draws a map with its traffic, a route and the start/goal nodes.
+
+    Classic mode draws every node and road with networkx. Fast mode (the
+    default above FAST_MODE_NODES nodes, and for CSRGraph maps) builds the
+    map once per axes: obstacles as an imshow raster, congested roads as a
+    single LineCollection, and the route and endpoints as overlay artists.
+    Later draws only recolor the traffic and move the overlays. Past
+    LINE_COLLECTION_LIMIT roads, where a road is thinner than a screen pixel
+    anyway, the traffic is painted into a half-cell resolution image instead.
+    """
+
+    def __init__(self, graph, fast=None):
+        if fast is None:
+            fast = isinstance(graph, CSRGraph) or graph.number_of_nodes() > FAST_MODE_NODES
+        if isinstance(graph, CSRGraph) and not fast:
+            graph = graph.to_networkx()
         self.graph = graph
-        self.pos = {node: node for node in graph.nodes()} 
+        self.fast = fast
+        self.pos = None if fast else {node: node for node in graph.nodes()}
+        self.ax = None
+        self._geometry = None
+        self._layers = None
+        self._isochrones = None
 
     def draw_scenario(self, path=None, title="Route Optimization", ax=None, start_node=None, goal_node=None):
+        if self.fast:
+            self._draw_fast(path, title, ax, start_node, goal_node)
+            return
+
         if ax is None:
             fig, ax = plt.subplots(figsize=(10, 10))
         else:
             ax.clear()
+        self.ax = ax
 
         edge_colors = []
         for u, v in self.graph.edges():
@@ -50,3 +90,145 @@ class Visualizer:
             output_file = "simulation_result.png"
             plt.savefig(output_file)
             print(f"Map saved to {output_file}")
+
+    def update_overlay(self, path=None, start_node=None, goal_node=None, title=None):
+        """
+        Moves the route and start/goal markers without touching the map layers.
+        In classic mode (or before the first draw) this falls back to a full draw.
+        Returns: the overlay artists, e.g. for blitting.
+        """
+        if not self.fast or self._layers is None or self._layers['raster'].axes is None:
+            self.draw_scenario(path, title or "Route Optimization", self.ax, start_node, goal_node)
+            return []
+
+        layers = self._layers
+        if path:
+            xs, ys = zip(*path)
+            layers['route'].set_data(xs, ys)
+            if start_node is None: start_node = path[0]
+            if goal_node is None: goal_node = path[-1]
+        else:
+            layers['route'].set_data([], [])
+        for key, node in (('start', start_node), ('goal', goal_node)):
+            if node:
+                layers[key].set_data([node[0]], [node[1]])
+            else:
+                layers[key].set_data([], [])
+        layers['legend'].set_visible(bool(start_node or goal_node))
+        if title is not None:
+            self.ax.set_title(title)
+        return [layers['route'], layers['start'], layers['goal']]
+
+    def refresh_traffic(self):
+        """Recolors the congested roads from the current traffic factors (fast mode)."""
+        segments = self._map_geometry()[1]
+        if isinstance(self.graph, CSRGraph):
+            factors = self.graph.traffic
+        else:
+            factors = np.fromiter((d.get('traffic_factor', 1.0) for _, _, d in self.graph.edges(data=True)),
+                                  dtype=np.float64, count=len(segments))
+        # Free-flowing roads are left to the raster; only congestion is drawn
+        congested = factors > 1.5
+        colors = np.where((factors[congested] > 3.0)[:, None], RED, ORANGE)
+        traffic = self._layers['traffic']
+        if isinstance(traffic, LineCollection):
+            traffic.set_segments(segments[congested])
+            traffic.set_color(colors)
+        else:
+            # A road's midpoint falls on its own pixel of the half-cell grid
+            image = np.zeros(traffic.get_array().shape, dtype=np.uint8)
+            cells = segments[congested].sum(axis=1).astype(np.int64)
+            image[cells[:, 1], cells[:, 0]] = (colors * 255).astype(np.uint8)
+            traffic.set_data(image)
+
+    def draw_isochrones(self, raster, levels=None, cmap='RdYlGn_r', alpha=0.45):
+        """
+        Shades a (width, height) raster from isochrone()/coverage() over the
+        drawn map as one image, e.g. draw_isochrones(costs, levels=(4, 8, 12))
+        or draw_isochrones(nearest, cmap='tab10'). Cells that are inf or
+        negative stay transparent. Repeated calls only swap the image data;
+        pass None to remove it. The next draw_scenario also clears it.
+        Returns: the image artist (None when removed).
+        """
+        image = self._isochrones
+        if image is not None and (raster is None or image.axes is not self.ax):
+            if image.axes is not None:
+                image.remove()
+            image = self._isochrones = None
+        if raster is None:
+            return None
+
+        data = np.asarray(raster, dtype=np.float64)
+        colors = plt.get_cmap(cmap)
+        if levels is not None:
+            data = isochrone_bands(data, levels).astype(np.float64)
+            colors = colors.resampled(len(levels))
+        data = np.ma.masked_where(~np.isfinite(data) | (data < 0), data)
+        low, high = (0, len(levels) - 1) if levels is not None else (0, data.max() if data.count() else 1)
+        if image is None:
+            width, height = data.shape
+            image = self._isochrones = self.ax.imshow(
+                data.T, origin='lower', cmap=colors, alpha=alpha, interpolation='nearest',
+                extent=(-0.5, width - 0.5, -0.5, height - 0.5), zorder=5)
+        else:
+            image.set_data(data.T)
+            image.set_cmap(colors)
+            image.set_alpha(alpha)
+        image.set_clim(low, max(high, low + 1e-9))
+        return image
+
+    def _draw_fast(self, path, title, ax, start_node, goal_node):
+        if ax is None:
+            fig, ax = plt.subplots(figsize=(10, 10))
+        layers = self._layers
+        if layers is None or self.ax is not ax or layers['raster'].axes is not ax:
+            ax.clear()
+            self._build_layers(ax)
+        else:
+            # Keep the map layers; drop whatever was drawn on top since (animation steps etc.)
+            own = set(self._layers['artists'])
+            for artist in list(ax.lines) + list(ax.collections) + list(ax.patches) + list(ax.images):
+                if artist not in own:
+                    artist.remove()
+        self.ax = ax
+        self.refresh_traffic()
+        self.update_overlay(path, start_node, goal_node, title)
+
+    def _build_layers(self, ax):
+        open_cells, segments = self._map_geometry()
+        width, height = open_cells.shape
+        raster = ax.imshow(open_cells.T, origin='lower', cmap=OBSTACLE_COLORS, vmin=0, vmax=1,
+                           extent=(-0.5, width - 0.5, -0.5, height - 0.5), interpolation='nearest', zorder=0)
+        if len(segments) > LINE_COLLECTION_LIMIT:
+            traffic = ax.imshow(np.zeros((max(2 * height - 1, 1), max(2 * width - 1, 1), 4), dtype=np.uint8),
+                                origin='lower', extent=(-0.25, width - 0.75, -0.25, height - 0.75),
+                                interpolation='nearest', zorder=10)
+        else:
+            traffic = LineCollection(np.zeros((0, 2, 2)), linewidths=1.5, alpha=0.8, zorder=10)
+            ax.add_collection(traffic)
+        route, = ax.plot([], [], color='green', linewidth=3.0, zorder=50)
+        start, = ax.plot([], [], 'o', color='lime', markersize=10, label="Start", zorder=100)
+        goal, = ax.plot([], [], 'o', color='red', markersize=10, label="Goal", zorder=100)
+        legend = ax.legend(handles=[start, goal])
+        ax.set_xlim(-0.5, width - 0.5)
+        ax.set_ylim(-0.5, height - 0.5)
+        ax.grid(True)
+        self._layers = {'raster': raster, 'traffic': traffic, 'route': route, 'start': start, 'goal': goal,
+                        'legend': legend, 'artists': [raster, traffic, route, start, goal]}
+
+    def _map_geometry(self):
+        """(width, height) open-cell mask and (E, 2, 2) road segments, in edge order."""
+        if self._geometry is None:
+            graph = self.graph
+            if isinstance(graph, CSRGraph):
+                open_cells = graph.cell_to_id >= 0
+                coords = graph.coords.astype(np.float64)
+                segments = np.stack([coords[graph.edge_u], coords[graph.edge_v]], axis=1)
+            else:
+                coords = np.array(list(graph.nodes()), dtype=np.int64).reshape(-1, 2)
+                width, height = (coords.max(axis=0) + 1) if len(coords) else (0, 0)
+                open_cells = np.zeros((width, height), dtype=bool)
+                open_cells[coords[:, 0], coords[:, 1]] = True
+                segments = np.array(list(graph.edges()), dtype=np.float64).reshape(-1, 2, 2)
+            self._geometry = (open_cells, segments)
+        return self._geometry
@@ -0,0 +1,70 @@
+import threading
+
+
+class SearchWorkspace:
+    """
+    Per-node search state that is allocated once and reused across queries.
+
+    `dist` and `parent` hold a node's tentative cost and predecessor; they are
+    only valid where the node's `seen` stamp equals `generation`. A `closed`
+    stamp equal to `generation` marks a node as expanded, and `expanded`
+    lists those nodes in order. Starting a query just bumps the generation,
+    so a query pays only for the nodes it touches instead of clearing O(V)
+    containers.
+
+    A CSRGraph gets plain lists indexed by node id; a networkx graph gets
+    dicts keyed by (x, y) node, which also follow nodes added later. The
+    search loops read stamps through `seen_stamp` / `closed_stamp`
+    (`list.__getitem__` or `dict.get`, which gives None for untouched nodes),
+    so the same loop serves both backends.
+    """
+
+    def __init__(self, csr=None):
+        if csr is None:
+            self.dist, self.parent = {}, {}
+            self.seen, self.closed = {}, {}
+            self.seen_stamp, self.closed_stamp = self.seen.get, self.closed.get
+        else:
+            n = csr.number_of_nodes()
+            self.dist = [float('inf')] * n
+            self.parent = [None] * n
+            self.seen = [0] * n
+            self.closed = [0] * n
+            self.seen_stamp, self.closed_stamp = self.seen.__getitem__, self.closed.__getitem__
+        self.generation = 0
+        self.expanded = []
+
+    def begin(self):
+        """Starts a new query. Returns: its generation."""
+        self.generation += 1
+        self.expanded = []
+        return self.generation
+
+
+class WorkspacePool:
+    """
+    Hands out SearchWorkspaces per thread. A workspace is owned by one query
+    at a time: a nested or concurrent query on the same thread gets another
+    one, and threads never share. Worker processes build their own pool.
+    """
+
+    def __init__(self, csr=None):
+        self.csr = csr
+        self._local = threading.local()
+
+    def acquire(self):
+        free = self._free()
+        workspace = free.pop() if free else SearchWorkspace(self.csr)
+        workspace.begin()
+        return workspace
+
+    def release(self, workspace):
+        """Returns `workspace` to this thread's pool. A workspace that is never
+        released (e.g. the query raised) is simply dropped."""
+        self._free().append(workspace)
+
+    def _free(self):
+        free = getattr(self._local, 'free', None)
+        if free is None:
+            free = self._local.free = []
+        return free
@@ -38,6 +38,8 @@ class RouteOptimizerApp:
         self.controller = GUIController(self)
         self.generate_map = self.controller.generate_map
         self.apply_traffic = self.controller.apply_traffic
+        self.open_map = self.controller.open_map
+        self.save_map = self.controller.save_map
         self.on_map_click = self.controller.on_map_click
         self.toggle_buttons = self.controller.toggle_buttons
         self.run_simulation_algo = self.controller.run_simulation_algo
@@ -1,31 +1,113 @@
-from src.gui_components.animation.helpers import get_batch_and_sleep
+from collections import deque
 
+import numpy as np
 
-def create_anim_callback(app, step_count_holder):
+from src.gui_components.animation.helpers import get_playback_rate, get_marker_size
+
+
+class SearchAnimation:
     """
-    Animasyon için callback factory. `step_count_holder` = [0] (mutable list).
-    Ekranda adım adım düğümleri çizerek animasyonu gösterir.
+    Arama animasyonu için üretici/tüketici hattı.
+
+    Üretici: arama thread'i `push` ile genişletilen düğümleri kuyruğa atar;
+    hiç uyumaz ve GUI'ye dokunmaz.
+    Tüketici: Tk ana döngüsünde `frame_ms` aralıklarla çalışır, kuyruktan
+    `speed_var` hızına göre bir parti düğüm alır ve hepsini tek bir scatter
+    artist'e ekler. Çizim blitting ile yapılır: harita katmanları bir kez
+    çizilip arka plan olarak saklanır, her karede yalnızca scatter çizilir.
+
+    Kullanım:
+        animation = SearchAnimation(app)
+        app.root.after(0, animation.start)
+        finder.dijkstra(s, g, step_callback=animation.push)
+        animation.close(on_done=finish)   # kuyruk boşalınca finish çağrılır
+        animation.close(on_done=report, error=exc)   # arama hata verdiyse
     """
-    def anim_callback(node):
-        if node == app.start_node or node == app.goal_node:
+
+    def __init__(self, app, frame_ms=33):
+        self.app = app
+        self.frame_ms = frame_ms
+        self.queue = deque()
+        self.skip = {app.start_node, app.goal_node}
+        self.offsets = np.empty((1024, 2))
+        self.count = 0
+        self.credit = 0.0
+        self.scatter = None
+        self.background = None
+        self.on_done = None
+        self.closed = False
+        self.error = None
+        self._draw_cid = None
+
+    def push(self, node):
+        """step_callback: arama thread'inden çağrılır, yalnızca kuyruğa ekler."""
+        if node not in self.skip:
+            self.queue.append(node)
+
+    def close(self, on_done=None, error=None):
+        """
+        Arama bitti; kuyruk boşaldığında `on_done` GUI thread'inde çağrılır.
+        error: arama thread'inde oluşan hata. Verilirse kalan kuyruk
+        oynatılmaz; döngü sonraki karede durur ve `on_done` hemen çağrılır.
+        """
+        self.on_done = on_done
+        self.error = error
+        self.closed = True
+
+    def start(self):
+        ax, canvas = self.app.sim_ax, self.app.sim_canvas
+        x0, x1 = ax.get_xlim()
+        self.scatter = ax.scatter([], [], s=get_marker_size(ax, x1 - x0), c='cyan', alpha=0.9,
+                                  zorder=1000, animated=True)
+        # Pencere yeniden boyutlanınca veya tam çizimde arka planı yeniden yakala
+        self._draw_cid = canvas.mpl_connect('draw_event', self._on_draw)
+        canvas.draw()
+        self.app.root.after(self.frame_ms, self._frame)
+
+    def _on_draw(self, event):
+        canvas, ax = self.app.sim_canvas, self.app.sim_ax
+        self.background = canvas.copy_from_bbox(ax.bbox)
+        ax.draw_artist(self.scatter)
+
+    def _frame(self):
+        if self.error is not None:
+            self.queue.clear()
+            self._stop()
+            return
+
+        # Oynatma hızı aramadan bağımsız: kare başına düşen düğüm sayısı
+        self.credit += get_playback_rate(self.app.speed_var.get()) * self.frame_ms / 1000
+        take = min(int(self.credit), len(self.queue))
+        # Kuyruk boşken biriken kredi sonradan tek karede boşaltılmasın
+        self.credit = min(self.credit - take, 1.0)
+
+        if take:
+            if self.count + take > len(self.offsets):
+                grown = np.empty((max(2 * len(self.offsets), self.count + take), 2))
+                grown[:self.count] = self.offsets[:self.count]
+                self.offsets = grown
+            popleft = self.queue.popleft
+            self.offsets[self.count:self.count + take] = [popleft() for _ in range(take)]
+            self.count += take
+            self.scatter.set_offsets(self.offsets[:self.count])
+            self._blit()
+
+        if self.closed and not self.queue:
+            self._stop()
+        else:
+            self.app.root.after(self.frame_ms, self._frame)
+
+    def _blit(self):
+        canvas, ax = self.app.sim_canvas, self.app.sim_ax
+        if self.background is None:
             return
-        
-        speed = app.speed_var.get()
-        batch_size, sleep_time = get_batch_and_sleep(speed)
-        
-        step_count_holder[0] += 1
-        
-        def draw_step():
-            app.sim_ax.plot(node[0], node[1], color='cyan', marker='o', 
-                           markersize=6, alpha=0.9, zorder=1000)
-            if step_count_holder[0] % batch_size == 0:
-                app.sim_canvas.draw()
-                app.root.update_idletasks()
-        
-        app.root.after(0, draw_step)
-        
-        if step_count_holder[0] % batch_size == 0 and sleep_time > 0:
-            import time
-            time.sleep(sleep_time)
-    
-    return anim_callback
+        canvas.restore_region(self.background)
+        ax.draw_artist(self.scatter)
+        canvas.blit(ax.bbox)
+
+    def _stop(self):
+        self.app.sim_canvas.mpl_disconnect(self._draw_cid)
+        # Ziyaret edilen düğümler son sahnede kalmasın diye scatter kaldırılır
+        self.scatter.remove()
+        if self.on_done:
+            self.on_done()
@@ -1,17 +1,14 @@
-import time
-
-def get_batch_and_sleep(speed: int):
-    """1..100 speed -> (batch_size 1..50, sleep_time 0.1..0.0)
-    Hız skalerini alıp animasyon için batch ve uyku süresi döndürür.
+def get_playback_rate(speed: int):
+    """1..100 speed -> expanded nodes shown per second (10 .. 20000, exponential)
+    Hız skalerini animasyonda saniyede gösterilecek düğüm sayısına çevirir.
     """
     speed = max(1, min(100, int(speed)))
-    batch_size = max(1, int(speed / 2))
-    sleep_time = max(0.0, (100 - speed) / 1000.0)
-    return batch_size, sleep_time
+    return 10 * 2000 ** ((speed - 1) / 99)
 
 
-def sleep_if_needed(step_count: int, batch_size: int, sleep_time: float):
-    if batch_size <= 0:
-        return
-    if step_count % batch_size == 0 and sleep_time > 0:
-        time.sleep(sleep_time)
+def get_marker_size(ax, width_cells: float):
+    """Scatter marker area (pt^2) that roughly fills one grid cell, capped at 36.
+    Büyük haritalarda işaretlerin birbirini örtmemesi için boyutu hücreye göre ayarlar.
+    """
+    cell_points = ax.bbox.width / max(width_cells, 1) * 72 / ax.figure.dpi
+    return max(1.0, min(36.0, (0.8 * cell_points) ** 2))
@@ -1,42 +1,48 @@
 from typing import Dict
 
+from src.benchmark.benchmark import STAT_METRICS
+
+# Treeview sütunları: sabit sonuçlar, ardından STAT_METRICS sayaçları
+BASE_COLUMNS = ('Size', 'Algorithm', 'Time (s)', 'Nodes', 'Memory (KB)', 'Path Length')
+BENCHMARK_COLUMNS = BASE_COLUMNS + tuple(STAT_METRICS)
+
+
+def configure_benchmark_tree(tree):
+    """Set the columns and headings of a ttk.Treeview to BENCHMARK_COLUMNS."""
+    tree['columns'] = BENCHMARK_COLUMNS
+    tree['show'] = 'headings'
+    for column in BENCHMARK_COLUMNS:
+        tree.heading(column, text=column)
+        tree.column(column, anchor='center', width=90 if column in STAT_METRICS else 110)
+
+
 def populate_benchmark_tree(tree, results: Dict):
     """Fill a ttk.Treeview `tree` with benchmark `results`.
-    Expects keys: sizes, dijkstra_times, astar_times, greedy_times, dijkstra_nodes, astar_nodes, greedy_nodes,
-    dijkstra_mem, astar_mem, greedy_mem, dijkstra_len, astar_len, greedy_len
+    Expects keys: sizes, algorithms (list of (key, label)) and, for every algorithm key,
+    <key>_times, <key>_nodes, <key>_mem, <key>_len; the search counters
+    <key>_<metric> for every metric of STAT_METRICS fill the remaining
+    BENCHMARK_COLUMNS (0 when missing).
     """
+    if tuple(tree['columns']) != BENCHMARK_COLUMNS:
+        configure_benchmark_tree(tree)
     for item in tree.get_children():
         tree.delete(item)
 
     sizes = results.get('sizes', [])
+    missing = [0] * len(sizes)
     count = 0
     for i, size in enumerate(sizes):
-        tag = 'even' if count % 2 == 0 else 'odd'
-        tree.insert("", "end", values=(
-            f"{size}", "Dijkstra", 
-            f"{results['dijkstra_times'][i]:.4f}", 
-            f"{results['dijkstra_nodes'][i]:.0f}",
-            f"{results['dijkstra_mem'][i]:.2f}",
-            f"{results['dijkstra_len'][i]:.0f}"
-        ), tags=(tag,))
-        count += 1
-
-        tag = 'even' if count % 2 == 0 else 'odd'
-        tree.insert("", "end", values=(
-            f"{size}", "A*", 
-            f"{results['astar_times'][i]:.4f}", 
-            f"{results['astar_nodes'][i]:.0f}",
-            f"{results['astar_mem'][i]:.2f}",
-            f"{results['astar_len'][i]:.0f}"
-        ), tags=(tag,))
-        count += 1
-
-        tag = 'even' if count % 2 == 0 else 'odd'
-        tree.insert("", "end", values=(
-            f"{size}", "Greedy", 
-            f"{results['greedy_times'][i]:.4f}", 
-            f"{results['greedy_nodes'][i]:.0f}",
-            f"{results['greedy_mem'][i]:.2f}",
-            f"{results['greedy_len'][i]:.0f}"
-        ), tags=(tag,))
-        count += 1
+        for key, label in results['algorithms']:
+            tag = 'even' if count % 2 == 0 else 'odd'
+            # Süreler (ms) ondalıklı, sayaçlar tam sayı
+            counters = [f"{results.get(f'{key}_{metric}', missing)[i]:{'.2f' if metric.endswith('_ms') else '.0f'}}"
+                        for metric in STAT_METRICS]
+            tree.insert("", "end", values=(
+                f"{size}", label,
+                f"{results[f'{key}_times'][i]:.4f}",
+                f"{results[f'{key}_nodes'][i]:.0f}",
+                f"{results[f'{key}_mem'][i]:.2f}",
+                f"{results[f'{key}_len'][i]:.0f}",
+                *counters
+            ), tags=(tag,))
+            count += 1
@@ -2,9 +2,9 @@ import threading
 import time
 import traceback
 
-from src.core import MapGenerator, TrafficManager, RouteFinder, Visualizer
+from src.core import MapGenerator, CSRGraph, TrafficManager, RouteFinder, Visualizer
 from src.benchmark import get_benchmark_data
-from src.gui_components.animation.callback import create_anim_callback
+from src.gui_components.animation.callback import SearchAnimation
 from src.gui_components.benchmark.processor import finish_benchmark_process
 
 class GUIController:
@@ -26,8 +26,9 @@ class GUIController:
         elif event.button == 3:
             self.app.goal_node = node
             self.app.sim_result_text.set(f"Goal set to {node}")
-        self.app.visualizer.draw_scenario(path=None, ax=self.app.sim_ax, title="Map (Custom Points)", start_node=self.app.start_node, goal_node=self.app.goal_node)
-        self.app.sim_canvas.draw()
+        # Sadece başlangıç/hedef işaretleri taşınır; harita katmanları yeniden çizilmez
+        self.app.visualizer.update_overlay(start_node=self.app.start_node, goal_node=self.app.goal_node, title="Map (Custom Points)")
+        self.app.sim_canvas.draw_idle()
 
     def generate_map(self):
         if hasattr(self.app, 'is_running') and self.app.is_running: return
@@ -48,6 +49,39 @@ class GUIController:
         self.app.traffic_manager = TrafficManager(self.app.graph)
         self.apply_traffic()
 
+    def open_map(self):
+        """Kaydedilmiş bir haritayı (trafik durumuyla birlikte) aç."""
+        if hasattr(self.app, 'is_running') and self.app.is_running: return
+        from tkinter import filedialog, messagebox
+        path = filedialog.askopenfilename(title="Open Map", filetypes=[("Map files", "*.npz"), ("All files", "*.*")])
+        if not path: return
+        try:
+            # CSRGraph olarak kalır: Visualizer hızlı modu ve aramalar doğrudan dizileri kullanır
+            self.app.graph = CSRGraph.load(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Harita açılamadı:\n{e}")
+            return
+        self.app.visualizer = Visualizer(self.app.graph)
+        nodes = list(self.app.graph.nodes())
+        if not nodes: return
+        self.app.start_node = nodes[0]
+        self.app.goal_node = nodes[-1]
+        # Kaydedilen trafik korunur; yeniden rastgele trafik uygulanmaz
+        self.app.traffic_manager = TrafficManager(self.app.graph)
+        self.app.visualizer.draw_scenario(ax=self.app.sim_ax, title="Map Loaded", start_node=self.app.start_node, goal_node=self.app.goal_node)
+        self.app.sim_canvas.draw()
+        self.app.sim_result_text.set(f"Map loaded: {path}")
+
+    def save_map(self):
+        """Aktif haritayı ve trafik durumunu .npz dosyasına kaydet."""
+        if not self.app.graph: return
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(title="Save Map", defaultextension=".npz", filetypes=[("Map files", "*.npz")])
+        if not path: return
+        graph = self.app.graph
+        (graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)).save(path)
+        self.app.sim_result_text.set(f"Map saved: {path}")
+
     def apply_traffic(self):
         if hasattr(self.app, 'is_running') and self.app.is_running: return
         if not self.app.graph: return
@@ -116,13 +150,13 @@ class GUIController:
             traceback.print_exc()
 
     def _run_algo_thread(self, algo):
+        animation = None
         try:
             finder = RouteFinder(self.app.graph)
             self.app.root.after(0, lambda: self.app.visualizer.draw_scenario(path=None, ax=self.app.sim_ax, title=f"Running {algo} (Animating...)", start_node=self.app.start_node, goal_node=self.app.goal_node))
-            self.app.root.after(0, self.app.sim_canvas.draw)
-            self.app.root.after(0, self.app.sim_canvas.draw)
-            step_count_holder = [0]
-            anim_callback = create_anim_callback(self.app, step_count_holder)
+            animation = SearchAnimation(self.app)
+            self.app.root.after(0, animation.start)
+            anim_callback = animation.push
             t0 = time.process_time()
             if algo == 'dijkstra':
                 path, cost, exp = finder.dijkstra(self.app.start_node, self.app.goal_node, step_callback=anim_callback)
@@ -143,12 +177,23 @@ class GUIController:
                 self.app.sim_canvas.draw()
                 self.app.is_running = False
                 self.toggle_buttons('normal')
-            self.app.root.after(0, finish)
+            # Arama bitti; animasyon kuyruğu oynatılıp bitince sonuç çizilir
+            animation.close(on_done=finish)
         except Exception as e:
             print(f"ERROR in _run_algo_thread: {e}")
-            self.app.is_running = False
-            self.app.root.after(0, lambda: self.toggle_buttons('normal'))
             traceback.print_exc()
+            error = e
+
+            def report():
+                self.app.sim_result_text.set(f"Error: {error}")
+                self.app.sim_canvas.draw()
+                self.app.is_running = False
+                self.toggle_buttons('normal')
+            # Animasyon döngüsü durdurulur; hata GUI thread'inde gösterilir
+            if animation is not None:
+                animation.close(on_done=report, error=error)
+            else:
+                self.app.root.after(0, report)
 
     def start_benchmark_thread(self):
         if not self.app.graph:
@@ -0,0 +1,4 @@
+# Routing service: asyncio HTTP/JSON front end over a worker pool
+from src.service.server import RoutingService, LatencyHistogram, Overloaded, ServiceClosed
+
+__all__ = ['RoutingService', 'LatencyHistogram', 'Overloaded', 'ServiceClosed']
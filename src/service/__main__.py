@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+
+from src.core import MapGenerator, CSRGraph, TrafficManager
+from src.service.server import RoutingService, ALGORITHMS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Routing service (HTTP/JSON)")
+    parser.add_argument('--host', default='127.0.0.1', help='Listen address')
+    parser.add_argument('--port', type=int, default=8080, help='Listen port')
+    parser.add_argument('--load-map', default=None, help='Serve a saved .npz map (with its traffic)')
+    parser.add_argument('--width', type=int, default=100, help='Generated map width')
+    parser.add_argument('--height', type=int, default=100, help='Generated map height')
+    parser.add_argument('--obstacles', type=float, default=0.2, help='Obstacle probability (0-1)')
+    parser.add_argument('--traffic', type=float, default=0.3, help='Traffic probability (0-1)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Search processes (default: all cores; 0 searches on one thread)')
+    parser.add_argument('--algorithm', default='a_star', choices=ALGORITHMS, help='Default algorithm')
+    parser.add_argument('--max-batch', type=int, default=64, help='Most queries dispatched per batch')
+    parser.add_argument('--batch-window-ms', type=float, default=2.0,
+                        help='How long a batch waits for concurrent requests')
+    parser.add_argument('--max-pending', type=int, default=1024, help='Queued requests before answering 429')
+    parser.add_argument('--deadline-ms', type=float, default=5000, help='Default per-request deadline')
+    args = parser.parse_args(argv)
+
+    if args.load_map:
+        graph = CSRGraph.load(args.load_map)
+    else:
+        graph = MapGenerator(args.width, args.height, args.obstacles, seed=args.seed).generate_csr_map()
+        TrafficManager(graph, seed=args.seed).apply_random_traffic(args.traffic)
+
+    async def serve():
+        service = RoutingService(graph, args.workers, args.algorithm, args.max_batch, args.batch_window_ms / 1000,
+                                 args.max_pending, args.deadline_ms / 1000)
+        await service.start(args.host, args.port)
+        print(f"Serving {graph.number_of_nodes()} nodes on http://{args.host}:{service.port} "
+              f"({service.stats()['workers']} workers)")
+        try:
+            await service.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+import asyncio
+import bisect
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.csr_graph import CSRGraph
+from src.core.algorithms import RouteFinder
+from src.core.parallel import ParallelQueryExecutor
+from src.core.traffic import TrafficManager
+from src.core.traffic_feed import TrafficFeed
+
+# RouteFinder methods that can be requested by name
+ALGORITHMS = ['a_star', 'dijkstra', 'greedy_bfs', 'bidirectional_dijkstra', 'bidirectional_a_star']
+LATENCY_BOUNDS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+BATCH_BOUNDS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+MAX_BODY = 16 * 1024 * 1024
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 429: 'Too Many Requests', 500: 'Internal Server Error',
+           503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+
+class Overloaded(Exception):
+    """Raised when the request queue is full."""
+
+
+class ServiceClosed(Exception):
+    """Raised for requests still queued when the service shuts down."""
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram. Bucket i counts values <= bounds[i]; the last
+    bucket holds everything larger. Percentiles are reported as the upper
+    bound of the bucket holding that rank, so they never understate.
+    """
+
+    def __init__(self, bounds=LATENCY_BOUNDS_MS):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        """Returns: {'count', 'mean', 'max', 'p50', 'p95', 'p99', 'buckets': [[le, count], ...]}"""
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'max': self.max,
+            'p50': self.percentile(0.50),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'buckets': [[bound, count] for bound, count in zip(self.bounds + ['+inf'], self.counts)],
+        }
+
+
+class _PendingRoute:
+    __slots__ = ('algorithm', 'start', 'goal', 'deadline', 'enqueued', 'future')
+
+    def __init__(self, algorithm, start, goal, deadline, enqueued, future):
+        self.algorithm = algorithm
+        self.start = start
+        self.goal = goal
+        self.deadline = deadline
+        self.enqueued = enqueued
+        self.future = future
+
+
+class RoutingService:
+    """
+    Asyncio HTTP/JSON routing service over one in-memory map.
+
+    Concurrent route requests are queued and drained in batches: every
+    `batch_window` seconds (or once `max_batch` requests are waiting),
+    identical queries are merged and the batch is split into chunks that
+    run on a ParallelQueryExecutor process pool (workers=0 runs them on a
+    single background thread instead). The event loop itself never searches.
+
+    Backpressure: at most `max_pending` requests wait in the queue (further
+    requests get 429), and at most two chunks per worker are in flight.
+    Requests still queued when the service closes get 503.
+    Every request has a deadline (`deadline_ms` in the request, or
+    `default_deadline` seconds); it is answered with 504 once it expires,
+    and dropped before dispatch if it is still queued by then.
+
+    Endpoints:
+        POST /route    {"start": [x, y], "goal": [x, y], "algorithm": "a_star", "deadline_ms": 500}
+        POST /traffic  TrafficFeed lines (CSV or JSON), one update per line
+        GET  /stats    counters and latency histograms
+        GET  /health
+    """
+
+    def __init__(self, graph, workers=None, algorithm='a_star', max_batch=64, batch_window=0.002,
+                 max_pending=1024, default_deadline=5.0):
+        self.workers = workers
+        if workers == 0:
+            self.executor = None
+            self.graph = graph if isinstance(graph, CSRGraph) else CSRGraph.from_networkx(graph)
+            self.finder = RouteFinder(self.graph)
+            self.thread = ThreadPoolExecutor(1)
+        else:
+            self.executor = ParallelQueryExecutor(graph, max_workers=workers)
+            # Traffic is written straight into the shared-memory copy the workers read
+            self.graph = self.executor.graph
+        self.traffic = TrafficManager(self.graph)
+        # Searches are drained before every batch, so costs (shared with the
+        # worker processes) are written in place
+        self.feed = TrafficFeed(self.traffic, copy_costs=False)
+
+        self.algorithm = algorithm
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.default_deadline = default_deadline
+        self.slots_total = 2 * (self.executor.max_workers if self.executor else 1)
+
+        self.counters = {'requests': 0, 'ok': 0, 'rejected': 0, 'timeouts': 0, 'errors': 0,
+                         'coalesced': 0, 'batches': 0, 'traffic_updates': 0}
+        self.histograms = {'latency_ms': LatencyHistogram(), 'queue_ms': LatencyHistogram(),
+                           'search_ms': LatencyHistogram(), 'batch_size': LatencyHistogram(BATCH_BOUNDS)}
+        self.inflight = 0
+        self.queue = None
+        self.server = None
+        self._tasks = set()
+        self._connections = set()
+
+    async def start(self, host='127.0.0.1', port=8080):
+        """Starts the dispatcher and the HTTP listener (port=0 picks a free port)."""
+        self.queue = asyncio.Queue(self.max_pending)
+        self.slots = asyncio.Semaphore(self.slots_total)
+        self.traffic_lock = asyncio.Lock()
+        if self.executor:
+            # Fork the workers now: forked after clients connect, they would
+            # inherit the client sockets and keep them open
+            await asyncio.wrap_future(self.executor.submit([], self.algorithm))
+        self._dispatcher = asyncio.ensure_future(self._dispatch_loop())
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        # Idle keep-alive connections end on EOF instead of being cancelled
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.sleep(0)
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        while not self.queue.empty():
+            request = self.queue.get_nowait()
+            if not request.future.done():
+                request.future.set_exception(ServiceClosed("Service is shutting down"))
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.executor:
+            self.executor.close()
+        else:
+            self.thread.shutdown()
+
+    async def route(self, start, goal, algorithm=None, deadline_ms=None):
+        """
+        Queues one query and waits for its batch.
+        Returns: {'path', 'cost', 'expanded', 'latency_ms'}.
+        Raises: ValueError on bad input, Overloaded when the queue is full,
+        asyncio.TimeoutError when the deadline passes.
+        """
+        loop = asyncio.get_running_loop()
+        received = loop.time()
+        self.counters['requests'] += 1
+        algorithm = algorithm or self.algorithm
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm {algorithm!r}")
+        start, goal = tuple(map(int, start)), tuple(map(int, goal))
+        for node in (start, goal):
+            if len(node) != 2 or not self.graph.has_node(node):
+                raise ValueError(f"Node {list(node)} is an obstacle or outside the map")
+
+        timeout = deadline_ms / 1000 if deadline_ms is not None else self.default_deadline
+        request = _PendingRoute(algorithm, start, goal, received + timeout, received, loop.create_future())
+        try:
+            self.queue.put_nowait(request)
+        except asyncio.QueueFull:
+            self.counters['rejected'] += 1
+            raise Overloaded("Request queue is full")
+
+        try:
+            path, cost, expanded = await asyncio.wait_for(asyncio.shield(request.future), timeout)
+        except asyncio.TimeoutError:
+            request.future.cancel()
+            self.counters['timeouts'] += 1
+            raise
+        latency = (loop.time() - received) * 1000
+        self.histograms['latency_ms'].observe(latency)
+        self.counters['ok'] += 1
+        return {'path': [list(node) for node in path] if path else None,
+                'cost': cost if math.isfinite(cost) else None,
+                'expanded': expanded, 'latency_ms': latency}
+
+    async def update_traffic(self, lines):
+        """
+        Applies TrafficFeed lines as one batch. New chunks are held back and
+        in-flight ones drained first, so no search sees a half-written update.
+        Parsing and applying run on a worker thread, so the event loop keeps
+        accepting requests meanwhile.
+        Returns: {'version', 'changed'}.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.traffic_lock:
+            for _ in range(self.slots_total):
+                await self.slots.acquire()
+            try:
+                changed = await loop.run_in_executor(None, self._apply_traffic, lines)
+            finally:
+                for _ in range(self.slots_total):
+                    self.slots.release()
+        self.counters['traffic_updates'] += 1
+        return {'version': self.traffic.version, 'changed': len(changed)}
+
+    def _apply_traffic(self, lines):
+        changed = self.feed.ingest(lines)
+        if self.executor:
+            self.executor.shared.publish()
+        return changed
+
+    def stats(self):
+        return {
+            'nodes': self.graph.number_of_nodes(),
+            'edges': self.graph.number_of_edges(),
+            'workers': self.executor.max_workers if self.executor else 0,
+            'traffic_version': self.traffic.version,
+            'queue_depth': self.queue.qsize() if self.queue else 0,
+            'inflight_chunks': self.inflight,
+            'counters': dict(self.counters),
+            'histograms': {name: h.snapshot() for name, h in self.histograms.items()},
+        }
+
+    async def _dispatch_loop(self):
+        queue = self.queue
+        while True:
+            batch = [await queue.get()]
+            try:
+                # Give concurrent requests one window to join the batch
+                if queue.qsize() < self.max_batch - 1 and self.batch_window > 0:
+                    await asyncio.sleep(self.batch_window)
+                while len(batch) < self.max_batch and not queue.empty():
+                    batch.append(queue.get_nowait())
+                await self._dispatch(batch)
+            except asyncio.CancelledError:
+                # Closing: the batch being collected is failed like the queue
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(ServiceClosed("Service is shutting down"))
+                raise
+            except Exception as exc:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(exc)
+
+    async def _dispatch(self, batch):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        groups = {}
+        for request in batch:
+            if request.future.done():
+                continue
+            if now >= request.deadline:
+                request.future.set_exception(asyncio.TimeoutError())
+                continue
+            self.histograms['queue_ms'].observe((now - request.enqueued) * 1000)
+            groups.setdefault((request.algorithm, request.start, request.goal), []).append(request)
+        if not groups:
+            return
+        live = sum(len(requests) for requests in groups.values())
+        self.counters['coalesced'] += live - len(groups)
+        self.counters['batches'] += 1
+        self.histograms['batch_size'].observe(len(groups))
+
+        by_algorithm = {}
+        for (algorithm, start, goal), requests in groups.items():
+            by_algorithm.setdefault(algorithm, []).append(((start, goal), requests))
+        workers = self.executor.max_workers if self.executor else 1
+        for algorithm, items in by_algorithm.items():
+            chunksize = math.ceil(len(items) / workers)
+            for k in range(0, len(items), chunksize):
+                part = items[k:k + chunksize]
+                await self.slots.acquire()
+                self.inflight += 1
+                future = asyncio.wrap_future(self._submit([query for query, _ in part], algorithm))
+                task = asyncio.ensure_future(self._complete(future, part, loop.time()))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    def _submit(self, queries, algorithm):
+        if self.executor:
+            return self.executor.submit(queries, algorithm)
+        search = getattr(self.finder, algorithm)
+        return self.thread.submit(lambda: [(i, search(s, g)) for i, (s, g) in enumerate(queries)])
+
+    async def _complete(self, future, part, submitted):
+        try:
+            results = await future
+        except Exception as exc:
+            for _, requests in part:
+                for request in requests:
+                    if not request.future.done():
+                        request.future.set_exception(exc)
+            return
+        finally:
+            self.inflight -= 1
+            self.slots.release()
+
+        elapsed = (asyncio.get_running_loop().time() - submitted) * 1000
+        self.histograms['search_ms'].observe(elapsed / len(part))
+        for index, result in results:
+            for request in part[index][1]:
+                if not request.future.done():
+                    request.future.set_result(result)
+
+    async def handle(self, method, path, body):
+        """Routes one HTTP request. Returns: (status, JSON-ready payload)."""
+        try:
+            if path == '/route':
+                if method != 'POST':
+                    return 405, {'error': 'use POST'}
+                query = json.loads(body or b'{}')
+                return 200, await self.route(query['start'], query['goal'], query.get('algorithm'),
+                                             query.get('deadline_ms'))
+            if path == '/traffic':
+                if method != 'POST':
+                    return 405, {'error': 'use POST'}
+                return 200, await self.update_traffic(body.decode().splitlines())
+            if path == '/stats':
+                return 200, self.stats()
+            if path == '/health':
+                return 200, {'status': 'ok'}
+            return 404, {'error': f'no such endpoint {path}'}
+        except (ValueError, KeyError, TypeError) as exc:
+            self.counters['errors'] += 1
+            return 400, {'error': str(exc)}
+        except Overloaded as exc:
+            return 429, {'error': str(exc)}
+        except ServiceClosed as exc:
+            return 503, {'error': str(exc)}
+        except asyncio.TimeoutError:
+            return 504, {'error': 'deadline exceeded'}
+        except Exception as exc:
+            self.counters['errors'] += 1
+            return 500, {'error': f'{type(exc).__name__}: {exc}'}
+
+    async def _handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive; one request at a time per connection."""
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY:
+                    status, payload = 413, {'error': 'body too large'}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.handle(method, target.split('?')[0], body)
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                content = json.dumps(payload).encode()
+                head = [f"HTTP/1.1 {status} {REASONS[status]}", 'Content-Type: application/json',
+                        f"Content-Length: {len(content)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                if status in (429, 503):
+                    head.append('Retry-After: 1')
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + content)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
@@ -0,0 +1,165 @@
+import math
+import random
+
+import networkx as nx
+import pytest
+
+from src.core import RouteFinder
+from src.core.frontier import FRONTIERS
+from tests.utils import random_map, nodes_of, path_cost
+
+
+def reference_costs(graph, start, goals):
+    """networkx Dijkstra, independent of RouteFinder."""
+    G = graph if isinstance(graph, nx.Graph) else graph.to_networkx()
+    lengths = nx.single_source_dijkstra_path_length(
+        G, start, weight=lambda u, v, d: d.get('weight', 1.0) * d.get('traffic_factor', 1.0))
+    return [lengths.get(goal, math.inf) for goal in goals]
+
+
+def queries(graph, seed, count=20):
+    nodes = nodes_of(graph)
+    rng = random.Random(seed)
+    return [(rng.choice(nodes), rng.choice(nodes)) for _ in range(count)]
+
+
+def check(graph, result, start, goal, optimal, bound=1.0):
+    path, cost, _ = result
+    if optimal == math.inf:
+        assert path is None and cost == math.inf
+        return
+    assert path[0] == start and path[-1] == goal
+    assert path_cost(graph, path) == pytest.approx(cost)
+    assert optimal - 1e-9 <= cost <= optimal * bound + 1e-9
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(4))
+def test_dijkstra_matches_networkx(seed, csr):
+    graph, _ = random_map(seed, 25, 25, csr=csr)
+    finder = RouteFinder(graph)
+    for start, goal in queries(graph, seed):
+        optimal, = reference_costs(graph, start, [goal])
+        check(graph, finder.dijkstra(start, goal), start, goal, optimal)
+
+
+@pytest.mark.parametrize('frontier', sorted(FRONTIERS))
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_every_frontier_is_optimal(seed, csr, frontier):
+    graph, _ = random_map(seed, 25, 25, csr=csr)
+    finder, reference = RouteFinder(graph, frontier=frontier), RouteFinder(graph)
+    for start, goal in queries(graph, seed):
+        optimal = reference.dijkstra(start, goal)[1]
+        check(graph, finder.dijkstra(start, goal), start, goal, optimal)
+        check(graph, finder.a_star(start, goal), start, goal, optimal)
+        greedy = finder.greedy_bfs(start, goal)
+        check(graph, greedy, start, goal, optimal, bound=math.inf)
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(4))
+def test_bidirectional_searches_are_optimal(seed, csr):
+    graph, _ = random_map(seed, 25, 25, csr=csr)
+    finder = RouteFinder(graph)
+    for start, goal in queries(graph, seed):
+        optimal = finder.dijkstra(start, goal)[1]
+        check(graph, finder.bidirectional_dijkstra(start, goal), start, goal, optimal)
+        check(graph, finder.bidirectional_a_star(start, goal), start, goal, optimal)
+
+
+@pytest.mark.parametrize('csr', [False, True])
+def test_reused_workspaces_do_not_leak_between_queries(csr):
+    graph, _ = random_map(7, 25, 25, csr=csr)
+    finder = RouteFinder(graph)
+    pairs = queries(graph, 7)
+    fresh = [RouteFinder(graph).a_star(start, goal) for start, goal in pairs]
+    for _ in range(2):
+        for (start, goal), expected in zip(pairs, fresh):
+            finder.dijkstra(goal, start)
+            assert finder.a_star(start, goal) == expected
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('counts', [(3, 5), (5, 3)])
+def test_many_to_many_matches_dijkstra(seed, csr, counts):
+    graph, _ = random_map(seed, 25, 25, csr=csr)
+    rng = random.Random(seed)
+    nodes = nodes_of(graph)
+    sources = [rng.choice(nodes) for _ in range(counts[0])]
+    targets = [rng.choice(nodes) for _ in range(counts[1])]
+    sources.append(sources[0])
+    finder = RouteFinder(graph)
+
+    costs, paths, _ = finder.many_to_many(sources, targets, return_paths=True)
+    for i, source in enumerate(sources):
+        for j, target in enumerate(targets):
+            optimal = finder.dijkstra(source, target)[1]
+            check(graph, (paths[i][j], costs[i, j], None), source, target, optimal)
+    assert (finder.many_to_many(sources, targets)[0] == costs).all()
+
+    one_paths, one_costs, _ = finder.one_to_many(sources[0], targets)
+    assert one_costs == pytest.approx(list(costs[0]))
+    for target, path, cost in zip(targets, one_paths, one_costs):
+        check(graph, (path, cost, None), sources[0], target, finder.dijkstra(sources[0], target)[1])
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('traffic', [0.0, 0.3])
+@pytest.mark.parametrize('seed', range(4))
+def test_jump_point_search_is_optimal(seed, traffic, csr):
+    graph, _ = random_map(seed, 25, 25, traffic=traffic, csr=csr)
+    finder = RouteFinder(graph)
+    for start, goal in queries(graph, seed):
+        optimal = finder.dijkstra(start, goal)[1]
+        check(graph, finder.jump_point_search(start, goal), start, goal, optimal)
+        # Jumping itself must stay optimal when congestion forces extra jump points
+        check(graph, finder.jump_point_search(start, goal, max_congestion=1.0), start, goal, optimal)
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('epsilon', [1.0, 1.5, 3.0])
+@pytest.mark.parametrize('seed', range(3))
+def test_weighted_a_star_stays_within_epsilon(seed, epsilon, csr):
+    graph, _ = random_map(seed, 25, 25, csr=csr)
+    finder = RouteFinder(graph)
+    for start, goal in queries(graph, seed):
+        optimal = finder.dijkstra(start, goal)[1]
+        check(graph, finder.a_star(start, goal, epsilon=epsilon), start, goal, optimal, bound=epsilon)
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_ara_star_bounds_hold_every_round(seed, csr):
+    graph, _ = random_map(seed, 25, 25, csr=csr)
+    finder = RouteFinder(graph)
+    for start, goal in queries(graph, seed, count=10):
+        optimal = finder.dijkstra(start, goal)[1]
+        rounds = list(finder.ara_star(start, goal, deadline=60, epsilon=3.0, epsilon_step=0.5))
+        costs = [cost for _, cost, _, _ in rounds]
+        assert costs == sorted(costs, reverse=True)
+        for path, cost, _, bound in rounds:
+            check(graph, (path, cost, None), start, goal, optimal, bound=bound)
+        if optimal != math.inf:
+            assert rounds[-1][3] == 1.0
+
+
+@pytest.mark.parametrize('frontier', ['binary', 'indexed'])
+def test_equal_priorities_pop_in_push_order(frontier):
+    # Neighbours are pushed in insertion order, which is neither the
+    # coordinate order nor its reverse, so only a FIFO tie-break passes
+    graph = nx.Graph()
+    center, leaves, goal = (5, 5), [(6, 5), (4, 5), (5, 6)], (5, 8)
+    for leaf in leaves:
+        graph.add_edge(center, leaf, weight=1.0)
+    graph.add_edge(leaves[-1], (5, 7), weight=1.0)
+    graph.add_edge((5, 7), goal, weight=1.0)
+
+    for search in ('dijkstra', 'bidirectional_dijkstra'):
+        trace = []
+        getattr(RouteFinder(graph, frontier=frontier), search)(center, goal, step_callback=trace.append)
+        if search == 'dijkstra':
+            assert trace[:4] == [center] + leaves
+        else:
+            assert [node for node in trace if node in leaves] == leaves
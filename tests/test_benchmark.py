@@ -0,0 +1,95 @@
+import statistics
+
+import pytest
+
+from src.benchmark import scaling, benchmark
+from src.benchmark.harness import summarize, compare_results
+from src.benchmark.scaling import fit_scaling, usable_size, build_corpus, run_scaling
+from tests.utils import random_map, nodes_of
+
+
+def test_summarize_uses_nearest_rank_p95():
+    samples = list(range(20, 0, -1))
+    assert summarize(samples) == {
+        'n': 20, 'median': 10.5, 'p95': 19, 'mean': 10.5,
+        'stddev': pytest.approx(statistics.stdev(samples)), 'min': 1, 'max': 20,
+    }
+    assert summarize([4.0]) == {'n': 1, 'median': 4.0, 'p95': 4.0, 'mean': 4.0, 'stddev': 0.0,
+                                'min': 4.0, 'max': 4.0}
+    assert summarize([])['n'] == 0 and summarize([])['p95'] == 0.0
+
+
+def result_file(**algorithms):
+    """One-scenario result file; each algorithm is (median, p95, nodes)."""
+    return {'scenarios': [{'name': 'map', 'algorithms': {
+        key: {'time_ms': {'median': median, 'p95': p95}, 'nodes': nodes}
+        for key, (median, p95, nodes) in algorithms.items()}}]}
+
+
+def test_regression_needs_both_the_threshold_and_the_baseline_p95():
+    baseline = result_file(slow=(10.0, 12.0, 50), noisy=(10.0, 14.0, 50), fast=(10.0, 12.0, 50),
+                           changed=(10.0, 12.0, 50), gone=(10.0, 12.0, 50))
+    candidate = result_file(slow=(13.0, 14.0, 50), noisy=(13.0, 15.0, 50), fast=(7.0, 8.0, 50),
+                            changed=(10.2, 11.0, 60), new=(1.0, 1.0, 1))
+    rows = {row['algorithm']: row for row in compare_results(baseline, candidate, threshold=0.10)}
+    assert {key: row['status'] for key, row in rows.items()} == {
+        # 30% slower and above the old p95 of 12
+        'slow': 'regression',
+        # 30% slower, but still inside the old run's own spread (p95 14)
+        'noisy': 'ok',
+        'fast': 'improvement',
+        'changed': 'changed',
+    }
+    assert rows['slow']['ratio'] == pytest.approx(1.3)
+    assert compare_results(baseline, candidate, threshold=0.5)[0]['status'] == 'ok'
+
+
+def test_power_law_fit_recovers_exponent():
+    xs = [100, 400, 1600, 6400]
+    fit = fit_scaling(xs, [3.0 * x ** 1.5 for x in xs])
+    assert fit == {'a': pytest.approx(3.0), 'b': pytest.approx(1.5)}
+    assert usable_size(fit, 3.0 * 2500 ** 1.5) == pytest.approx(2500)
+    # Non-positive points are dropped; one distinct size cannot be fitted
+    assert fit_scaling([100, 100, 0], [5.0, 7.0, 1.0]) is None
+    assert usable_size({'a': 1.0, 'b': 0.0}, 10) is None
+
+
+def test_budget_stops_an_algorithm_on_larger_maps(monkeypatch):
+    # Median time per query grows with size: 'slow' passes 25 ms at 20 cells per side
+    rates = {'fast': 0.5, 'slow': 1.5}
+    seen = []
+
+    def fake_benchmark(graph, queries, algorithms, warmup, repeat, memory):
+        size = graph.width
+        seen.append((size, [key for key, _, _ in algorithms]))
+        return {key: {'time_ms': {'median': rates[key] * size}, 'nodes': float(size)}
+                for key, _, _ in algorithms}
+
+    monkeypatch.setattr(scaling, 'benchmark_queries', fake_benchmark)
+    algorithms = [(key, key, None) for key in rates]
+    corpus = build_corpus([30, 10, 20, 40], buckets={'any': (0.0, 1.0)}, num_queries=3)
+    results = run_scaling(corpus, algorithms, budget_ms=25)
+
+    assert seen == [(10, ['fast', 'slow']), (20, ['fast', 'slow']), (30, ['fast']), (40, ['fast'])]
+    group = corpus[0]['group']
+    assert results['limits'] == {group: {'slow': 20}}
+    assert results['fits'][group]['fast']['time_ms'] is not None
+
+
+@pytest.mark.parametrize('keys', [('dijkstra', 'astar'), ('dijkstra', 'alt')])
+def test_landmarks_are_only_built_for_alt(monkeypatch, keys):
+    built = []
+
+    class CountingLandmarks(benchmark.LandmarkHeuristic):
+        def select(self, *args, **kwargs):
+            built.append(self)
+            return super().select(*args, **kwargs)
+
+    monkeypatch.setattr(benchmark, 'LandmarkHeuristic', CountingLandmarks)
+    graph, _ = random_map(1, 12, 12)
+    nodes = nodes_of(graph)
+    algorithms = [entry for entry in benchmark.ALGORITHMS if entry[0] in keys]
+    results = benchmark.get_benchmark_data(custom_graph=graph, start_node=nodes[0], goal_node=nodes[-1],
+                                           warmup=0, repeat=1, algorithms=algorithms)
+    assert [key for key, _ in results['algorithms']] == list(keys)
+    assert len(built) == ('alt' in keys)
@@ -0,0 +1,41 @@
+import math
+import random
+
+import pytest
+
+from src.core import RouteFinder, ContractionHierarchy
+from tests.utils import random_map, nodes_of, path_cost, traffic_rounds
+
+
+def check_queries(graph, hierarchy, rng, count=15):
+    finder = RouteFinder(graph)
+    nodes = nodes_of(graph)
+    for _ in range(count):
+        start, goal = rng.choice(nodes), rng.choice(nodes)
+        path, cost, _ = hierarchy.query(start, goal)
+        optimal = finder.dijkstra(start, goal)[1]
+        if optimal == math.inf:
+            assert path is None and cost == math.inf
+            continue
+        assert path[0] == start and path[-1] == goal
+        assert cost == pytest.approx(optimal)
+        assert path_cost(graph, path) == pytest.approx(optimal)
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_incremental_customization_matches_dijkstra(seed, csr):
+    graph, manager = random_map(seed, 24, 24, csr=csr)
+    rng = random.Random(seed)
+    hierarchy = ContractionHierarchy(graph, leaf_size=16)
+    hierarchy.preprocess()
+    check_queries(graph, hierarchy, rng)
+
+    for changed in traffic_rounds(manager, nodes_of(graph), rng):
+        hierarchy.customize(changed)
+        check_queries(graph, hierarchy, rng)
+
+    # Repaired shortcut weights equal a full customization from scratch
+    repaired = list(hierarchy.weights)
+    hierarchy.customize()
+    assert repaired == pytest.approx(hierarchy.weights)
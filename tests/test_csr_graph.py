@@ -0,0 +1,135 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.core import RouteFinder, CSRGraph, TrafficManager
+from src.core.csr_graph import MAP_FORMAT_VERSION
+from tests.utils import random_map, nodes_of, traffic_rounds
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_searches_see_traffic_updates_without_rebuilding_costs(seed):
+    graph, manager = random_map(seed, 20, 20, csr=True)
+    rng = random.Random(seed)
+    nodes = nodes_of(graph)
+    finder = RouteFinder(graph)
+    costs = graph.adjacency_lists()[2]
+
+    for _ in traffic_rounds(manager, nodes, rng, rounds=5):
+        assert graph.adjacency_lists()[2] is costs
+        reference = graph.to_networkx()
+        for _ in range(5):
+            start, goal = rng.choice(nodes), rng.choice(nodes)
+            try:
+                optimal = nx.dijkstra_path_length(
+                    reference, start, goal,
+                    weight=lambda u, v, d: d['weight'] * d['traffic_factor'])
+            except nx.NetworkXNoPath:
+                optimal = float('inf')
+            assert finder.dijkstra(start, goal)[1] == pytest.approx(optimal)
+
+
+def edge_table(graph):
+    """{frozenset((u, v)): (weight, traffic_factor)} of a networkx graph."""
+    return {frozenset((u, v)): (d.get('weight', 1.0), d.get('traffic_factor', 1.0))
+            for u, v, d in graph.edges(data=True)}
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_networkx_round_trip_keeps_nodes_edges_and_traffic(seed):
+    source, _ = random_map(seed, 15, 12)
+    graph = CSRGraph.from_networkx(source)
+    assert graph.nodes() == list(source.nodes())
+    assert graph.number_of_edges() == source.number_of_edges()
+    assert edge_table(graph.to_networkx()) == edge_table(source)
+
+    offsets, neighbors, costs, coords = graph.adjacency_lists()
+    for node in source.nodes():
+        node_id = graph.node_id(node)
+        assert coords[node_id] == node
+        arcs = {coords[neighbors[i]]: costs[i] for i in range(offsets[node_id], offsets[node_id + 1])}
+        assert arcs == pytest.approx({neighbor: d['weight'] * d['traffic_factor']
+                                      for neighbor, d in source[node].items()})
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_from_grid_matches_grid_2d_graph(seed):
+    mask = np.random.default_rng(seed).random((13, 9)) < 0.25
+    expected = nx.grid_2d_graph(13, 9)
+    expected.remove_nodes_from(map(tuple, np.argwhere(mask).tolist()))
+    graph = CSRGraph.from_grid(mask)
+    assert graph.nodes() == list(expected.nodes())
+    assert (graph.obstacle_mask == mask).all()
+    reference = CSRGraph.from_networkx(expected)
+    np.testing.assert_array_equal(graph.edge_u, reference.edge_u)
+    np.testing.assert_array_equal(graph.edge_v, reference.edge_v)
+
+
+def test_sync_from_networkx_copies_only_the_given_edges():
+    source, _ = random_map(4, 12, 12, traffic=0.0)
+    graph = CSRGraph.from_networkx(source)
+    for u, v, d in source.edges(data=True):
+        d['traffic_factor'] = 3.0
+    graph.sync_from_networkx(source, [0, 5])
+    assert graph.traffic[[0, 5]].tolist() == [3.0, 3.0]
+    assert (np.delete(graph.traffic, [0, 5]) == 1.0).all()
+    assert graph.adjacency_lists()[2][graph.edge_arcs[5][0]] == pytest.approx(3.0 * graph.weights[5])
+
+    graph.sync_from_networkx(source)
+    assert edge_table(graph.to_networkx()) == edge_table(source)
+
+
+@pytest.mark.parametrize('mmap_mode', ['c', 'r', None])
+def test_saved_map_loads_back_identical(tmp_path, mmap_mode):
+    graph, _ = random_map(6, 18, 14, csr=True)
+    path = str(tmp_path / 'map.npz')
+    graph.save(path)
+    loaded = CSRGraph.load(path, mmap_mode=mmap_mode)
+    for name in CSRGraph.ARRAY_FIELDS:
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(graph, name))
+    assert (loaded.width, loaded.height) == (graph.width, graph.height)
+
+    finder, reference = RouteFinder(loaded), RouteFinder(graph)
+    nodes = nodes_of(graph)
+    for start, goal in zip(nodes[::17], nodes[::-13]):
+        assert finder.a_star(start, goal)[1] == pytest.approx(reference.a_star(start, goal)[1])
+
+
+def test_copy_on_write_traffic_stays_private(tmp_path):
+    graph, _ = random_map(6, 12, 12, csr=True)
+    path = str(tmp_path / 'map.npz')
+    graph.save(path)
+    TrafficManager(CSRGraph.load(path, mmap_mode='c'), seed=1).apply_random_traffic(0.5)
+    np.testing.assert_array_equal(CSRGraph.load(path).traffic, graph.traffic)
+
+
+def test_read_only_map_rejects_traffic_updates(tmp_path):
+    graph, _ = random_map(6, 12, 12, csr=True)
+    path = str(tmp_path / 'map.npz')
+    graph.save(path)
+    manager = TrafficManager(CSRGraph.load(path, mmap_mode='r'), seed=1)
+    with pytest.raises(ValueError, match='read-only'):
+        manager.apply_random_traffic(0.5)
+    assert manager.version == 0
+
+
+@pytest.mark.parametrize('mmap_mode', ['c', None])
+def test_compressed_or_corrupt_files_are_rejected(tmp_path, mmap_mode):
+    graph, _ = random_map(6, 12, 12, csr=True)
+    compressed = str(tmp_path / 'compressed.npz')
+    np.savez_compressed(compressed, format_version=np.array([MAP_FORMAT_VERSION]), **graph.to_arrays())
+    if mmap_mode is not None:
+        with pytest.raises(ValueError, match='compressed'):
+            CSRGraph.load(compressed, mmap_mode=mmap_mode)
+
+    corrupt = tmp_path / 'corrupt.npz'
+    corrupt.write_bytes(b'PK\x03\x04' + bytes(range(256)) * 4)
+    with pytest.raises(ValueError):
+        CSRGraph.load(str(corrupt), mmap_mode=mmap_mode)
+
+    other = str(tmp_path / 'other.npz')
+    np.savez(other, weights=graph.weights)
+    with pytest.raises(ValueError, match='not a map file'):
+        CSRGraph.load(other, mmap_mode=mmap_mode)
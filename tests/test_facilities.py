@@ -0,0 +1,47 @@
+import math
+import random
+from collections import deque
+
+import pytest
+
+from src.core import RouteFinder, FacilityIndex
+from tests.utils import random_map, nodes_of, path_cost, traffic_rounds
+
+
+def nearest_by_dijkstra(finder, node, facilities):
+    costs = [finder.dijkstra(node, facility)[1] for facility in facilities]
+    return sorted(cost for cost in costs if cost != math.inf)
+
+
+def check_routes(graph, node, found, paths, costs, expected):
+    assert costs == pytest.approx(expected[:len(costs)])
+    for facility, path, cost in zip(found, paths, costs):
+        assert path[0] == node and path[-1] == facility
+        assert path_cost(graph, path) == pytest.approx(cost)
+
+
+@pytest.mark.parametrize('max_log', [256, 1])
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_repaired_trees_match_dijkstra(seed, csr, max_log):
+    graph, manager = random_map(seed, 24, 24, csr=csr)
+    manager.change_log = deque(maxlen=max_log)
+    rng = random.Random(seed)
+    nodes = nodes_of(graph)
+    facilities = list(dict.fromkeys(rng.choice(nodes) for _ in range(5)))
+    index = FacilityIndex(graph, facilities, manager).build()
+    finder = RouteFinder(graph)
+
+    # The index catches up on the changes by itself at the next lookup
+    for _ in traffic_rounds(manager, nodes, rng, rounds=5):
+        if max_log == 1:
+            manager.apply_random_traffic(0.05)
+        for _ in range(10):
+            node = rng.choice(nodes)
+            expected = nearest_by_dijkstra(finder, node, facilities)
+            found = index.nearest(node, k=3)
+            assert len(found[0]) == min(3, len(expected))
+            check_routes(graph, node, *found, expected)
+            check_routes(graph, node, *finder.nearest_facilities(node, facilities, k=3)[:3], expected)
+
+    assert index.repairs if max_log > 1 else index.rebuilds
@@ -0,0 +1,47 @@
+import math
+import random
+
+import pytest
+
+from src.core import RouteFinder, HierarchicalPlanner
+from tests.utils import random_map, nodes_of, path_cost
+
+
+def check_route(graph, result, start, goal, optimal):
+    path, cost, _ = result
+    if optimal == math.inf:
+        assert path is None and cost == math.inf
+        return
+    assert path[0] == start and path[-1] == goal
+    assert path_cost(graph, path) == pytest.approx(cost)
+    assert cost >= optimal - 1e-9
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(6))
+def test_query_matches_dijkstra_reachability_and_is_never_shorter(seed, csr):
+    graph, _ = random_map(seed, 24, 20, csr=csr)
+    planner = HierarchicalPlanner(graph, cluster_size=8).preprocess()
+    finder = RouteFinder(graph)
+    nodes = nodes_of(graph)
+    rng = random.Random(seed)
+    for _ in range(25):
+        start, goal = rng.choice(nodes), rng.choice(nodes)
+        optimal = finder.dijkstra(start, goal)[1]
+        check_route(graph, planner.query(start, goal), start, goal, optimal)
+
+
+@pytest.mark.parametrize('seed', range(8, 12))
+def test_entrance_start_with_goal_in_the_same_cluster(seed):
+    # The abstract route [start, goal] can come out a rounding error cheaper
+    # than the direct in-cluster route; it used to raise KeyError
+    graph, _ = random_map(seed, 18, 12, csr=True)
+    planner = HierarchicalPlanner(graph, cluster_size=8).preprocess()
+    finder = RouteFinder(graph)
+    for cluster, entrances in enumerate(planner.entrances):
+        members = [v for v in range(graph.number_of_nodes()) if planner.cluster_of[v] == cluster]
+        for s in entrances:
+            for t in members:
+                start, goal = graph.node(s), graph.node(t)
+                optimal = finder.dijkstra(start, goal)[1]
+                check_route(graph, planner.query(start, goal), start, goal, optimal)
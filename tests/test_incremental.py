@@ -0,0 +1,46 @@
+import math
+import random
+
+import pytest
+
+from src.core import RouteFinder, DStarLite
+from tests.utils import random_map, nodes_of, path_cost
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(4))
+def test_replanning_matches_dijkstra(seed, csr):
+    graph, manager = random_map(seed, 24, 24, csr=csr)
+    rng = random.Random(seed)
+    nodes = nodes_of(graph)
+    start, goal = rng.choice(nodes), rng.choice(nodes)
+    planner = DStarLite(graph, start, goal)
+    finder = RouteFinder(graph)
+
+    for step in range(8):
+        path, cost, _ = planner.plan()
+        optimal = finder.dijkstra(start, goal)[1]
+        if optimal == math.inf:
+            assert path is None and cost == math.inf
+        else:
+            assert path[0] == start and path[-1] == goal
+            assert cost == pytest.approx(optimal)
+            assert path_cost(graph, path) == pytest.approx(optimal)
+
+        if step % 3 == 2:
+            changed = manager.reset_traffic()
+        elif step % 3 == 1:
+            changed = manager.apply_random_traffic(0.2)
+        else:
+            changed = manager.apply_congestion_zone(rng.choice(nodes), rng.uniform(2, 6), rng.uniform(2, 6))
+        if path is not None and len(path) > 2:
+            start = path[len(path) // 3]
+            planner.move_start(start)
+        planner.update_edges(manager.edge_nodes(changed))
+
+
+def test_unreachable_goal_has_no_path():
+    graph, _ = random_map(0, 12, 12)
+    graph.add_node((40, 40))
+    path, cost, _ = DStarLite(graph, nodes_of(graph)[0], (40, 40)).plan()
+    assert path is None and cost == math.inf
@@ -0,0 +1,69 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from src.core import CSRGraph
+from src.core.isochrone import isochrone, coverage, isochrone_bands
+from tests.utils import random_map, nodes_of
+
+
+def reference_raster(graph, source, shape):
+    """Dijkstra costs from `source` as a (width, height) raster, inf elsewhere."""
+    reference = graph.to_networkx() if isinstance(graph, CSRGraph) else graph
+    lengths = nx.single_source_dijkstra_path_length(
+        reference, source, weight=lambda u, v, d: d.get('weight', 1.0) * d.get('traffic_factor', 1.0))
+    raster = np.full(shape, np.inf)
+    for (x, y), cost in lengths.items():
+        raster[x, y] = cost
+    return raster
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_isochrone_matches_dijkstra_on_every_cell(seed, csr):
+    graph, _ = random_map(seed, 18, 15, csr=csr)
+    source = random.Random(seed).choice(nodes_of(graph))
+    expected = reference_raster(graph, source, (18, 15))
+
+    np.testing.assert_allclose(isochrone(graph, source, shape=(18, 15)), expected)
+
+    max_cost = float(np.median(expected[np.isfinite(expected)]))
+    limited = isochrone(graph, source, max_cost, shape=(18, 15))
+    within = expected <= max_cost
+    np.testing.assert_allclose(limited[within], expected[within])
+    assert np.isinf(limited[~within]).all()
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_coverage_labels_every_cell_with_its_nearest_station(seed, csr):
+    graph, _ = random_map(seed, 18, 15, csr=csr)
+    stations = random.Random(seed).sample(nodes_of(graph), 4)
+    per_station = np.stack([reference_raster(graph, station, (18, 15)) for station in stations])
+    best = per_station.min(axis=0)
+    max_cost = float(np.percentile(best[np.isfinite(best)], 75))
+
+    costs, nearest = coverage(graph, stations, max_cost, shape=(18, 15))
+    within = best <= max_cost
+    np.testing.assert_allclose(costs[within], best[within])
+    assert np.isinf(costs[~within]).all() and (nearest[~within] == -1).all()
+    # Ties may go to either station, but the label must be one at the best cost
+    xs, ys = np.nonzero(within)
+    np.testing.assert_allclose(per_station[nearest[xs, ys], xs, ys], best[xs, ys])
+    for i, (x, y) in enumerate(stations):
+        assert nearest[x, y] == i and costs[x, y] == 0
+
+
+def test_duplicate_stations_label_the_first_index():
+    graph, _ = random_map(1, 10, 10, csr=True)
+    station = nodes_of(graph)[5]
+    _, nearest = coverage(graph, [station, station])
+    assert set(np.unique(nearest).tolist()) <= {-1, 0}
+
+
+def test_band_edges_belong_to_the_lower_band():
+    levels = (2.0, 4.0, 6.0)
+    costs = np.array([[0.0, 2.0, 2.0001, 4.0], [5.9, 6.0, 6.0001, np.inf]])
+    np.testing.assert_array_equal(isochrone_bands(costs, levels), [[0, 0, 1, 1], [2, 2, -1, -1]])
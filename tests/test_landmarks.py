@@ -0,0 +1,33 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.core import RouteFinder, LandmarkHeuristic
+from src.core.sssp import shortest_path_tree
+from tests.utils import random_map, nodes_of, path_cost, traffic_rounds
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_refreshed_landmarks_match_dijkstra(seed, csr):
+    graph, manager = random_map(seed, 24, 24, csr=csr)
+    rng = random.Random(seed)
+    nodes = nodes_of(graph)
+    landmarks = LandmarkHeuristic(graph, num_landmarks=4, seed=seed).select()
+    finder = RouteFinder(graph)
+
+    for changed in traffic_rounds(manager, nodes, rng):
+        landmarks.refresh(changed)
+        for i, landmark in enumerate(landmarks.landmarks):
+            distances, _, _ = shortest_path_tree(landmarks.csr, [landmark])
+            np.testing.assert_allclose(landmarks.distances[i], distances)
+
+        for _ in range(15):
+            start, goal = rng.choice(nodes), rng.choice(nodes)
+            optimal = finder.dijkstra(start, goal)[1]
+            path, cost, _ = finder.a_star(start, goal, heuristic=landmarks)
+            assert cost == pytest.approx(optimal)
+            if path is not None:
+                assert path[0] == start and path[-1] == goal
+                assert path_cost(graph, path) == pytest.approx(optimal)
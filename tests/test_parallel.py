@@ -0,0 +1,43 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.core import RouteFinder, TrafficManager
+from src.core.parallel import ParallelQueryExecutor
+from tests.utils import random_map, nodes_of
+
+
+def assert_matches_dijkstra(executor, reference, queries):
+    finder = RouteFinder(reference)
+    for (start, goal), (path, cost, _) in zip(queries, executor.run(queries)):
+        assert cost == pytest.approx(finder.dijkstra(start, goal)[1])
+        if path:
+            assert path[0] == start and path[-1] == goal
+
+
+@pytest.mark.parametrize('seed', range(2))
+def test_parallel_results_match_dijkstra_after_traffic_updates(seed):
+    graph, _ = random_map(seed, 16, 16, csr=True)
+    rng = random.Random(seed)
+    nodes = nodes_of(graph)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(40)]
+    # The executor publishes its own copy of the map; `reference` follows the
+    # same updates through a TrafficManager
+    reference, _ = random_map(seed, 16, 16, csr=True)
+    manager = TrafficManager(reference, seed=seed)
+
+    with ParallelQueryExecutor(graph, max_workers=2, chunksize=8) as executor:
+        assert_matches_dijkstra(executor, reference, queries)
+
+        edge_ids = rng.sample(range(graph.number_of_edges()), 30)
+        factors = np.array([rng.uniform(2, 8) for _ in edge_ids])
+        executor.update_traffic(factors, edge_ids)
+        manager.set_factors(edge_ids, factors)
+        assert_matches_dijkstra(executor, reference, queries)
+
+        factors = np.array([rng.uniform(1, 3) for _ in range(graph.number_of_edges())])
+        executor.update_traffic(factors)
+        manager.set_factors(np.arange(graph.number_of_edges()), factors)
+        assert_matches_dijkstra(executor, reference, queries)
+        assert executor.graph.version == graph.version + 2
@@ -0,0 +1,38 @@
+import math
+import random
+from collections import deque
+
+import pytest
+
+from src.core import RouteFinder, RouteCache
+from tests.utils import random_map, nodes_of, path_cost, traffic_rounds
+
+
+@pytest.mark.parametrize('max_log', [256, 1])
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_cached_routes_stay_optimal_across_traffic_changes(seed, csr, max_log):
+    graph, manager = random_map(seed, 24, 24, csr=csr)
+    manager.change_log = deque(maxlen=max_log)
+    rng = random.Random(seed)
+    nodes = nodes_of(graph)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(20)]
+    finder = RouteFinder(graph)
+    cache = RouteCache(RouteFinder(graph), manager)
+
+    for changed in traffic_rounds(manager, nodes, rng, rounds=7):
+        # Two changes between lookups make a one-entry log lose track
+        if max_log == 1:
+            manager.apply_random_traffic(0.05)
+        for start, goal in pairs:
+            for algorithm in ('dijkstra', 'a_star', 'a_star'):
+                path, cost, _ = cache.route(start, goal, algorithm)
+                optimal = finder.dijkstra(start, goal)[1]
+                assert cost == pytest.approx(optimal)
+                if optimal == math.inf:
+                    assert path is None
+                else:
+                    assert path[0] == start and path[-1] == goal
+                    assert path_cost(graph, path) == pytest.approx(cost)
+
+    assert cache.hits > 0 and cache.invalidations > 0
@@ -0,0 +1,86 @@
+import pytest
+
+from src.core import RouteFinder
+from tests.utils import random_map, nodes_of
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('algorithm', ['dijkstra', 'a_star', 'greedy_bfs',
+                                       'bidirectional_dijkstra', 'bidirectional_a_star'])
+def test_counters_survive_later_queries(algorithm, csr):
+    graph, _ = random_map(3, 25, 25, csr=csr)
+    nodes = nodes_of(graph)
+    finder = RouteFinder(graph, stats='trace')
+    path, _, expanded = getattr(finder, algorithm)(nodes[0], nodes[-1])
+    stats = finder.stats.as_dict()
+
+    if csr:
+        offsets = graph.adjacency_lists()[0]
+
+        def degree(node):
+            node_id = graph.node_id(node)
+            return offsets[node_id + 1] - offsets[node_id]
+    else:
+        def degree(node):
+            return len(graph.adj[node])
+
+    scanned = sum(degree(node) for node in stats['trace'])
+    if path is not None and not algorithm.startswith('bidirectional'):
+        scanned -= degree(nodes[-1])
+    assert stats['expanded'] == expanded == len(stats['trace'])
+    assert stats['relaxations'] == scanned
+    assert stats['pops'] == expanded and stats['pushes'] >= expanded
+
+    # A later query on the same finder reuses the workspaces
+    finder.dijkstra(nodes[-1], nodes[len(nodes) // 2])
+    assert finder.stats.algorithm == 'dijkstra'
+    assert isinstance(finder.stats.relaxations, int)
+
+
+def test_off_mode_records_only_expanded_nodes():
+    graph, _ = random_map(3, 25, 25)
+    nodes = nodes_of(graph)
+    finder = RouteFinder(graph, stats='off')
+    _, _, expanded = finder.a_star(nodes[0], nodes[-1])
+    assert finder.stats.expanded == expanded
+    assert finder.stats.relaxations == 0 and finder.stats.pushes == 0
+
+
+@pytest.mark.parametrize('csr', [False, True])
+def test_jump_point_search_records_stats_and_falls_back_under_traffic(csr):
+    graph, _ = random_map(3, 25, 25, traffic=0.0, csr=csr)
+    nodes = nodes_of(graph)
+    finder = RouteFinder(graph, stats='trace')
+    _, _, expanded = finder.jump_point_search(nodes[0], nodes[-1])
+    stats = finder.stats.as_dict()
+    assert stats['algorithm'] == 'jump_point_search'
+    assert stats['expanded'] == expanded == len(stats['trace'])
+    assert stats['pushes'] >= expanded and stats['relaxations'] > 0
+
+    congested, _ = random_map(3, 25, 25, traffic=0.3, csr=csr)
+    finder = RouteFinder(congested)
+    finder.jump_point_search(nodes[0], nodes[-1])
+    assert finder.stats.algorithm == 'a_star'
+
+
+@pytest.mark.parametrize('csr', [False, True])
+def test_multi_target_searches_record_stats(csr):
+    graph, _ = random_map(5, 25, 25, csr=csr)
+    nodes = nodes_of(graph)
+    assert RouteFinder(graph).stats.mode == 'off'
+    finder = RouteFinder(graph, stats='trace')
+    runs = {
+        'ara_star': lambda: list(finder.ara_star(nodes[0], nodes[-1]))[-1][2],
+        'one_to_many': lambda: finder.one_to_many(nodes[0], nodes[-5:])[2],
+        'many_to_many': lambda: finder.many_to_many(nodes[:3], nodes[-4:])[2],
+        'nearest_facilities': lambda: finder.nearest_facilities(nodes[0], nodes[-6:], k=2)[3],
+    }
+    for algorithm, run in runs.items():
+        expanded = run()
+        stats = finder.stats.as_dict()
+        assert stats['algorithm'] == algorithm
+        assert stats['expanded'] == expanded > 0
+        assert stats['pops'] == expanded and stats['pushes'] >= expanded
+        assert 0 < stats['relaxations'] and stats['peak_frontier'] > 0
+        if algorithm != 'many_to_many':
+            assert len(stats['trace']) == expanded
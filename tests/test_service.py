@@ -0,0 +1,133 @@
+import asyncio
+import json
+import math
+import threading
+
+import pytest
+
+from src.core import RouteFinder
+from src.service import RoutingService
+from tests.utils import random_map, nodes_of
+
+
+async def send_routes(service, nodes, count, pause=0.02):
+    """Starts `count` /route requests; the dispatcher picks up the first
+    one (and waits out its batch window) before the others are sent."""
+    tasks = []
+    for i in range(count):
+        tasks.append(asyncio.ensure_future(post(service, '/route', {'start': nodes[i], 'goal': nodes[-1]})))
+        if i == 0:
+            await asyncio.sleep(pause)
+    return tasks
+
+
+def serve(test, **options):
+    """Runs `test(service, graph)` against a started single-thread service."""
+    graph, _ = random_map(2, 20, 20, csr=True)
+    options.setdefault('workers', 0)
+
+    async def main():
+        service = await RoutingService(graph, **options).start(port=0)
+        try:
+            return await test(service, graph)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+def connected_pair(graph):
+    nodes = nodes_of(graph)
+    finder = RouteFinder(graph)
+    return next((nodes[0], goal) for goal in reversed(nodes) if math.isfinite(finder.a_star(nodes[0], goal)[1]))
+
+
+async def post(service, path, payload):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return await service.handle('POST', path, body)
+
+
+def test_concurrent_requests_are_batched_and_coalesced():
+    async def test(service, graph):
+        nodes = nodes_of(graph)
+        pairs = [connected_pair(graph)] * 6 + [(nodes[i], nodes[-i - 2]) for i in range(1, 5)]
+        replies = await asyncio.gather(*(post(service, '/route', {'start': s, 'goal': g}) for s, g in pairs))
+        finder = RouteFinder(graph)
+        for (start, goal), (status, payload) in zip(pairs, replies):
+            assert status == 200
+            optimal = finder.a_star(start, goal)[1]
+            assert payload['cost'] == (pytest.approx(optimal) if math.isfinite(optimal) else None)
+        return service.stats()
+
+    stats = serve(test, batch_window=0.05)
+    assert stats['counters']['batches'] == 1
+    assert stats['counters']['coalesced'] == 5
+    assert stats['histograms']['batch_size']['count'] == 1
+
+
+def test_full_queue_answers_429():
+    async def test(service, graph):
+        # The dispatcher holds the first request for the batch window, so
+        # the next two fill the queue and the fourth is turned away
+        tasks = await send_routes(service, nodes_of(graph), 4)
+        return [status for status, _ in await asyncio.gather(*tasks)]
+
+    assert sorted(serve(test, max_pending=2, batch_window=0.2)) == [200, 200, 200, 429]
+
+
+def test_expired_requests_answer_504():
+    async def test(service, graph):
+        nodes = nodes_of(graph)
+        status, payload = await post(service, '/route', {'start': nodes[0], 'goal': nodes[-1], 'deadline_ms': 1})
+        return status, service.stats()['counters']['timeouts']
+
+    assert serve(test, batch_window=0.1) == (504, 1)
+
+
+@pytest.mark.parametrize('payload', [
+    {'start': [0, 0]},
+    {'start': [0, 0], 'goal': [999, 999]},
+    {'start': [0, 0], 'goal': [1, 1], 'algorithm': 'teleport'},
+    b'{"start": ',
+])
+def test_bad_input_answers_400(payload):
+    async def test(service, graph):
+        return await post(service, '/route', payload)
+
+    status, body = serve(test)
+    assert status == 400 and body['error']
+
+
+def test_close_fails_queued_requests():
+    async def test(service, graph):
+        # One request waits in the dispatcher's batch, one in the queue
+        tasks = await send_routes(service, nodes_of(graph), 3)
+        await asyncio.sleep(0.02)
+        await service.close()
+        return [status for status, _ in await asyncio.gather(*tasks)]
+
+    assert serve(test, max_pending=1, batch_window=30) == [503, 503, 429]
+
+
+def test_traffic_is_ingested_off_the_event_loop():
+    async def test(service, graph):
+        threads = []
+        ingest = service.feed.ingest
+
+        def record(lines):
+            threads.append(threading.get_ident())
+            return ingest(lines)
+
+        service.feed.ingest = record
+        # Congest the first road of the current best route
+        start, goal = connected_pair(graph)
+        path = RouteFinder(graph).a_star(start, goal)[0]
+        edge = graph.edge_id(graph.node_id(path[0]), graph.node_id(path[1]))
+        status, payload = await post(service, '/traffic', f'1.0,edge,{edge},40.0\n'.encode())
+        route = await post(service, '/route', {'start': start, 'goal': goal})
+        return threads, status, payload, route, RouteFinder(graph).a_star(start, goal)[1]
+
+    threads, status, payload, (route_status, route), optimal = serve(test)
+    assert threads and threads[0] != threading.get_ident()
+    assert status == 200 and payload['changed'] == 1
+    assert route_status == 200 and route['cost'] == pytest.approx(optimal)
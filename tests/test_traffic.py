@@ -0,0 +1,80 @@
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+from src.core import MapGenerator, TrafficManager, CSRGraph
+from tests.utils import random_map, nodes_of, traffic_rounds
+
+
+def traffic_table(graph):
+    """{frozenset((u, v)): traffic_factor} of a networkx graph or CSRGraph."""
+    if isinstance(graph, CSRGraph):
+        graph = graph.to_networkx()
+    return {frozenset((u, v)): d['traffic_factor'] for u, v, d in graph.edges(data=True)}
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_vectorized_and_loop_maps_agree_for_a_seed(seed):
+    maps = [MapGenerator(17, 11, 0.25, seed=seed).generate_grid_map(vectorized=vectorized)
+            for vectorized in (False, True)]
+    maps.append(MapGenerator(17, 11, 0.25, seed=seed).generate_csr_map())
+    for graph in maps:
+        TrafficManager(graph, seed=seed).apply_random_traffic(0.4)
+
+    loop, vectorized, csr = maps
+    assert list(vectorized.nodes()) == list(loop.nodes()) == csr.nodes()
+    assert list(vectorized.edges()) == list(loop.edges())
+    assert traffic_table(vectorized) == traffic_table(loop) == traffic_table(csr)
+
+
+@pytest.mark.parametrize('csr', [False, True])
+def test_unseeded_traffic_follows_the_random_module(csr):
+    random.seed(7)
+    graph = MapGenerator(15, 15, 0.2).generate_grid_map()
+    expected = {}
+    for u, v in graph.edges():
+        if random.random() < 0.3:
+            expected[frozenset((u, v))] = random.uniform(1.5, 5.0)
+
+    random.seed(7)
+    graph = MapGenerator(15, 15, 0.2).generate_grid_map()
+    if csr:
+        graph = CSRGraph.from_networkx(graph)
+    TrafficManager(graph).apply_random_traffic(0.3)
+    table = traffic_table(graph)
+    assert {edge: f for edge, f in table.items() if f != 1.0} == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('csr', [False, True])
+@pytest.mark.parametrize('seed', range(3))
+def test_changes_since_reports_old_factors_and_edge_versions(seed, csr):
+    graph, manager = random_map(seed, 16, 16, traffic=0.0, csr=csr)
+    rng = random.Random(seed)
+    nodes = nodes_of(graph)
+    snapshots = {0: manager.factors.copy()}
+    stamps = np.zeros(len(manager.factors), dtype=np.int64)
+
+    for changed in traffic_rounds(manager, nodes, rng, rounds=6):
+        stamps[changed] = manager.version
+        snapshots[manager.version] = manager.factors.copy()
+        np.testing.assert_array_equal(manager.edge_versions, stamps)
+
+    for version, factors in snapshots.items():
+        edge_ids, old = manager.changes_since(version)
+        # Rewritten edges may end up back at their old factor
+        assert set(np.nonzero(factors != manager.factors)[0].tolist()) <= set(edge_ids.tolist())
+        np.testing.assert_array_equal(old, factors[edge_ids])
+        np.testing.assert_array_equal(edge_ids, np.nonzero(manager.edge_versions > version)[0])
+
+
+def test_changes_since_gives_up_past_the_log():
+    graph, manager = random_map(3, 10, 10, traffic=0.0)
+    manager.change_log = deque(maxlen=2)
+    for _ in range(4):
+        manager.apply_random_traffic(0.5)
+    assert manager.changes_since(manager.version - 2) is not None
+    assert manager.changes_since(manager.version - 3) is None
+    edge_ids, old = manager.changes_since(manager.version)
+    assert len(edge_ids) == len(old) == 0
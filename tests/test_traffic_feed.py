@@ -0,0 +1,109 @@
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.core import TrafficFeed, TrafficManager, CSRGraph, RouteFinder
+from tests.utils import random_map
+
+
+@pytest.mark.parametrize('csr', [False, True])
+def test_batch_applies_last_factor_per_edge(csr):
+    graph, manager = random_map(3, 15, 15, csr=csr)
+    feed = TrafficFeed(manager)
+    lines = ['1.0,edge,4,2.0', '{"t": 1.5, "edge": 4, "factor": 3.5}', '2.0,edge,7,1.25', 'not a line']
+    changed = feed.ingest(lines)
+    assert sorted(changed.tolist()) == [4, 7]
+    assert manager.factors[4] == 3.5 and manager.factors[7] == 1.25
+    assert feed.stats()['malformed'] == 1
+
+
+def test_replayed_feed_matches_a_single_ingest():
+    _, streamed = random_map(4, 20, 20, csr=True)
+    _, direct = random_map(4, 20, 20, csr=True)
+    rng = np.random.default_rng(4)
+    lines = [f"{i},edge,{rng.integers(len(direct.factors))},{rng.uniform(1, 5):.3f}" for i in range(2000)]
+    lines += [f"{i},zone,{rng.integers(20)},{rng.integers(20)},3,{rng.uniform(1, 5):.3f}" for i in range(50)]
+    TrafficFeed(streamed, max_batch=64, max_delay=0.001).run(lines)
+    TrafficFeed(direct).ingest(lines)
+    np.testing.assert_array_equal(streamed.factors, direct.factors)
+
+
+def stops_quickly(feed, limit=2.0):
+    started = time.monotonic()
+    feed.stop()
+    return time.monotonic() - started < limit and not any(t.is_alive() for t in feed._threads)
+
+
+def test_stop_wakes_a_reader_on_an_idle_tcp_socket():
+    _, manager = random_map(5, 10, 10, csr=True)
+    server = socket.create_server(('127.0.0.1', 0))
+    accepted = []
+    threading.Thread(target=lambda: accepted.append(server.accept()), daemon=True).start()
+    feed = TrafficFeed(manager).start(f"tcp://127.0.0.1:{server.getsockname()[1]}")
+    try:
+        time.sleep(0.1)
+        assert stops_quickly(feed)
+    finally:
+        server.close()
+
+
+def test_stop_wakes_a_reader_on_an_idle_unix_socket(tmp_path):
+    _, manager = random_map(5, 10, 10, csr=True)
+    path = str(tmp_path / 'feed.sock')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+    accepted = []
+    threading.Thread(target=lambda: accepted.append(server.accept()), daemon=True).start()
+    feed = TrafficFeed(manager).start(f"unix://{path}")
+    try:
+        time.sleep(0.1)
+        assert stops_quickly(feed)
+    finally:
+        server.close()
+
+
+def test_stop_returns_on_an_idle_pipe():
+    _, manager = random_map(5, 10, 10, csr=True)
+    read_fd, write_fd = os.pipe()
+    feed = TrafficFeed(manager).start(os.fdopen(read_fd))
+    try:
+        started = time.monotonic()
+        feed.stop(timeout=0.3)
+        assert time.monotonic() - started < 1.0
+        # The applier exits even though the reader is stuck in read()
+        assert not feed._threads[1].is_alive()
+    finally:
+        os.close(write_fd)
+
+
+def test_running_queries_never_see_half_a_batch():
+    graph = CSRGraph.from_grid(np.zeros((40, 40), dtype=bool))
+    manager = TrafficManager(graph, seed=0)
+    feed = TrafficFeed(manager)
+    finder = RouteFinder(graph)
+    start, goal = (0, 0), (39, 39)
+    base = finder.dijkstra(start, goal)[1]
+    edges = range(graph.number_of_edges())
+
+    costs, done = [], threading.Event()
+
+    def search():
+        while not done.is_set():
+            costs.append(finder.dijkstra(start, goal)[1])
+
+    thread = threading.Thread(target=search)
+    thread.start()
+    try:
+        # Every batch sets the whole map to one factor; written in place,
+        # a search running across a batch would mix the two
+        for factor in [3.0, 1.0] * 15:
+            feed.ingest([f",edge,{edge},{factor}" for edge in edges])
+    finally:
+        done.set()
+        thread.join()
+    assert costs and all(cost == pytest.approx(base) or cost == pytest.approx(3 * base) for cost in costs)
@@ -0,0 +1,45 @@
+import random
+
+from src.core import MapGenerator, CSRGraph, TrafficManager
+
+
+def random_map(seed, width=20, height=20, obstacle_prob=0.2, traffic=0.3, csr=False):
+    """Seeded MapGenerator map with random traffic, as networkx or CSRGraph.
+    Returns: (graph, traffic_manager)."""
+    random.seed(seed)
+    graph = MapGenerator(width, height, obstacle_prob).generate_grid_map()
+    if csr:
+        graph = CSRGraph.from_networkx(graph)
+    manager = TrafficManager(graph, seed=seed)
+    manager.apply_random_traffic(traffic)
+    return graph, manager
+
+
+def nodes_of(graph):
+    return graph.nodes() if isinstance(graph, CSRGraph) else list(graph.nodes())
+
+
+def path_cost(graph, path):
+    """Cost of walking `path`; fails if two consecutive nodes are not adjacent."""
+    total = 0.0
+    for u, v in zip(path, path[1:]):
+        if isinstance(graph, CSRGraph):
+            edge = graph.edge_id(graph.node_id(u), graph.node_id(v))
+            assert edge >= 0, f"{u} -> {v} is not a road"
+            total += float(graph.weights[edge] * graph.traffic[edge])
+        else:
+            assert graph.has_edge(u, v), f"{u} -> {v} is not a road"
+            data = graph[u][v]
+            total += data.get('weight', 1.0) * data.get('traffic_factor', 1.0)
+    return total
+
+
+def traffic_rounds(manager, nodes, rng, rounds=4):
+    """Yields the edge ids changed by a mix of congestion zones, random traffic and resets."""
+    for step in range(rounds):
+        if step % 3 == 0:
+            yield manager.apply_congestion_zone(rng.choice(nodes), rng.uniform(2, 6), rng.uniform(2, 6))
+        elif step % 3 == 1:
+            yield manager.apply_random_traffic(0.2)
+        else:
+            yield manager.reset_traffic()